@@ -0,0 +1,305 @@
+"""
+ML Service Benchmarks
+Latency and throughput benchmarks for the analysis hot paths and API endpoints
+
+Usage (from apps/ml):
+    python benchmarks/run_benchmarks.py --output benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --fail-on-regression
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Words per content size, from a tweet to a long video transcript
+CONTENT_SIZES = {
+    "tweet": 30,
+    "paragraph": 200,
+    "article": 2000,
+    "long_article": 10000,
+    "transcript": 50000
+}
+
+DEFAULT_WARMUP = 2
+DEFAULT_REGRESSION_THRESHOLD = 0.25  # p95 slowdown that counts as a regression
+
+# Mix of neutral text and words that trigger safety, quality, bias and emotion rules
+VOCABULARY = [
+    "the", "a", "children", "learn", "about", "science", "history", "because", "research",
+    "shows", "that", "study", "data", "example", "explain", "understand", "why", "how",
+    "people", "family", "community", "culture", "tradition", "school", "friends", "play",
+    "happy", "sad", "worried", "frustrated", "really", "very", "feel", "scared", "confused",
+    "fight", "weapon", "violence", "dangerous", "mature", "stupid", "he", "she", "boys",
+    "girls", "always", "never", "everyone", "western", "asian", "african", "latino",
+    "professional", "doctor", "nurse", "engineer", "rich", "poor", "disabled", "normal"
+]
+
+@dataclass
+class BenchmarkResult:
+    target: str
+    size: str
+    words: int
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    throughput_per_second: float
+    words_per_second: float
+
+def generate_content(words: int, seed: int = 0) -> str:
+    """Deterministic synthetic content of roughly `words` words"""
+    rng = random.Random(seed)
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 18))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice([".", ".", ".", "!", "?"]))
+        remaining -= length
+    return " ".join(sentences)
+
+def default_iterations(words: int) -> int:
+    """Fewer iterations for larger inputs so every size finishes in similar time"""
+    return max(5, min(200, 100000 // words))
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of pre-sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = (len(sorted_samples) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (rank - lower)
+
+async def build_targets() -> Dict[str, Callable[[str], Awaitable[Any]]]:
+    """Initialize every service under test and return one async call per target"""
+    from services.safety_detector import SafetyDetector
+    from services.quality_scorer import QualityScorer
+    from services.enhanced_bias_detector import EnhancedBiasDetector
+    from services.predictive_risk_assessor import PredictiveRiskAssessor, RISK_FACTOR_COLUMNS
+    from services.enhanced_kidgpt import EnhancedKidGPTService
+    import httpx
+    import numpy as np
+    import main
+    
+    safety_detector = SafetyDetector()
+    quality_scorer = QualityScorer()
+    bias_detector = EnhancedBiasDetector()
+    risk_assessor = PredictiveRiskAssessor()
+    kidgpt_service = EnhancedKidGPTService()
+    for service in [safety_detector, quality_scorer, risk_assessor, kidgpt_service]:
+        await service.initialize()
+    
+    # Endpoints are exercised in-process through the ASGI app, without network overhead
+    await main.startup_event()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark")
+    headers = {"Authorization": f"Bearer {os.getenv('ML_API_KEY', 'dev-key-123')}"}
+    
+    request_counter = itertools.count()
+    
+    # Batch risk scoring scores one child per word of the content size; the arrays
+    # are built once per size so only the array path is timed
+    risk_arrays: Dict[int, Any] = {}
+    
+    async def risk_batch(content: str):
+        arrays = risk_arrays.get(len(content))
+        if arrays is None:
+            rng = np.random.default_rng(len(content))
+            shape = (len(content.split()), len(RISK_FACTOR_COLUMNS))
+            arrays = risk_arrays[len(content)] = (rng.random(shape), rng.random(shape))
+        risk_assessor.score_risk_arrays(*arrays)
+    
+    async def api_analyze(content: str):
+        # A unique suffix per request measures the cold analysis path, not result cache hits
+        response = await client.post(
+            "/analyze", headers=headers,
+            json={"content": f"{content} #{next(request_counter)}", "content_type": "text", "child_age": 12}
+        )
+        response.raise_for_status()
+    
+    async def api_coach(content: str):
+        response = await client.post(
+            "/coach", headers=headers,
+            json={"message": content, "mode": "resilience", "child_id": "benchmark-child", "child_age": 12}
+        )
+        response.raise_for_status()
+    
+    return {
+        "safety": lambda content: safety_detector.detect_safety(content),
+        "quality": lambda content: quality_scorer.score_quality(content),
+        "bias": lambda content: bias_detector.detect_comprehensive_bias(content, 12),
+        "risk": lambda content: risk_assessor.assess_risk(content, "text", "benchmark-child", 12),
+        "risk_batch": risk_batch,
+        "kidgpt": lambda content: kidgpt_service.generate_response(content, "resilience", "benchmark-child", 12),
+        "api_analyze": api_analyze,
+        "api_coach": api_coach
+    }
+
+async def measure(
+    call: Callable[[str], Awaitable[Any]],
+    content: str,
+    iterations: int,
+    warmup: int = DEFAULT_WARMUP
+) -> List[float]:
+    """Run a target repeatedly and return per-call latencies in seconds"""
+    for _ in range(warmup):
+        await call(content)
+    
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call(content)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def summarize(target: str, size: str, words: int, samples: List[float]) -> BenchmarkResult:
+    """Reduce latency samples to percentiles and throughput"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    mean = total / len(ordered)
+    return BenchmarkResult(
+        target=target,
+        size=size,
+        words=words,
+        iterations=len(ordered),
+        p50_ms=percentile(ordered, 50) * 1000,
+        p95_ms=percentile(ordered, 95) * 1000,
+        p99_ms=percentile(ordered, 99) * 1000,
+        mean_ms=mean * 1000,
+        throughput_per_second=len(ordered) / total if total else 0.0,
+        words_per_second=words * len(ordered) / total if total else 0.0
+    )
+
+async def run_benchmarks(
+    targets: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    iterations: Optional[int] = None,
+    warmup: int = DEFAULT_WARMUP
+) -> Dict[str, Any]:
+    """Run the selected targets across the selected content sizes"""
+    available = await build_targets()
+    targets = targets or list(available)
+    sizes = sizes or list(CONTENT_SIZES)
+    
+    unknown = [name for name in targets if name not in available] + [s for s in sizes if s not in CONTENT_SIZES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark targets or sizes: {', '.join(unknown)}")
+    
+    results = []
+    for size in sizes:
+        words = CONTENT_SIZES[size]
+        content = generate_content(words, seed=words)
+        for target in targets:
+            samples = await measure(available[target], content, iterations or default_iterations(words), warmup)
+            results.append(summarize(target, size, words, samples))
+    
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "warmup": warmup
+        },
+        "results": [asdict(result) for result in results]
+    }
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Compare p95 latency per (target, size) against a saved baseline"""
+    baseline_results = {(r["target"], r["size"]): r for r in baseline.get("results", [])}
+    comparisons = []
+    for result in current["results"]:
+        previous = baseline_results.get((result["target"], result["size"]))
+        if previous is None or previous["p95_ms"] <= 0:
+            continue
+        ratio = result["p95_ms"] / previous["p95_ms"]
+        comparisons.append({
+            "target": result["target"],
+            "size": result["size"],
+            "baseline_p95_ms": previous["p95_ms"],
+            "current_p95_ms": result["p95_ms"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold
+        })
+    return comparisons
+
+def format_results(report: Dict[str, Any]) -> str:
+    """Render results as a fixed-width table"""
+    header = f"{'target':<12} {'size':<13} {'words':>6} {'iters':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'words/s':>12}"
+    lines = [header, "-" * len(header)]
+    for r in report["results"]:
+        lines.append(
+            f"{r['target']:<12} {r['size']:<13} {r['words']:>6} {r['iterations']:>5} "
+            f"{r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+            f"{r['throughput_per_second']:>10.1f} {r['words_per_second']:>12.0f}"
+        )
+    return "\n".join(lines)
+
+def format_comparisons(comparisons: List[Dict[str, Any]]) -> str:
+    """Render baseline comparisons, marking regressions"""
+    lines = [f"{'target':<12} {'size':<13} {'base p95':>10} {'now p95':>10} {'ratio':>7}"]
+    for c in comparisons:
+        marker = "  REGRESSION" if c["regression"] else ""
+        lines.append(
+            f"{c['target']:<12} {c['size']:<13} {c['baseline_p95_ms']:>10.3f} "
+            f"{c['current_p95_ms']:>10.3f} {c['ratio']:>7.2f}{marker}"
+        )
+    return "\n".join(lines)
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ML service hot paths")
+    parser.add_argument("--targets", help="Comma-separated targets (default: all)")
+    parser.add_argument("--sizes", help=f"Comma-separated sizes from {', '.join(CONTENT_SIZES)} (default: all)")
+    parser.add_argument("--iterations", type=int, help="Iterations per target and size (default: scaled by size)")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--output", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Relative p95 slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    
+    # Per-request INFO logging would dominate the measurements
+    logging.disable(logging.INFO)
+    
+    report = asyncio.run(run_benchmarks(
+        targets=args.targets.split(",") if args.targets else None,
+        sizes=args.sizes.split(",") if args.sizes else None,
+        iterations=args.iterations,
+        warmup=args.warmup
+    ))
+    print(format_results(report))
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline written to {args.output}")
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        comparisons = compare_to_baseline(report, baseline, args.threshold)
+        print()
+        print(format_comparisons(comparisons))
+        if args.fail_on_regression and any(c["regression"] for c in comparisons):
+            return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
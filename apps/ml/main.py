@@ -1,19 +1,22 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
+import asyncio
+import codecs
+import json
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 
-from services.content_analyzer import ContentAnalyzer
-from services.kidgpt import KidGPTService
-from services.safety_detector import SafetyDetector
-from services.bias_detector import BiasDetector
-from services.quality_scorer import QualityScorer
+from services.registry import build_service_registry
+from services.feature_flags import feature_flag_service
 from utils.auth import verify_api_key
+from utils.worker_health import WorkerHealthBoard
 from utils.logging import setup_logging
 
 # Load environment variables
@@ -43,12 +46,20 @@ app.add_middleware(
 # Security
 security = HTTPBearer()
 
-# Initialize services
-content_analyzer = ContentAnalyzer()
-safety_detector = SafetyDetector()
-bias_detector = BiasDetector()
-quality_scorer = QualityScorer()
-kidgpt_service = KidGPTService()
+# Upper bound on items accepted by /analyze/batch
+MAX_BATCH_SIZE = int(os.getenv("ML_MAX_BATCH_SIZE", 1000))
+
+# Initialize services; each is built once and shared by every endpoint
+service_registry = build_service_registry()
+content_analyzer = service_registry.get("content_analyzer")
+safety_detector = service_registry.get("safety_detector")
+bias_detector = service_registry.get("bias_detector")
+quality_scorer = service_registry.get("quality_scorer")
+kidgpt_service = service_registry.get("kidgpt_service")
+streaming_analyzer = service_registry.get("streaming_analyzer")
+
+# Set by serve.py when running as pre-forked workers
+worker_health: Optional[WorkerHealthBoard] = None
 
 # Pydantic models
 class ContentAnalysisRequest(BaseModel):
@@ -63,6 +74,7 @@ class ContentAnalysisResponse(BaseModel):
     safety_confidence: float
     safety_flags: List[str]
     safety_evidence: List[str]
+    safety_evidence_spans: List[Dict[str, Any]] = []
     
     quality_score: int
     quality_confidence: float
@@ -79,12 +91,29 @@ class ContentAnalysisResponse(BaseModel):
     age_fit: str
     recommendations: List[str]
     overall_confidence: float
+    degraded_stages: List[str] = []
+    short_circuited_stages: List[str] = []
+    prefilter_verdict: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[ContentAnalysisRequest]
+
+class BatchAnalysisItemResult(BaseModel):
+    index: int
+    result: Optional[ContentAnalysisResponse] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchAnalysisItemResult]
+    succeeded: int
+    failed: int
 
 class KidGPTRequest(BaseModel):
     message: str
     mode: str  # 'homework', 'curiosity', 'resilience', 'digital'
     child_id: Optional[str] = None
     child_age: Optional[int] = None
+    conversation_id: Optional[str] = None
     explain_like_12: bool = False
 
 class KidGPTResponse(BaseModel):
@@ -94,10 +123,16 @@ class KidGPTResponse(BaseModel):
     mode: str  # 'regular' or 'simple'
     confidence: float
 
+class ConversationSafetyRequest(BaseModel):
+    conversation_id: str
+    message: str
+    content_type: str = "chat"
+
 class HealthResponse(BaseModel):
     status: str
     services: Dict[str, str]
     timestamp: str
+    workers: Optional[List[Dict[str, Any]]] = None
 
 @app.on_event("startup")
 async def startup_event():
@@ -105,23 +140,32 @@ async def startup_event():
     try:
         logger.info("Initializing ML services...")
         
-        # Initialize models (this would load the actual ML models)
-        await content_analyzer.initialize()
-        await safety_detector.initialize()
-        await bias_detector.initialize()
-        await quality_scorer.initialize()
-        await kidgpt_service.initialize()
+        # Initialize models once each (this would load the actual ML models)
+        await service_registry.initialize_all()
+        
+        # Follow live flag changes from this worker's own event loop
+        await feature_flag_service.start_watching()
         
         logger.info("ML services initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize ML services: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending history writes on shutdown"""
+    try:
+        await feature_flag_service.stop_watching()
+        await service_registry.shutdown_all()
+    except Exception as e:
+        logger.error(f"Failed to shut down ML services cleanly: {e}")
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    workers = worker_health.snapshot() if worker_health else None
     return HealthResponse(
-        status="healthy",
+        status="healthy" if not workers or all(w["healthy"] for w in workers) else "degraded",
         services={
             "content_analyzer": "ready",
             "safety_detector": "ready",
@@ -129,7 +173,8 @@ async def health_check():
             "quality_scorer": "ready",
             "kidgpt": "ready"
         },
-        timestamp=__import__("datetime").datetime.now().isoformat()
+        timestamp=__import__("datetime").datetime.now().isoformat(),
+        workers=workers
     )
 
 @app.post("/analyze", response_model=ContentAnalysisResponse)
@@ -170,6 +215,97 @@ async def analyze_content(
         logger.error(f"Content analysis failed: {e}")
         raise HTTPException(status_code=500, detail="Content analysis failed")
 
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_content_batch(
+    request: BatchAnalysisRequest,
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Analyze many content items in one request with per-item results and errors
+    """
+    # Verify API key
+    if not verify_api_key(credentials.credentials):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (max {MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        logger.info(f"Analyzing batch of {len(request.items)} items")
+        
+        results = await content_analyzer.analyze_many(
+            [item.model_dump() for item in request.items]
+        )
+        
+        # Log analysis for monitoring
+        for item, entry in zip(request.items, results):
+            if entry["result"] is not None:
+                background_tasks.add_task(
+                    content_analyzer.log_analysis,
+                    item.content_type,
+                    entry["result"]
+                )
+        
+        failed = sum(1 for entry in results if entry["error"] is not None)
+        return BatchAnalysisResponse(
+            results=results,
+            succeeded=len(results) - failed,
+            failed=failed
+        )
+        
+    except Exception as e:
+        logger.error(f"Batch content analysis failed: {e}")
+        raise HTTPException(status_code=500, detail="Batch content analysis failed")
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request body is still being read
+    StreamingResponse normally listens for disconnects on `receive` alongside the body,
+    which swallows the upload's http.request messages; here the body reader
+    (request.stream()) is the only consumer and raises ClientDisconnect itself
+    """
+    
+    async def listen_for_disconnect(self, receive):
+        await asyncio.Event().wait()
+
+@app.post("/analyze/stream")
+async def analyze_content_stream(
+    request: Request,
+    content_type: str = "text",
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Analyze a chunked UTF-8 text upload incrementally
+    Streams NDJSON events: a running result per window, early safety and crisis
+    alerts, and a final result once the upload completes
+    """
+    if not verify_api_key(credentials.credentials):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    session = await streaming_analyzer.session(content_type=content_type)
+    logger.info(f"Streaming analysis of content type: {content_type}")
+    
+    async def events():
+        # Multi-byte characters may be split across upload chunks
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            async for chunk in request.stream():
+                for event in session.feed(decoder.decode(chunk)):
+                    yield json.dumps(event) + "\n"
+            for event in session.feed(decoder.decode(b"", final=True)) + session.finish():
+                yield json.dumps(event) + "\n"
+        except ClientDisconnect:
+            logger.info("Client disconnected during streaming analysis")
+        except Exception as e:
+            logger.error(f"Streaming content analysis failed: {e}")
+            yield json.dumps({"event": "error", "detail": "Streaming content analysis failed"}) + "\n"
+    
+    return UploadStreamingResponse(events(), media_type="application/x-ndjson")
+
 @app.post("/coach", response_model=KidGPTResponse)
 async def ask_kidgpt(
     request: KidGPTRequest,
@@ -190,10 +326,18 @@ async def ask_kidgpt(
             message=request.message,
             mode=request.mode,
             child_age=request.child_age or 12,
-            child_id=request.child_id
+            child_id=request.child_id,
+            conversation_id=request.conversation_id
         )
         
-        return response
+        # Services return the reply text under "response"; the API exposes it as "content"
+        return KidGPTResponse(
+            content=response["response"],
+            citations=response.get("citations"),
+            safety_flags=response.get("safety_flags"),
+            mode=response["mode"],
+            confidence=response["confidence"]
+        )
         
     except Exception as e:
         logger.error(f"KidGPT request failed: {e}")
@@ -218,6 +362,40 @@ async def check_safety(
         logger.error(f"Safety check failed: {e}")
         raise HTTPException(status_code=500, detail="Safety check failed")
 
+@app.post("/safety/conversation")
+async def check_conversation_safety(
+    request: ConversationSafetyRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Add a chat message to a conversation and return safety for the whole conversation
+    Only the new message is scanned
+    """
+    if not verify_api_key(credentials.credentials):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    try:
+        return await safety_detector.detect_conversation_safety(
+            request.conversation_id, request.message, request.content_type
+        )
+    except Exception as e:
+        logger.error(f"Conversation safety check failed: {e}")
+        raise HTTPException(status_code=500, detail="Conversation safety check failed")
+
+@app.delete("/safety/conversation/{conversation_id}")
+async def end_conversation_safety(
+    conversation_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Forget a conversation's running safety state
+    """
+    if not verify_api_key(credentials.credentials):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    safety_detector.end_conversation(conversation_id)
+    return {"conversation_id": conversation_id, "ended": True}
+
 @app.post("/bias/detect")
 async def detect_bias(
     content: str,
@@ -272,7 +450,9 @@ async def get_models_status(
             "safety_detector": await safety_detector.get_status(),
             "bias_detector": await bias_detector.get_status(),
             "quality_scorer": await quality_scorer.get_status(),
-            "kidgpt": await kidgpt_service.get_status()
+            "kidgpt": await kidgpt_service.get_status(),
+            "streaming_analyzer": await streaming_analyzer.get_status(),
+            "feature_flags": await feature_flag_service.get_status()
         }
     except Exception as e:
         logger.error(f"Failed to get models status: {e}")
@@ -0,0 +1,207 @@
+"""
+Production launcher for the ML service
+Preloads every detector once, then forks workers that share it copy-on-write
+
+Usage:
+    python serve.py --workers 4 --port 8001
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from utils.lazy_import import load_lazy_modules
+from utils.worker_health import WorkerHealthBoard
+
+logger = logging.getLogger("ml_service.serve")
+
+# Seconds between worker heartbeats written to shared memory
+HEARTBEAT_INTERVAL_SECONDS = 1.0
+
+# Minimum time between respawns of the same crashing worker slot
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the ML service with pre-forked workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ML_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8001)))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("ML_GRACEFUL_TIMEOUT", 30)),
+                        help="Seconds to wait for workers to drain before killing them")
+    return parser.parse_args(argv)
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket created once in the parent and inherited by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def preload(board: WorkerHealthBoard):
+    """
+    Import the app and initialize every service in the parent
+    Compiled automata, vocabularies and model weights are then frozen out of
+    the garbage collector so workers never write to (and copy) those pages
+    """
+    import main
+    
+    main.worker_health = board
+    asyncio.run(main.service_registry.initialize_all())
+    # Services defer numpy and friends to first use; import them here so workers
+    # share them instead of each paying the import on its first request
+    logger.info(f"Preloaded modules: {', '.join(load_lazy_modules())}")
+    
+    @main.app.on_event("startup")
+    async def start_heartbeat():
+        async def heartbeat():
+            while True:
+                board.beat()
+                await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+        main.app.state.heartbeat_task = asyncio.get_running_loop().create_task(heartbeat())
+    
+    @main.app.middleware("http")
+    async def count_requests(request, call_next):
+        board.count_request()
+        return await call_next(request)
+    
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+def run_worker(index: int, app, sock: socket.socket, board: WorkerHealthBoard, log_level: str):
+    """Worker process body: serve on the inherited socket until told to stop"""
+    board.attach(index)
+    # Parent-only signal handling must not leak into workers; uvicorn installs its own
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+class WorkerSupervisor:
+    """Forks, monitors and gracefully stops the worker processes"""
+    
+    def __init__(self, app, sock: socket.socket, board: WorkerHealthBoard, log_level: str, graceful_timeout: float):
+        self.app = app
+        self.sock = sock
+        self.board = board
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, int] = {}  # pid -> slot index
+        self.last_spawn: Dict[int, float] = {}
+        self.stopping = False
+    
+    def spawn(self, index: int, restart: bool = False):
+        """Fork one worker into slot `index`"""
+        self.last_spawn[index] = time.monotonic()
+        # Shared state the child may read must be written before it exists
+        if restart:
+            self.board.record_restart(index)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(index, self.app, self.sock, self.board, self.log_level)
+            finally:
+                os._exit(0)
+        
+        self.board.register_worker(index, pid)
+        self.workers[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+    
+    def run(self):
+        """Start every worker and supervise until SIGTERM/SIGINT"""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        
+        for index in range(self.board.workers):
+            self.spawn(index)
+        
+        # Poll rather than block in waitpid: signal handlers only set a flag and
+        # blocking system calls are transparently restarted after them
+        while not self.stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            
+            index = self.workers.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+            wait = RESPAWN_BACKOFF_SECONDS - (time.monotonic() - self.last_spawn.get(index, 0))
+            if wait > 0:
+                time.sleep(wait)
+            if not self.stopping:
+                self.spawn(index, restart=True)
+        
+        self.stop()
+    
+    def stop(self):
+        """Forward SIGTERM so workers drain and run their shutdown hooks, then reap them"""
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.1)
+                continue
+            index = self.workers.pop(pid, None)
+            logger.info(f"Worker {index} (pid {pid}) stopped")
+        
+        for pid, index in list(self.workers.items()):
+            logger.warning(f"Worker {index} (pid {pid}) did not stop in time, killing")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+    
+    def _request_stop(self, signum, frame):
+        logger.info(f"Received signal {signum}, shutting down workers")
+        self.stopping = True
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.workers < 1:
+        print("--workers must be at least 1", file=sys.stderr)
+        return 2
+    
+    board = WorkerHealthBoard(args.workers, heartbeat_interval=HEARTBEAT_INTERVAL_SECONDS)
+    sock = bind_socket(args.host, args.port)
+    app = preload(board)
+    
+    logger.info(f"Serving on {args.host}:{args.port} with {args.workers} workers")
+    supervisor = WorkerSupervisor(app, sock, board, args.log_level, args.graceful_timeout)
+    supervisor.run()
+    sock.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
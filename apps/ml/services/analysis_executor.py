@@ -0,0 +1,234 @@
+"""
+Analysis Executor
+Process-pool offload for CPU-bound analysis of large content
+"""
+
+from typing import Dict, Optional, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+
+from .text_preprocessor import PreprocessedText
+
+logger = logging.getLogger(__name__)
+
+# Detectors and event loop owned by each pool worker, built on its first task
+_worker_services: Dict[str, Any] = {}
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_worker_services() -> Dict[str, Any]:
+    """Build and initialize this worker's detectors once"""
+    global _worker_loop
+    if _worker_services:
+        return _worker_services
+    
+    from .safety_detector import SafetyDetector
+    from .quality_scorer import QualityScorer
+    from .enhanced_bias_detector import EnhancedBiasDetector
+    from .bias_detector import BiasDetector
+    
+    _worker_loop = asyncio.new_event_loop()
+    enhanced_bias_detector = EnhancedBiasDetector()
+    services = {
+        "safety": SafetyDetector(),
+        "quality": QualityScorer(),
+        "enhanced_bias": enhanced_bias_detector,
+        "bias": BiasDetector(enhanced_detector=enhanced_bias_detector)
+    }
+    for name in ("safety", "quality", "bias"):
+        _worker_loop.run_until_complete(services[name].initialize())
+    
+    _worker_services.update(services)
+    return _worker_services
+
+def _worker_ready() -> bool:
+    """Pool warm-up task; the pool initializer has already built the detectors"""
+    return bool(_get_worker_services())
+
+def run_analysis_stage(
+    stage: str,
+    content: str,
+    content_type: str,
+    child_age: int,
+    cultural_context: str,
+    synthesize_perspectives: bool = True
+) -> Tuple[Dict[str, Any], float]:
+    """Pool entry point: run one analysis stage and return (result, busy seconds)"""
+    started = time.perf_counter()
+    services = _get_worker_services()
+    text = PreprocessedText.from_text(content)
+    
+    if stage == "safety":
+        coroutine = services["safety"].detect_safety(content, content_type, text)
+    elif stage == "quality":
+        coroutine = services["quality"].score_quality(content, content_type, text)
+    elif stage == "enhanced_bias":
+        coroutine = services["enhanced_bias"].detect_comprehensive_bias(
+            content, child_age, cultural_context, text, synthesize_perspectives
+        )
+    elif stage == "bias":
+        coroutine = services["bias"].detect_bias(content, content_type, text)
+    else:
+        raise ValueError(f"Stage cannot be offloaded: {stage}")
+    
+    result = _worker_loop.run_until_complete(coroutine)
+    return result, time.perf_counter() - started
+
+class AnalysisExecutor:
+    """
+    Sends analysis of large content to a process pool
+    Content shorter than `offload_threshold_chars` is analyzed inline, where the
+    pickling round trip would cost more than the scan itself. The pool is created
+    on first use, so each pre-forked server worker gets its own
+    Spawning workers and building their detectors takes far longer than a stage, so
+    callers await warm_up() before timing offloaded stages against `stage_timeout`
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        offload_threshold_chars: int = 50000,
+        start_method: str = "spawn",
+        stage_timeout: Optional[float] = 30.0
+    ):
+        self.max_workers = max(1, (os.cpu_count() or 2) // 2) if max_workers is None else max_workers
+        self.offload_threshold_chars = offload_threshold_chars
+        self.start_method = start_method
+        self.stage_timeout = stage_timeout
+        
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._warm_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_started_at: Optional[float] = None
+        self._in_flight = 0
+        self._busy_seconds = 0.0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "pool_restarts": 0
+        }
+    
+    @classmethod
+    def from_env(cls) -> "AnalysisExecutor":
+        """
+        Build from ANALYSIS_OFFLOAD_WORKERS, _THRESHOLD_CHARS, _START_METHOD and
+        _STAGE_TIMEOUT_SECONDS; 0 workers disables offload
+        """
+        workers = os.getenv("ANALYSIS_OFFLOAD_WORKERS")
+        return cls(
+            max_workers=int(workers) if workers else None,
+            offload_threshold_chars=int(os.getenv("ANALYSIS_OFFLOAD_THRESHOLD_CHARS", 50000)),
+            start_method=os.getenv("ANALYSIS_OFFLOAD_START_METHOD", "spawn"),
+            stage_timeout=float(os.getenv("ANALYSIS_OFFLOAD_STAGE_TIMEOUT_SECONDS", 30.0))
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0 and self.offload_threshold_chars > 0
+    
+    def should_offload(self, content: str) -> bool:
+        """Whether content is large enough to analyze out of process"""
+        return self.enabled and len(content) >= self.offload_threshold_chars
+    
+    async def warm_up(self):
+        """Start the pool and build every worker's detectors, outside any stage timeout"""
+        if not self.enabled:
+            return
+        pool = self._ensure_pool()
+        if self._warm_pool is pool:
+            return
+        
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(
+                loop.run_in_executor(pool, _worker_ready) for _ in range(self.max_workers)
+            ))
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+        if self._pool is pool:
+            self._warm_pool = pool
+            logger.info(f"Analysis offload pool warm after {time.perf_counter() - started:.2f}s")
+    
+    async def run_stage(
+        self,
+        stage: str,
+        content: str,
+        content_type: str,
+        child_age: int,
+        cultural_context: str = "western",
+        synthesize_perspectives: bool = True
+    ) -> Dict[str, Any]:
+        """Run one analysis stage in the pool without blocking the event loop"""
+        pool = self._ensure_pool()
+        self._counters["submitted"] += 1
+        self._in_flight += 1
+        try:
+            result, busy_seconds = await asyncio.get_running_loop().run_in_executor(
+                pool, run_analysis_stage, stage, content, content_type, child_age, cultural_context,
+                synthesize_perspectives
+            )
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; replace it for the next request
+            self._counters["failed"] += 1
+            self._discard_pool(pool)
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+        
+        self._counters["completed"] += 1
+        self._busy_seconds += busy_seconds
+        return result
+    
+    def shutdown(self):
+        """Stop the pool without waiting for queued work"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._warm_pool = None
+            self._pool_started_at = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and utilization of the offload pool"""
+        uptime = time.monotonic() - self._pool_started_at if self._pool_started_at else 0.0
+        capacity_seconds = uptime * self.max_workers
+        return {
+            "enabled": self.enabled,
+            "started": self._pool is not None,
+            "warm": self._pool is not None and self._warm_pool is self._pool,
+            "max_workers": self.max_workers,
+            "offload_threshold_chars": self.offload_threshold_chars,
+            "stage_timeout": self.stage_timeout,
+            **self._counters,
+            "in_flight": self._in_flight,
+            "active_workers": min(self._in_flight, self.max_workers),
+            "queue_depth": max(0, self._in_flight - self.max_workers),
+            "busy_seconds": round(self._busy_seconds, 3),
+            "utilization": round(min(1.0, self._busy_seconds / capacity_seconds), 4) if capacity_seconds else 0.0
+        }
+    
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_get_worker_services
+            )
+            self._pool_started_at = time.monotonic()
+            logger.info(f"Started analysis offload pool with {self.max_workers} workers")
+        return self._pool
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        if self._pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._warm_pool = None
+            self._counters["pool_restarts"] += 1
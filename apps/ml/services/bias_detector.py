@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Any
 import asyncio
 import logging
 from .enhanced_bias_detector import EnhancedBiasDetector
+from .text_preprocessor import PreprocessedText
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +17,15 @@ class BiasDetector:
     Delegates to enhanced bias detector while maintaining existing API
     """
     
-    def __init__(self):
-        self.enhanced_detector = EnhancedBiasDetector()
+    def __init__(self, enhanced_detector: Optional[EnhancedBiasDetector] = None):
+        self.enhanced_detector = enhanced_detector or EnhancedBiasDetector()
         self.initialized = False
     
     async def initialize(self):
         """Initialize the bias detector"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing legacy bias detector...")
             self.initialized = True
@@ -30,7 +34,12 @@ class BiasDetector:
             logger.error(f"Failed to initialize bias detector: {e}")
             raise
     
-    async def detect_bias(self, content: str, content_type: str = "text") -> Dict[str, Any]:
+    async def detect_bias(
+        self, 
+        content: str, 
+        content_type: str = "text",
+        preprocessed: Optional[PreprocessedText] = None
+    ) -> Dict[str, Any]:
         """
         Legacy bias detection interface
         Returns simplified response for backward compatibility
@@ -56,4 +65,11 @@ class BiasDetector:
                 "stereotypes": [],
                 "framing": "unknown",
                 "missing_perspectives": []
-            }
\ No newline at end of file
+            }
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get bias detector status"""
+        return {
+            "initialized": self.initialized,
+            "mode": "legacy"
+        }
\ No newline at end of file
@@ -3,41 +3,93 @@ Content Analyzer Service
 Main orchestrator for content analysis including enhanced features
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import asyncio
+import copy
 import logging
+import os
 from datetime import datetime
 from .enhanced_bias_detector import EnhancedBiasDetector
 from .bias_detector import BiasDetector
 from .safety_detector import SafetyDetector
 from .quality_scorer import QualityScorer
 from .predictive_risk_assessor import PredictiveRiskAssessor
+from .analysis_executor import AnalysisExecutor
+from .stage_scheduler import Stage, StageResults, StageScheduler
+from .evaluation_policy import EvaluationPolicy
+from .content_prefilter import ContentPrefilter, VERDICT_CLEAN
+from .enhanced_kidgpt import EnhancedKidGPTService
+from .text_preprocessor import PreprocessedText
+from .result_cache import AnalysisResultCache
 from .feature_flags import (
     feature_flag_service, 
     FeatureFlag,
-    is_enhanced_bias_detection_enabled,
-    is_predictive_risk_assessment_enabled,
-    is_cultural_bias_analysis_enabled
+    FlagContext,
+    age_band_name
 )
 
 logger = logging.getLogger(__name__)
 
+# Items of one batch analyzed at the same time
+BATCH_CONCURRENCY = int(os.getenv("ANALYSIS_BATCH_CONCURRENCY", 8))
+
+# Per-stage timeout for the concurrent analysis stages; offloaded stages use the
+# analysis executor's own timeout
+STAGE_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_STAGE_TIMEOUT_SECONDS", 5.0))
+
+# Threads for CPU-bound stages, and how many more may queue behind them before
+# further stages degrade as saturated
+STAGE_WORKERS = int(os.getenv("ANALYSIS_STAGE_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+STAGE_MAX_PENDING = int(os.getenv("ANALYSIS_STAGE_MAX_PENDING", STAGE_WORKERS))
+
+# Content up to this size is scanned directly on the event loop; the scans finish far
+# inside the stage timeout and the executor hop would dominate their latency
+INLINE_STAGE_MAX_CHARS = int(os.getenv("ANALYSIS_INLINE_STAGE_MAX_CHARS", 20000))
+
 class ContentAnalyzer:
     """
     Enhanced Content Analyzer with feature flag support
     Orchestrates all analysis services while maintaining backward compatibility
     """
     
-    def __init__(self):
-        self.safety_detector = SafetyDetector()
-        self.bias_detector = BiasDetector()
-        self.quality_scorer = QualityScorer()
-        self.enhanced_bias_detector = EnhancedBiasDetector()
-        self.risk_assessor = PredictiveRiskAssessor()
+    def __init__(
+        self,
+        safety_detector: Optional[SafetyDetector] = None,
+        bias_detector: Optional[BiasDetector] = None,
+        quality_scorer: Optional[QualityScorer] = None,
+        enhanced_bias_detector: Optional[EnhancedBiasDetector] = None,
+        risk_assessor: Optional[PredictiveRiskAssessor] = None,
+        analysis_executor: Optional[AnalysisExecutor] = None,
+        evaluation_policy: Optional[EvaluationPolicy] = None,
+        kidgpt_service: Optional[EnhancedKidGPTService] = None,
+        prefilter: Optional[ContentPrefilter] = None
+    ):
+        # Detectors are shared with the rest of the process when injected
+        self.enhanced_bias_detector = enhanced_bias_detector or EnhancedBiasDetector()
+        self.safety_detector = safety_detector or SafetyDetector()
+        self.bias_detector = bias_detector or BiasDetector(enhanced_detector=self.enhanced_bias_detector)
+        self.quality_scorer = quality_scorer or QualityScorer()
+        self.risk_assessor = risk_assessor or PredictiveRiskAssessor()
+        self.stage_scheduler = StageScheduler(
+            default_timeout=STAGE_TIMEOUT_SECONDS,
+            max_workers=STAGE_WORKERS,
+            max_pending=STAGE_MAX_PENDING
+        )
+        self.result_cache = AnalysisResultCache.from_env()
+        self.analysis_executor = analysis_executor or AnalysisExecutor.from_env()
+        self.evaluation_policy = evaluation_policy or EvaluationPolicy.from_env()
+        # Crisis patterns feed the pre-filter vocabulary
+        self.kidgpt_service = kidgpt_service or EnhancedKidGPTService()
+        self.prefilter = prefilter  # built in initialize() when ANALYSIS_PREFILTER_ENABLED is set
+        self.inline_stage_max_chars = INLINE_STAGE_MAX_CHARS
+        self.batch_concurrency = BATCH_CONCURRENCY
         self.initialized = False
     
     async def initialize(self):
         """Initialize all analysis services"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing content analyzer...")
             
@@ -49,12 +101,29 @@ class ContentAnalyzer:
             await self.quality_scorer.initialize()
             await self.risk_assessor.initialize()
             
+            if self.prefilter is None and ContentPrefilter.enabled_from_env():
+                try:
+                    self.prefilter = ContentPrefilter.from_services(
+                        self.safety_detector,
+                        self.enhanced_bias_detector,
+                        self.kidgpt_service,
+                        audit_sample_rate=ContentPrefilter.audit_sample_rate_from_env()
+                    )
+                except ValueError as e:
+                    logger.warning(f"Content pre-filter disabled: {e}")
+            
             self.initialized = True
             logger.info("Content analyzer initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize content analyzer: {e}")
             raise
     
+    async def shutdown(self):
+        """Flush write-behind state and stop the offload pool before the process exits"""
+        await self.risk_assessor.shutdown()
+        self.analysis_executor.shutdown()
+        self.stage_scheduler.shutdown()
+    
     async def analyze(
         self, 
         content: str, 
@@ -63,7 +132,8 @@ class ContentAnalyzer:
         source: Optional[str] = None,
         uri: Optional[str] = None,
         child_id: Optional[str] = None,
-        cultural_context: str = "western"
+        cultural_context: str = "western",
+        flag_context: Optional[FlagContext] = None
     ) -> Dict[str, Any]:
         """
         Enhanced content analysis with feature flag support
@@ -73,76 +143,416 @@ class ContentAnalyzer:
             await self.initialize()
         
         try:
-            # Core analysis (always present for backward compatibility)
-            safety_result = await self.safety_detector.detect_safety(content, content_type)
-            quality_result = await self.quality_scorer.score_quality(content, content_type)
-            
-            # Choose bias detection based on feature flag
-            if await is_enhanced_bias_detection_enabled(child_age, child_id or ""):
-                bias_result = await self.enhanced_bias_detector.detect_comprehensive_bias(
-                    content, child_age, cultural_context
-                )
-            else:
-                bias_result = await self.bias_detector.detect_bias(content, content_type)
-            
-            # Predictive risk assessment (new feature)
-            risk_assessment = None
-            if await is_predictive_risk_assessment_enabled(child_age, child_id or "") and child_id:
-                risk_assessment = await self.risk_assessor.assess_risk(
-                    content, content_type, child_id, child_age
+            return await self._analyze_content(
+                content, content_type, child_age, child_id, cultural_context,
+                flags=self._evaluate_flags(child_age, child_id, flag_context)
+            )
+        except Exception as e:
+            logger.error(f"Content analysis failed: {e}")
+            # Return minimal safe response for backward compatibility
+            return self._get_fallback_response()
+    
+    async def analyze_many(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batch content analysis sharing work across items
+        Up to `batch_concurrency` items are analyzed at once. Returns one entry per
+        item, in item order, with either a result or an error
+        """
+        if not self.initialized:
+            await self.initialize()
+        
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        flag_cache: Dict[Tuple[int, str], Dict[str, bool]] = {}
+        shared_analyses: Dict[Tuple[str, str, int, str], asyncio.Future] = {}
+        child_locks: Dict[str, asyncio.Lock] = {}
+        
+        async def analyze(content, content_type, child_age, child_id, cultural_context, flags):
+            async with semaphore:
+                return await self._analyze_content(
+                    content, content_type, child_age, child_id, cultural_context, flags=flags
                 )
-            
-            # Build response (backward compatible + enhanced features)
-            response = {
-                # Core fields (backward compatibility)
-                "safety_score": safety_result["safety_score"],
-                "safety_confidence": safety_result["safety_confidence"],
-                "safety_flags": safety_result["safety_flags"],
-                "safety_evidence": safety_result["safety_evidence"],
+        
+        async def analyze_item(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                content = item["content"]
+                content_type = item.get("content_type", "text")
+                child_age = item["child_age"]
+                child_id = item.get("child_id")
+                cultural_context = item.get("cultural_context") or "western"
                 
-                "quality_score": quality_result["quality_score"],
-                "quality_confidence": quality_result["quality_confidence"],
-                "factuality": quality_result["factuality"],
-                "depth": quality_result["depth"],
-                "clarity": quality_result["clarity"],
+                # Flags only depend on (age, child) so evaluate them once per pair
+                flag_key = (child_age, child_id or "")
+                if flag_key not in flag_cache:
+                    flag_cache[flag_key] = self._evaluate_flags(child_age, child_id)
+                flags = flag_cache[flag_key]
                 
-                "bias_score": bias_result["bias_score"],
-                "bias_confidence": bias_result["bias_confidence"],
-                "stereotypes": bias_result["stereotypes"],
-                "framing": bias_result["framing"],
-                "missing_perspectives": bias_result["missing_perspectives"],
+                if child_id is None:
+                    # Identical anonymous items are analyzed once and share the result
+                    dedupe_key = (content, content_type, child_age, cultural_context)
+                    shared = shared_analyses.get(dedupe_key)
+                    if shared is None:
+                        shared = shared_analyses[dedupe_key] = asyncio.ensure_future(
+                            analyze(content, content_type, child_age, None, cultural_context, flags)
+                        )
+                    result = copy.deepcopy(await shared)
+                else:
+                    # Items with a child_id update per-child risk history, so one
+                    # child's items are analyzed one at a time, in batch order
+                    async with child_locks.setdefault(child_id, asyncio.Lock()):
+                        result = await analyze(
+                            content, content_type, child_age, child_id, cultural_context, flags
+                        )
                 
-                "age_fit": self._determine_age_fit(content, child_age),
-                "recommendations": self._generate_recommendations(
-                    safety_result, quality_result, bias_result, child_age
-                ),
-                "overall_confidence": self._calculate_overall_confidence(
-                    safety_result, quality_result, bias_result
+                return {"index": index, "result": result, "error": None}
+            except Exception as e:
+                logger.error(f"Batch content analysis failed for item {index}: {e}")
+                return {"index": index, "result": None, "error": "Content analysis failed"}
+        
+        return list(await asyncio.gather(*(analyze_item(index, item) for index, item in enumerate(items))))
+    
+    def _evaluate_flags(
+        self,
+        child_age: int,
+        child_id: Optional[str],
+        flag_context: Optional[FlagContext] = None
+    ) -> Dict[str, bool]:
+        """Pipeline switches from the request's flag snapshot, evaluating it if not given"""
+        if flag_context is None:
+            flag_context = feature_flag_service.context(child_age, child_id)
+        return {
+            "enhanced_bias": flag_context.is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION),
+            "risk_assessment": flag_context.is_enabled(FeatureFlag.PREDICTIVE_RISK_ASSESSMENT)
+        }
+    
+    async def _analyze_content(
+        self,
+        content: str,
+        content_type: str,
+        child_age: int,
+        child_id: Optional[str] = None,
+        cultural_context: str = "western",
+        flags: Optional[Dict[str, bool]] = None
+    ) -> Dict[str, Any]:
+        """Run the analysis pipeline, raising on failure"""
+        if flags is None:
+            flags = self._evaluate_flags(child_age, child_id)
+        
+        # Large content is scanned in the offload pool so it cannot stall other requests
+        offload = self.analysis_executor.should_offload(content)
+        
+        # Lowercase, tokenize and split sentences once for every inline detector
+        text = None if offload else PreprocessedText.from_text(content)
+        
+        # Content-dependent results are cached per age band; per-child risk assessment never is
+        cache_key = None
+        cached_response = None
+        if self.result_cache.enabled:
+            cache_key = self.result_cache.make_key(
+                content, content_type, age_band_name(child_age), cultural_context,
+                [name for name, enabled in flags.items() if enabled and name != "risk_assessment"]
+            )
+            cached_response = await self.result_cache.get(cache_key)
+        
+        # Content the pre-filter clears skips the detectors it has already ruled out
+        verdict = None
+        if cached_response is None and text is not None and self.prefilter is not None:
+            verdict = self.prefilter.screen(text)
+        
+        # Risk assessment is per child, so it runs even when the rest is cached
+        risk_stage = None
+        if flags["risk_assessment"] and child_id:
+            async def run_risk():
+                preprocessed = text
+                if preprocessed is None:
+                    # Offloaded content is too large to tokenize on the event loop; risk
+                    # assessment itself stays here because it updates per-child history
+                    preprocessed = await asyncio.get_running_loop().run_in_executor(
+                        self.stage_scheduler.executor, PreprocessedText.from_text, content
+                    )
+                return await self.risk_assessor.assess_risk(
+                    content, content_type, child_id, child_age, preprocessed=preprocessed
                 )
-            }
             
-            # Add enhanced features if enabled
-            if await is_enhanced_bias_detection_enabled(child_age, child_id or ""):
-                response.update({
-                    "enhanced_bias_analysis": {
-                        "cultural_analysis": bias_result.get("cultural_analysis"),
-                        "intersectional_factors": bias_result.get("intersectional_factors"),
-                        "balanced_perspectives": bias_result.get("balanced_perspectives"),
-                        "perspective_synthesis": bias_result.get("perspective_synthesis")
-                    }
-                })
+            risk_stage = Stage(name="risk", run=run_risk, fallback=lambda: None)
+        
+        # Pool start-up is paid here, never inside an offloaded stage's timeout
+        if offload and cached_response is None:
+            try:
+                await self.analysis_executor.warm_up()
+            except Exception as e:
+                logger.warning(f"Analysis offload pool failed to start: {e}")
+        
+        policy = self.evaluation_policy
+        response_flags = flags
+        short_circuited: List[str] = []
+        stage_results = StageResults(results={})
+        
+        if cached_response is not None:
+            # The cached safety result decides whether risk assessment is skipped
+            if risk_stage is not None and policy.can_skip("risk"):
+                short_circuited = policy.stages_to_skip(cached_response)
+            stages = [risk_stage] if risk_stage is not None and "risk" not in short_circuited else []
+            self._merge_stage_results(stage_results, await self.stage_scheduler.run(stages))
+        elif verdict == VERDICT_CLEAN:
+            # No indicator matched, so safety is clean and bias needs only the legacy
+            # result, as if enhanced bias detection were off for this item; the
+            # response says so rather than silently dropping the enhanced analysis
+            response_flags = {**flags, "enhanced_bias": False}
+            if flags["enhanced_bias"]:
+                short_circuited = ["enhanced_bias"]
+            stages = self._core_stages(
+                ["quality", "bias"], content, content_type, child_age, cultural_context,
+                response_flags, text, offload
+            )
+            if risk_stage is not None:
+                stages.append(risk_stage)
+            self._merge_stage_results(stage_results, await self.stage_scheduler.run(stages))
+            stage_results.results["safety"] = self.safety_detector.build_result(
+                [], [], [], len(content), content_type
+            )
+        elif policy.enabled:
+            # Only stages a rule could skip wait for the safety result
+            waiting = [name for name in ("quality", "bias") if policy.can_skip(name)]
+            if flags["enhanced_bias"] and policy.can_skip("perspective_synthesis") and "bias" not in waiting:
+                waiting.append("bias")
             
-            if risk_assessment:
-                response.update({
-                    "risk_assessment": risk_assessment
-                })
+            # Tier 1: safety and every stage no rule can skip
+            stages = self._core_stages(
+                [name for name in ("safety", "quality", "bias") if name not in waiting],
+                content, content_type, child_age, cultural_context, flags, text, offload
+            )
+            if risk_stage is not None and not policy.can_skip("risk"):
+                stages.append(risk_stage)
+            self._merge_stage_results(stage_results, await self.stage_scheduler.run(stages))
             
-            return response
+            # A degraded safety score is a placeholder and never short-circuits anything
+            if "safety" not in stage_results.degraded:
+                short_circuited = policy.stages_to_skip(stage_results.results["safety"])
+            if not flags["enhanced_bias"] or "bias" in short_circuited:
+                short_circuited = [name for name in short_circuited if name != "perspective_synthesis"]
             
-        except Exception as e:
-            logger.error(f"Content analysis failed: {e}")
-            # Return minimal safe response for backward compatibility
-            return self._get_fallback_response()
+            # Tier 2: the waiting stages the safety result did not rule out
+            stages = self._core_stages(
+                [name for name in waiting if name not in short_circuited],
+                content, content_type, child_age, cultural_context, flags, text, offload,
+                synthesize_perspectives="perspective_synthesis" not in short_circuited
+            )
+            if risk_stage is not None and policy.can_skip("risk") and "risk" not in short_circuited:
+                stages.append(risk_stage)
+            self._merge_stage_results(stage_results, await self.stage_scheduler.run(stages))
+        else:
+            stages = self._core_stages(
+                ["safety", "quality", "bias"], content, content_type, child_age, cultural_context,
+                flags, text, offload
+            )
+            if risk_stage is not None:
+                stages.append(risk_stage)
+            self._merge_stage_results(stage_results, await self.stage_scheduler.run(stages))
+        
+        if cached_response is not None:
+            response = self._localize_for_age(cached_response, content, child_age)
+        else:
+            response = self._build_response(
+                content,
+                child_age,
+                response_flags,
+                stage_results.results["safety"],
+                stage_results.results.get("quality") or self._get_fallback_quality(),
+                stage_results.results.get("bias") or self._get_fallback_bias(),
+                [name for name in stage_results.degraded if name != "risk"],
+                [name for name in short_circuited if name != "risk"]
+            )
+            response["prefilter_verdict"] = verdict
+            
+            # Degraded results are not cached so the next request retries the failed stage
+            if cache_key is not None and not response["degraded_stages"]:
+                await self.result_cache.set(cache_key, response)
+        
+        if "risk" in stage_results.degraded:
+            response["degraded_stages"].append("risk")
+        if "risk" in short_circuited:
+            response.setdefault("short_circuited_stages", []).append("risk")
+        
+        risk_assessment = stage_results.results.get("risk")
+        if risk_assessment:
+            response.update({
+                "risk_assessment": risk_assessment
+            })
+        
+        return response
+    
+    def _core_stages(
+        self,
+        names: List[str],
+        content: str,
+        content_type: str,
+        child_age: int,
+        cultural_context: str,
+        flags: Dict[str, bool],
+        text: Optional[PreprocessedText],
+        offload: bool,
+        synthesize_perspectives: bool = True
+    ) -> List[Stage]:
+        """Build the named content stages (safety, quality, bias)"""
+        stages = []
+        if offload:
+            bias_stage = "enhanced_bias" if flags["enhanced_bias"] else "bias"
+            if "safety" in names:
+                stages.append(Stage(
+                    name="safety",
+                    run=lambda: self.analysis_executor.run_stage("safety", content, content_type, child_age),
+                    fallback=self._get_fallback_safety,
+                    timeout=self.analysis_executor.stage_timeout
+                ))
+            if "quality" in names:
+                stages.append(Stage(
+                    name="quality",
+                    run=lambda: self.analysis_executor.run_stage("quality", content, content_type, child_age),
+                    fallback=self._get_fallback_quality,
+                    timeout=self.analysis_executor.stage_timeout
+                ))
+            if "bias" in names:
+                stages.append(Stage(
+                    name="bias",
+                    run=lambda: self.analysis_executor.run_stage(
+                        bias_stage, content, content_type, child_age, cultural_context,
+                        synthesize_perspectives
+                    ),
+                    fallback=self._get_fallback_bias,
+                    timeout=self.analysis_executor.stage_timeout
+                ))
+            return stages
+        
+        # Core analysis stages are independent, pure-CPU scans with no await points:
+        # beyond small inputs, run them in the scheduler's executor so their
+        # timeouts apply and other requests keep being served
+        cpu_bound = len(content) > self.inline_stage_max_chars
+        if "safety" in names:
+            stages.append(Stage(
+                name="safety",
+                run=lambda: self.safety_detector.detect_safety(content, content_type, text),
+                fallback=self._get_fallback_safety,
+                cpu_bound=cpu_bound
+            ))
+        if "quality" in names:
+            stages.append(Stage(
+                name="quality",
+                run=lambda: self.quality_scorer.score_quality(content, content_type, text),
+                fallback=self._get_fallback_quality,
+                cpu_bound=cpu_bound
+            ))
+        
+        # Choose bias detection based on feature flag
+        if "bias" in names and flags["enhanced_bias"]:
+            stages.append(Stage(
+                name="bias",
+                run=lambda: self.enhanced_bias_detector.detect_comprehensive_bias(
+                    content, child_age, cultural_context, text, synthesize_perspectives
+                ),
+                fallback=self._get_fallback_bias,
+                cpu_bound=cpu_bound
+            ))
+        elif "bias" in names:
+            stages.append(Stage(
+                name="bias",
+                run=lambda: self.bias_detector.detect_bias(content, content_type, text),
+                fallback=self._get_fallback_bias,
+                cpu_bound=cpu_bound
+            ))
+        return stages
+    
+    @staticmethod
+    def _merge_stage_results(into: StageResults, tier: StageResults):
+        """Fold one tier's results into the request's stage results"""
+        into.results.update(tier.results)
+        into.degraded.extend(tier.degraded)
+        into.errors.update(tier.errors)
+    
+    def _build_response(
+        self,
+        content: str,
+        child_age: int,
+        flags: Dict[str, bool],
+        safety_result: Dict[str, Any],
+        quality_result: Dict[str, Any],
+        bias_result: Dict[str, Any],
+        degraded_stages: List[str],
+        short_circuited_stages: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Build the content-dependent part of the analysis response"""
+        # Build response (backward compatible + enhanced features)
+        response = {
+            # Core fields (backward compatibility)
+            "safety_score": safety_result["safety_score"],
+            "safety_confidence": safety_result["safety_confidence"],
+            "safety_flags": safety_result["safety_flags"],
+            "safety_evidence": safety_result["safety_evidence"],
+            "safety_evidence_spans": safety_result.get("safety_evidence_spans", []),
+            
+            "quality_score": quality_result["quality_score"],
+            "quality_confidence": quality_result["quality_confidence"],
+            "factuality": quality_result["factuality"],
+            "depth": quality_result["depth"],
+            "clarity": quality_result["clarity"],
+            
+            "bias_score": bias_result["bias_score"],
+            "bias_confidence": bias_result["bias_confidence"],
+            "stereotypes": bias_result["stereotypes"],
+            "framing": bias_result["framing"],
+            "missing_perspectives": bias_result["missing_perspectives"],
+            
+            "age_fit": self._determine_age_fit(content, child_age),
+            "recommendations": self._generate_recommendations(
+                safety_result, quality_result, bias_result, child_age
+            ),
+            "overall_confidence": self._calculate_overall_confidence(
+                safety_result, quality_result, bias_result
+            ),
+            "degraded_stages": degraded_stages,
+            "short_circuited_stages": short_circuited_stages or []
+        }
+        
+        # Add enhanced features if enabled
+        if flags["enhanced_bias"]:
+            response.update({
+                "enhanced_bias_analysis": {
+                    "cultural_analysis": bias_result.get("cultural_analysis"),
+                    "intersectional_factors": bias_result.get("intersectional_factors"),
+                    "balanced_perspectives": bias_result.get("balanced_perspectives"),
+                    "perspective_synthesis": bias_result.get("perspective_synthesis")
+                }
+            })
+        
+        return response
+    
+    def _localize_for_age(self, response: Dict[str, Any], content: str, child_age: int) -> Dict[str, Any]:
+        """
+        Redo the fields of a cached response that depend on the exact age
+        Cached responses are shared by every age in a band; age fit, recommendations
+        and the age adaptation of balanced perspectives are cheap to recompute
+        """
+        # The response carries every score and flag recommendations are based on
+        response["age_fit"] = self._determine_age_fit(content, child_age)
+        response["recommendations"] = self._generate_recommendations(response, response, response, child_age)
+        
+        enhanced_bias = response.get("enhanced_bias_analysis")
+        if enhanced_bias and enhanced_bias.get("balanced_perspectives"):
+            enhanced_bias["balanced_perspectives"] = self.enhanced_bias_detector.adapt_for_age(
+                enhanced_bias["balanced_perspectives"], child_age
+            )
+        return response
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get content analyzer status including cache and history counters"""
+        return {
+            "initialized": self.initialized,
+            "result_cache": self.result_cache.stats(),
+            "risk_history": self.risk_assessor.risk_history.stats(),
+            "analysis_executor": self.analysis_executor.stats(),
+            "stage_executor": self.stage_scheduler.stats(),
+            "evaluation_policy": self.evaluation_policy.stats(),
+            "prefilter": self.prefilter.stats() if self.prefilter is not None else {"enabled": False}
+        }
     
     async def log_analysis(self, content_type: str, analysis_result: Dict[str, Any]):
         """Log analysis results for monitoring and improvement"""
@@ -202,24 +612,46 @@ class ContentAnalyzer:
         ]
         return sum(confidences) / len(confidences)
     
-    def _get_fallback_response(self) -> Dict[str, Any]:
-        """Return fallback response in case of errors"""
+    def _get_fallback_safety(self) -> Dict[str, Any]:
+        """Return fallback safety result for a degraded stage"""
         return {
             "safety_score": 50,
             "safety_confidence": 0.5,
             "safety_flags": [],
             "safety_evidence": [],
+            "safety_evidence_spans": []
+        }
+    
+    def _get_fallback_quality(self) -> Dict[str, Any]:
+        """Return fallback quality result for a degraded stage"""
+        return {
             "quality_score": 50,
             "quality_confidence": 0.5,
             "factuality": 50,
             "depth": 50,
-            "clarity": 50,
+            "clarity": 50
+        }
+    
+    def _get_fallback_bias(self) -> Dict[str, Any]:
+        """Return fallback bias result for a degraded stage"""
+        return {
             "bias_score": 50,
             "bias_confidence": 0.5,
             "stereotypes": [],
             "framing": "unknown",
-            "missing_perspectives": [],
+            "missing_perspectives": []
+        }
+    
+    def _get_fallback_response(self) -> Dict[str, Any]:
+        """Return fallback response in case of errors"""
+        return {
+            **self._get_fallback_safety(),
+            **self._get_fallback_quality(),
+            **self._get_fallback_bias(),
             "age_fit": "unknown",
             "recommendations": ["Unable to analyze content at this time"],
-            "overall_confidence": 0.5
+            "overall_confidence": 0.5,
+            "degraded_stages": ["safety", "quality", "bias"],
+            "short_circuited_stages": [],
+            "prefilter_verdict": None
         }
\ No newline at end of file
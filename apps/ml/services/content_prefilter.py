@@ -0,0 +1,136 @@
+"""
+Content Pre-filter
+First-tier screen that clears obviously benign content before the full analysis pipeline
+"""
+
+from typing import Dict, List, Optional, Any, Callable, FrozenSet, Iterable, Tuple
+import os
+import random
+
+from utils.aho_corasick import AhoCorasickAutomaton
+from utils import regex_literals
+from .text_preprocessor import PreprocessedText
+
+# Screen verdicts
+VERDICT_CLEAN = "clean"  # no vocabulary hit, served from the fast path
+VERDICT_AUDIT = "audit"  # no vocabulary hit, sampled through the full pipeline
+VERDICT_HIT = "hit"      # at least one vocabulary hit
+
+class ContentPrefilter:
+    """
+    Screen over the union of every risk vocabulary
+    Terms are matched against the lowercased text with all whitespace removed, so
+    one automaton pass covers substring indicators, space-insensitive bias patterns
+    and the literal anchors every crisis regex match must contain. A miss therefore
+    guarantees no detector would have found anything; a hit may be a false positive
+    Cleared items are served the legacy bias result: enhanced bias analysis and
+    perspective synthesis are skipped for them even when ENHANCED_BIAS_DETECTION is
+    on, and the response lists "enhanced_bias" under short_circuited_stages
+    """
+    
+    def __init__(
+        self,
+        vocabulary: Iterable[Tuple[str, str]],
+        audit_sample_rate: float = 0.0,
+        random_source: Optional[Callable[[], float]] = None
+    ):
+        self.audit_sample_rate = audit_sample_rate
+        self.random_source = random_source or random.random
+        
+        self.matcher = AhoCorasickAutomaton()
+        seen = set()
+        for term, source in vocabulary:
+            term = _strip_whitespace(term.lower())
+            if term and term not in seen:
+                seen.add(term)
+                self.matcher.add(term, source)
+        self.matcher.build()
+        
+        self._counters = {
+            "screened": 0,
+            "cleared": 0,
+            "audited": 0,
+            "hits": 0
+        }
+    
+    @classmethod
+    def from_services(
+        cls,
+        safety_detector: Any,
+        enhanced_bias_detector: Any,
+        kidgpt_service: Any,
+        audit_sample_rate: float = 0.0
+    ) -> "ContentPrefilter":
+        """
+        Collect the vocabularies of the safety, bias and crisis detectors
+        Raises ValueError if a crisis pattern has no derivable literal anchor, since
+        the screen could then clear content that pattern would flag
+        """
+        vocabulary: List[Tuple[str, str]] = []
+        
+        for indicators in safety_detector.safety_categories.values():
+            vocabulary.extend((indicator, "safety") for indicator in indicators)
+        
+        for indicators in enhanced_bias_detector.cultural_indicators.values():
+            vocabulary.extend((pattern, "bias") for pattern in indicators.get("bias_patterns", []))
+        vocabulary.extend((pattern, "bias") for pattern in enhanced_bias_detector.gender_bias_patterns["stereotypes"])
+        vocabulary.extend((pattern, "bias") for pattern, _ in enhanced_bias_detector.cultural_bias_indicator_patterns)
+        for patterns in enhanced_bias_detector.specific_bias_patterns.values():
+            vocabulary.extend((pattern, "bias") for pattern in patterns)
+        
+        for pattern_infos in kidgpt_service.crisis_patterns.values():
+            for pattern_info in pattern_infos:
+                anchors = required_literals(pattern_info["pattern"])
+                if anchors is None:
+                    raise ValueError(f"Crisis pattern has no literal anchor: {pattern_info['pattern']}")
+                vocabulary.extend((anchor, "crisis") for anchor in anchors)
+        
+        return cls(vocabulary, audit_sample_rate=audit_sample_rate)
+    
+    @staticmethod
+    def enabled_from_env() -> bool:
+        """
+        Whether ANALYSIS_PREFILTER_ENABLED turns the screen on (off by default)
+        With the screen on, content it clears gets legacy bias output rather than
+        enhanced bias analysis, and reports "enhanced_bias" as short-circuited
+        """
+        return os.getenv("ANALYSIS_PREFILTER_ENABLED", "false").lower() in ("true", "1", "yes", "on")
+    
+    @staticmethod
+    def audit_sample_rate_from_env() -> float:
+        """Fraction of clean items re-checked by the full pipeline, from ANALYSIS_PREFILTER_AUDIT_RATE"""
+        return min(max(float(os.getenv("ANALYSIS_PREFILTER_AUDIT_RATE", 0.01)), 0.0), 1.0)
+    
+    def screen(self, text: PreprocessedText) -> str:
+        """Return the verdict for preprocessed content"""
+        self._counters["screened"] += 1
+        if self.matcher.contains_any("".join(text.tokens)):
+            self._counters["hits"] += 1
+            return VERDICT_HIT
+        if self.audit_sample_rate > 0 and self.random_source() < self.audit_sample_rate:
+            self._counters["audited"] += 1
+            return VERDICT_AUDIT
+        self._counters["cleared"] += 1
+        return VERDICT_CLEAN
+    
+    def stats(self) -> Dict[str, Any]:
+        """Screen counters and the fraction of traffic it clears"""
+        screened = self._counters["screened"]
+        return {
+            "enabled": True,
+            **self._counters,
+            "terms": len(self.matcher.patterns),
+            "audit_sample_rate": self.audit_sample_rate,
+            "clear_rate": self._counters["cleared"] / screened if screened else 0.0,
+            "clean_rate": (self._counters["cleared"] + self._counters["audited"]) / screened if screened else 0.0
+        }
+
+def required_literals(pattern: str) -> Optional[FrozenSet[str]]:
+    """
+    Whitespace-free literals, one of which occurs in every match of a regex once
+    whitespace is removed from the matched text; None if no such set exists
+    """
+    return regex_literals.required_literals(pattern, ignore_whitespace=True)
+
+def _strip_whitespace(text: str) -> str:
+    return "".join(text.split())
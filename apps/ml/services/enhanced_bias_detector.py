@@ -3,16 +3,18 @@ Enhanced Multi-Dimensional Bias Detection System
 Patent-worthy algorithms for cultural bias detection, intersectionality analysis, and perspective synthesis
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 import asyncio
 import json
 import logging
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.lazy_import import lazy_import
+from .text_preprocessor import PreprocessedText, ensure_preprocessed
+
+# Heavy dependencies load on first use, not at service import
+np = lazy_import("numpy")
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +55,95 @@ class BalancedPerspective:
     primary_perspective: Dict[str, Any]
     alternative_perspective: Dict[str, Any]
     synthesis: Dict[str, Any]
-    citations: List[Dict[str, Any]]
+    citations: Sequence[Dict[str, Any]]
+
+class ReadOnlyDict(dict):
+    """
+    Dict shared between analysis results, so it must never be modified
+    Still a dict for JSON encoding; copies and pickles are read-only too
+    """
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared analysis fragments are read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return (ReadOnlyDict, (dict(self),))
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into ReadOnlyDicts and lists into tuples"""
+    if isinstance(value, dict):
+        return ReadOnlyDict({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@dataclass(frozen=True)
+class AgeBand:
+    """
+    Complexity, language level and age-dependent text an analysis is adapted to,
+    built once per band and shared by every child in it
+    """
+    max_age: Optional[int]  # inclusive; None for the oldest band
+    complexity: str
+    language_level: str
+    summary_intro: str
+    discussion_prompts: Tuple[str, ...]
+
+AGE_BANDS = (
+    AgeBand(
+        max_age=10, complexity="simple", language_level="elementary",
+        summary_intro="Age-appropriate explanation for ages 10 and under",
+        discussion_prompts=("Discussion point appropriate for ages 10 and under", "Simple question to encourage thinking")
+    ),
+    AgeBand(
+        max_age=13, complexity="moderate", language_level="middle_school",
+        summary_intro="Age-appropriate explanation for ages 11 to 13",
+        discussion_prompts=("Discussion point appropriate for ages 11 to 13", "Simple question to encourage thinking")
+    ),
+    AgeBand(
+        max_age=None, complexity="advanced", language_level="high_school",
+        summary_intro="Age-appropriate explanation for ages 14 and over",
+        discussion_prompts=("Discussion point appropriate for ages 14 and over", "Simple question to encourage thinking")
+    )
+)
+
+def age_band_for(age: int) -> AgeBand:
+    """The band a child's age falls in"""
+    return next(band for band in AGE_BANDS if band.max_age is None or age <= band.max_age)
+
+# Mock citations - would interface with academic databases in production
+PERSPECTIVE_CITATIONS = _freeze([
+    {
+        "source": "Academic Research Database",
+        "title": "Cultural Bias in Educational Content",
+        "url": "https://example.com/research/cultural-bias",
+        "credibility": 0.95,
+        "relevance": "primary_perspective"
+    },
+    {
+        "source": "Diverse Perspectives Journal",
+        "title": "Alternative Viewpoints in Media",
+        "url": "https://example.com/journal/alternative-views",
+        "credibility": 0.88,
+        "relevance": "alternative_perspective"
+    }
+])
+
+PERSPECTIVE_TEMPLATES = _freeze({
+    "counter_narrative": "While the content presents {primary_view}, an alternative perspective might consider {alternative_view}",
+    "missing_voice": "This topic could benefit from including perspectives from {missing_groups}",
+    "cultural_context": "From a {cultural_context} perspective, this might be viewed as {cultural_interpretation}"
+})
+
+STAKEHOLDERS = ("General audience", "Subject experts", "Affected communities")
+
+PERSPECTIVE_COVERAGE = _freeze({
+    "present": ["General audience"],
+    "missing": ["Subject experts", "Affected communities"]
+})
 
 class EnhancedBiasDetector:
     """
@@ -125,6 +215,23 @@ class EnhancedBiasDetector:
             ]
         }
         
+        # Cultural bias indicators, matched ignoring spaces
+        self.cultural_bias_indicator_patterns = [
+            ("cultural superiority", "implies one culture is superior to others"),
+            ("stereotyping", "uses cultural stereotypes or generalizations"),
+            ("cultural appropriation", "misrepresents or trivializes cultural elements")
+        ]
+        
+        # Phrases for each individual bias type
+        self.specific_bias_patterns = {
+            BiasType.GENDER: ["boys are better", "girls can't", "men should", "women shouldn't"],
+            BiasType.RACIAL: ["racial stereotype", "ethnic generalization"],
+            BiasType.SOCIOECONOMIC: ["poor people", "rich people always"],
+            BiasType.ABILITY: ["disabled", "normal people"],
+            BiasType.AGE: ["too old", "too young", "kids can't"],
+            BiasType.RELIGIOUS: ["religious stereotype", "faith-based assumption"]
+        }
+        
         # Intersectionality matrix (patent-worthy approach)
         self.intersectionality_weights = {
             (BiasType.GENDER, BiasType.RACIAL): 1.5,
@@ -134,46 +241,65 @@ class EnhancedBiasDetector:
             (BiasType.RELIGIOUS, BiasType.RACIAL): 1.4
         }
         
-        # Initialize TF-IDF vectorizer for semantic analysis
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        # TF-IDF vectorizer for semantic analysis, built on first use
+        self._vectorizer = None
         self.perspective_templates = self._load_perspective_templates()
         
+    @property
+    def vectorizer(self):
+        """TF-IDF vectorizer, importing scikit-learn only when first needed"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        return self._vectorizer
+    
     async def detect_comprehensive_bias(
         self, 
         content: str, 
         child_age: int, 
-        cultural_context: str = "western"
+        cultural_context: str = "western",
+        preprocessed: Optional[PreprocessedText] = None,
+        synthesize_perspectives: bool = True
     ) -> Dict[str, Any]:
         """
         Enhanced bias detection with cultural awareness and intersectionality
         Patent Claim: "Age-Adaptive Multi-Cultural Bias Detection with Automated Perspective Synthesis"
+        With synthesize_perspectives=False the balanced perspective and perspective
+        synthesis are skipped and returned as None
         """
         try:
+            text = ensure_preprocessed(content, preprocessed)
+            
             # Existing bias detection (preserve current functionality)
             base_bias = await self.legacy_detect_bias(content)
             
             # NEW: Cultural context analysis
-            cultural_bias = await self.analyze_cultural_bias(content, cultural_context)
+            cultural_bias = await self.analyze_cultural_bias(content, cultural_context, text)
             
             # NEW: Intersectionality analysis
-            intersectional_bias = await self.analyze_intersectional_bias(content)
-            
-            # NEW: Generate balanced perspective
-            balanced_view = await self.generate_balanced_perspective(
-                content, base_bias, cultural_bias
-            )
+            intersectional_bias = await self.analyze_intersectional_bias(content, text)
             
-            # NEW: Age-appropriate analysis adaptation
-            age_adapted_analysis = self._adapt_analysis_for_age(
-                balanced_view, child_age
-            )
+            age_adapted_analysis = None
+            perspective_synthesis = None
+            if synthesize_perspectives:
+                # NEW: Generate balanced perspective
+                balanced_view = await self.generate_balanced_perspective(
+                    content, base_bias, cultural_bias
+                )
+                
+                # NEW: Age-appropriate analysis adaptation
+                age_adapted_analysis = self._adapt_analysis_for_age(
+                    balanced_view, child_age
+                )
+                
+                perspective_synthesis = await self.synthesize_missing_perspectives(content)
             
             return {
                 **base_bias,  # Preserve existing structure
                 "cultural_analysis": cultural_bias,
                 "intersectional_factors": intersectional_bias,
                 "balanced_perspectives": age_adapted_analysis,
-                "perspective_synthesis": await self.synthesize_missing_perspectives(content),
+                "perspective_synthesis": perspective_synthesis,
                 "patent_metadata": {
                     "algorithm_version": "1.0.0",
                     "cultural_context": cultural_context,
@@ -203,26 +329,28 @@ class EnhancedBiasDetector:
     async def analyze_cultural_bias(
         self, 
         content: str, 
-        cultural_context: str
+        cultural_context: str,
+        preprocessed: Optional[PreprocessedText] = None
     ) -> Dict[str, Any]:
         """
         Analyze cultural bias with context-aware detection
         Patent innovation: Multi-dimensional cultural bias matrix
         """
+        text = ensure_preprocessed(content, preprocessed)
         context_enum = CulturalContext(cultural_context)
         indicators = self.cultural_indicators.get(context_enum, {})
         
         # Semantic analysis for cultural markers
-        cultural_markers = self._detect_cultural_markers(content, indicators)
+        cultural_markers = self._detect_cultural_markers(text, indicators)
         
         # Calculate cultural representation score
         representation_score = self._calculate_cultural_representation(
-            content, context_enum
+            text, context_enum
         )
         
         # Identify missing cultural perspectives
         missing_perspectives = self._identify_missing_cultural_perspectives(
-            content, context_enum
+            text, context_enum
         )
         
         return {
@@ -230,22 +358,27 @@ class EnhancedBiasDetector:
             "representation_score": representation_score,
             "cultural_markers": cultural_markers,
             "missing_perspectives": missing_perspectives,
-            "bias_indicators": await self._analyze_cultural_bias_indicators(content),
-            "sensitivity_score": self._calculate_cultural_sensitivity(content),
-            "underrepresented_groups": self._identify_underrepresented_groups(content)
+            "bias_indicators": await self._analyze_cultural_bias_indicators(text),
+            "sensitivity_score": self._calculate_cultural_sensitivity(text),
+            "underrepresented_groups": self._identify_underrepresented_groups(text)
         }
     
-    async def analyze_intersectional_bias(self, content: str) -> Dict[str, Any]:
+    async def analyze_intersectional_bias(
+        self, 
+        content: str, 
+        preprocessed: Optional[PreprocessedText] = None
+    ) -> Dict[str, Any]:
         """
         Analyze intersectional bias factors
         Patent innovation: Weighted intersectionality detection matrix
         """
+        text = ensure_preprocessed(content, preprocessed)
         individual_biases = {}
         
         # Analyze each bias type individually
         for bias_type in BiasType:
             individual_biases[bias_type.value] = await self._analyze_specific_bias(
-                content, bias_type
+                text, bias_type
             )
         
         # Calculate intersectional amplification
@@ -330,10 +463,10 @@ class EnhancedBiasDetector:
     
     # Helper Methods
     
-    def _detect_cultural_markers(self, content: str, indicators: Dict) -> List[str]:
+    def _detect_cultural_markers(self, text: PreprocessedText, indicators: Dict) -> List[str]:
         """Detect cultural markers in content using semantic analysis"""
         markers_found = []
-        content_lower = content.lower()
+        content_lower = text.lowered
         
         for marker_category, markers in indicators.items():
             if isinstance(markers, list):
@@ -345,7 +478,7 @@ class EnhancedBiasDetector:
     
     def _calculate_cultural_representation(
         self, 
-        content: str, 
+        text: PreprocessedText, 
         context: CulturalContext
     ) -> float:
         """Calculate cultural representation score using semantic similarity"""
@@ -354,7 +487,7 @@ class EnhancedBiasDetector:
         indicators = self.cultural_indicators.get(context, {})
         positive_markers = indicators.get("positive_markers", [])
         
-        content_words = set(content.lower().split())
+        content_words = text.token_set
         marker_words = set(" ".join(positive_markers).lower().split())
         
         overlap = len(content_words.intersection(marker_words))
@@ -364,7 +497,7 @@ class EnhancedBiasDetector:
     
     def _identify_missing_cultural_perspectives(
         self, 
-        content: str, 
+        text: PreprocessedText, 
         context: CulturalContext
     ) -> List[str]:
         """Identify missing cultural perspectives"""
@@ -372,7 +505,7 @@ class EnhancedBiasDetector:
         missing_perspectives = indicators.get("missing_perspectives", [])
         
         # Check which perspectives are already represented
-        content_lower = content.lower()
+        content_lower = text.lowered
         truly_missing = []
         
         for perspective in missing_perspectives:
@@ -382,21 +515,14 @@ class EnhancedBiasDetector:
         
         return truly_missing
     
-    async def _analyze_cultural_bias_indicators(self, content: str) -> List[Dict]:
+    async def _analyze_cultural_bias_indicators(self, text: PreprocessedText) -> List[Dict]:
         """Analyze specific cultural bias indicators"""
         bias_indicators = []
         
         # Check for various bias patterns
-        bias_patterns = [
-            ("cultural superiority", "implies one culture is superior to others"),
-            ("stereotyping", "uses cultural stereotypes or generalizations"),
-            ("cultural appropriation", "misrepresents or trivializes cultural elements")
-        ]
-        
-        content_lower = content.lower()
-        for pattern, description in bias_patterns:
+        for pattern, description in self.cultural_bias_indicator_patterns:
             # Simplified pattern matching - would use ML models in production
-            confidence = self._calculate_pattern_confidence(content_lower, pattern)
+            confidence = self._calculate_pattern_confidence(text, pattern)
             if confidence > 0.3:
                 bias_indicators.append({
                     "type": pattern,
@@ -407,7 +533,7 @@ class EnhancedBiasDetector:
         
         return bias_indicators
     
-    def _calculate_cultural_sensitivity(self, content: str) -> float:
+    def _calculate_cultural_sensitivity(self, text: PreprocessedText) -> float:
         """Calculate cultural sensitivity score"""
         # Simplified scoring - would use trained models in production
         sensitive_terms = [
@@ -415,12 +541,12 @@ class EnhancedBiasDetector:
             "inclusive", "heritage", "community", "perspective"
         ]
         
-        content_lower = content.lower()
+        content_lower = text.lowered
         sensitivity_score = sum(1 for term in sensitive_terms if term in content_lower)
         
         return min(sensitivity_score / len(sensitive_terms), 1.0)
     
-    def _identify_underrepresented_groups(self, content: str) -> List[str]:
+    def _identify_underrepresented_groups(self, text: PreprocessedText) -> List[str]:
         """Identify underrepresented groups mentioned or missing"""
         # This would be more sophisticated in production
         underrepresented_groups = [
@@ -428,26 +554,17 @@ class EnhancedBiasDetector:
             "LGBTQ+ individuals", "elderly", "youth", "immigrants"
         ]
         
-        content_lower = content.lower()
+        content_lower = text.lowered
         mentioned = [group for group in underrepresented_groups 
                     if any(word in content_lower for word in group.lower().split())]
         
         return mentioned
     
-    async def _analyze_specific_bias(self, content: str, bias_type: BiasType) -> Dict:
+    async def _analyze_specific_bias(self, text: PreprocessedText, bias_type: BiasType) -> Dict:
         """Analyze specific type of bias"""
         # Simplified implementation - would use specialized models in production
-        bias_patterns = {
-            BiasType.GENDER: ["boys are better", "girls can't", "men should", "women shouldn't"],
-            BiasType.RACIAL: ["racial stereotype", "ethnic generalization"],
-            BiasType.SOCIOECONOMIC: ["poor people", "rich people always"],
-            BiasType.ABILITY: ["disabled", "normal people"],
-            BiasType.AGE: ["too old", "too young", "kids can't"],
-            BiasType.RELIGIOUS: ["religious stereotype", "faith-based assumption"]
-        }
-        
-        patterns = bias_patterns.get(bias_type, [])
-        content_lower = content.lower()
+        patterns = self.specific_bias_patterns.get(bias_type, [])
+        content_lower = text.lowered
         
         detected_patterns = [p for p in patterns if p in content_lower]
         confidence = len(detected_patterns) / max(len(patterns), 1)
@@ -553,50 +670,36 @@ class EnhancedBiasDetector:
         self, 
         primary: Dict, 
         alternative: Dict
-    ) -> List[Dict[str, Any]]:
-        """Generate citations for perspectives"""
-        # Mock citations - would interface with academic databases in production
-        return [
-            {
-                "source": "Academic Research Database",
-                "title": "Cultural Bias in Educational Content",
-                "url": "https://example.com/research/cultural-bias",
-                "credibility": 0.95,
-                "relevance": "primary_perspective"
-            },
-            {
-                "source": "Diverse Perspectives Journal",
-                "title": "Alternative Viewpoints in Media",
-                "url": "https://example.com/journal/alternative-views",
-                "credibility": 0.88,
-                "relevance": "alternative_perspective"
-            }
-        ]
+    ) -> Sequence[Dict[str, Any]]:
+        """Generate citations for perspectives (shared and read-only)"""
+        return PERSPECTIVE_CITATIONS
     
     def _adapt_analysis_for_age(self, analysis: BalancedPerspective, age: int) -> Dict:
-        """Adapt analysis complexity and language for child's age"""
-        if age <= 10:
-            complexity = "simple"
-            language_level = "elementary"
-        elif age <= 13:
-            complexity = "moderate"
-            language_level = "middle_school"
-        else:
-            complexity = "advanced"
-            language_level = "high_school"
+        """Adapt analysis complexity and language for child's age band"""
+        age_band = age_band_for(age)
         
         return {
             "primary_perspective": analysis.primary_perspective,
             "alternative_perspective": analysis.alternative_perspective,
             "synthesis": analysis.synthesis,
             "age_adaptation": {
-                "complexity_level": complexity,
-                "language_level": language_level,
-                "simplified_summary": self._simplify_for_age(analysis.synthesis, age),
-                "age_appropriate_discussion": self._create_age_appropriate_discussion(analysis, age)
+                "complexity_level": age_band.complexity,
+                "language_level": age_band.language_level,
+                "simplified_summary": self._simplify_for_age(analysis.synthesis, age_band),
+                "age_appropriate_discussion": self._create_age_appropriate_discussion(analysis, age_band)
             }
         }
     
+    def adapt_for_age(self, balanced_perspectives: Dict[str, Any], age: int) -> Dict[str, Any]:
+        """Re-target an age-adapted balanced perspective (as returned in results) to another age"""
+        analysis = BalancedPerspective(
+            primary_perspective=balanced_perspectives["primary_perspective"],
+            alternative_perspective=balanced_perspectives["alternative_perspective"],
+            synthesis=balanced_perspectives["synthesis"],
+            citations=PERSPECTIVE_CITATIONS
+        )
+        return self._adapt_analysis_for_age(analysis, age)
+    
     def _calculate_overall_confidence(
         self, 
         base_bias: Dict, 
@@ -611,12 +714,8 @@ class EnhancedBiasDetector:
         return (base_confidence + cultural_confidence + intersectional_confidence) / 3
     
     def _load_perspective_templates(self) -> Dict:
-        """Load perspective generation templates"""
-        return {
-            "counter_narrative": "While the content presents {primary_view}, an alternative perspective might consider {alternative_view}",
-            "missing_voice": "This topic could benefit from including perspectives from {missing_groups}",
-            "cultural_context": "From a {cultural_context} perspective, this might be viewed as {cultural_interpretation}"
-        }
+        """Load perspective generation templates (shared and read-only)"""
+        return PERSPECTIVE_TEMPLATES
     
     # Simplified helper methods (would be more sophisticated in production)
     
@@ -645,24 +744,21 @@ class EnhancedBiasDetector:
     def _generate_discussion_points(self, content: str, primary: Dict, alternative: Dict) -> List[str]:
         return ["What other viewpoints might exist?", "How might different groups view this topic?"]
     
-    def _simplify_for_age(self, synthesis: Dict, age: int) -> str:
-        return f"Age-appropriate explanation for {age}-year-old: {synthesis.get('balanced_summary', '')[:50]}..."
+    def _simplify_for_age(self, synthesis: Dict, age_band: AgeBand) -> str:
+        return f"{age_band.summary_intro}: {synthesis.get('balanced_summary', '')[:50]}..."
     
-    def _create_age_appropriate_discussion(self, analysis: BalancedPerspective, age: int) -> List[str]:
-        return [f"Discussion point appropriate for age {age}", "Simple question to encourage thinking"]
+    def _create_age_appropriate_discussion(self, analysis: BalancedPerspective, age_band: AgeBand) -> Sequence[str]:
+        return age_band.discussion_prompts
     
-    def _calculate_pattern_confidence(self, content: str, pattern: str) -> float:
+    def _calculate_pattern_confidence(self, text: PreprocessedText, pattern: str) -> float:
         # Simplified pattern matching confidence
-        return 0.5 if pattern.replace(" ", "") in content.replace(" ", "") else 0.0
+        return 0.5 if pattern.replace(" ", "") in text.compact else 0.0
     
-    def _identify_stakeholders(self, content: str) -> List[str]:
-        return ["General audience", "Subject experts", "Affected communities"]
+    def _identify_stakeholders(self, content: str) -> Sequence[str]:
+        return STAKEHOLDERS
     
-    def _analyze_perspective_coverage(self, content: str, stakeholders: List[str]) -> Dict:
-        return {
-            "present": ["General audience"],
-            "missing": ["Subject experts", "Affected communities"]
-        }
+    def _analyze_perspective_coverage(self, content: str, stakeholders: Sequence[str]) -> Dict:
+        return PERSPECTIVE_COVERAGE
     
     async def _generate_missing_perspective_summaries(self, content: str, missing: List[str]) -> Dict:
         return {perspective: f"Perspective from {perspective} might include..." for perspective in missing}
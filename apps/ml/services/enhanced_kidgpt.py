@@ -3,14 +3,20 @@ Enhanced KidGPT Service with Emotion-Aware AI Mentoring
 Patent-worthy emotional intelligence and crisis detection algorithms
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Set
+from array import array
 import asyncio
 import logging
+import os
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import re
 import json
+from utils.aho_corasick import AhoCorasickAutomaton
+from utils.regex_literals import required_literals
+from .history_store import HistoryStore
+from .session_store import SessionStore
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +52,7 @@ class EmotionalAnalysis:
     emotional_indicators: List[str]
     crisis_level: CrisisLevel
     support_needed: bool
+    emotion_scores: Dict[EmotionalState, float] = field(default_factory=dict)  # 0.0 - 1.0 per emotion
 
 @dataclass
 class CrisisIndicator:
@@ -54,6 +61,65 @@ class CrisisIndicator:
     keywords: List[str]
     recommended_action: str
 
+# Turns after which an emotion's weight in the conversation trajectory halves
+EMOTION_TRAJECTORY_HALF_LIFE_TURNS = float(os.getenv("EMOTION_TRAJECTORY_HALF_LIFE_TURNS", 3))
+
+# Decayed score above which a distress emotion counts as sustained across turns
+SUSTAINED_DISTRESS_THRESHOLD = 0.25
+
+DISTRESS_EMOTIONS = (EmotionalState.SAD, EmotionalState.FRUSTRATED, EmotionalState.ANXIOUS, EmotionalState.ANGRY)
+
+_EMOTION_INDEX = {emotion: index for index, emotion in enumerate(EmotionalState)}
+_CRISIS_SEVERITY = [CrisisLevel.NONE, CrisisLevel.LOW, CrisisLevel.MEDIUM, CrisisLevel.HIGH, CrisisLevel.CRITICAL]
+
+class EmotionTrajectory:
+    """
+    Emotional context of one conversation in fixed-size state
+    An exponentially decayed score per emotion and the highest crisis level seen;
+    each turn is folded in with O(1) work, so prior messages are never re-analyzed
+    """
+    __slots__ = ("decay", "scores", "crisis_high_water", "turns")
+    
+    def __init__(self, half_life_turns: float = EMOTION_TRAJECTORY_HALF_LIFE_TURNS):
+        self.decay = 0.5 ** (1.0 / half_life_turns)
+        self.scores = array("d", [0.0]) * len(_EMOTION_INDEX)
+        self.crisis_high_water = CrisisLevel.NONE
+        self.turns = 0
+    
+    def update(self, emotion_scores: Dict[EmotionalState, float], crisis_level: CrisisLevel):
+        """Fold one turn's emotion scores and crisis level into the trajectory"""
+        decay = self.decay
+        for index in range(len(self.scores)):
+            self.scores[index] *= decay
+        for emotion, score in emotion_scores.items():
+            self.scores[_EMOTION_INDEX[emotion]] += (1.0 - decay) * score
+        if _CRISIS_SEVERITY.index(crisis_level) > _CRISIS_SEVERITY.index(self.crisis_high_water):
+            self.crisis_high_water = crisis_level
+        self.turns += 1
+    
+    def score(self, emotion: EmotionalState) -> float:
+        return self.scores[_EMOTION_INDEX[emotion]]
+    
+    def dominant_emotion(self) -> EmotionalState:
+        """Emotion with the highest decayed score, neutral if none stands out"""
+        emotion = max(EmotionalState, key=self.score)
+        return emotion if self.score(emotion) >= 0.1 else EmotionalState.NEUTRAL
+    
+    def sustained_distress(self) -> Optional[EmotionalState]:
+        """Distress emotion that has persisted across recent turns, if any"""
+        emotion = max(DISTRESS_EMOTIONS, key=self.score)
+        return emotion if self.score(emotion) >= SUSTAINED_DISTRESS_THRESHOLD else None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        sustained = self.sustained_distress()
+        return {
+            "turns": self.turns,
+            "dominant_emotion": self.dominant_emotion().value,
+            "sustained_distress": sustained.value if sustained else None,
+            "crisis_high_water": self.crisis_high_water.value,
+            "emotion_scores": {emotion.value: round(self.score(emotion), 4) for emotion in EmotionalState}
+        }
+
 class EnhancedKidGPTService:
     """
     Patent-worthy Emotion-Aware AI Mentoring System
@@ -156,11 +222,32 @@ class EnhancedKidGPTService:
             ]
         }
         
+        # Words that amplify distress emotions
+        self.intensity_words = ["very", "really", "so", "extremely", "totally"]
+        
+        # All emotion keywords/patterns and crisis patterns compiled into one scanner
+        self._compile_message_scanner()
+        
         self.initialized = False
-        self.emotional_history = {}  # In-memory cache for emotional state tracking
+        # Last 50 emotional states per child for trend analysis
+        self.emotional_history = HistoryStore.from_env(
+            "EMOTION_HISTORY",
+            float_fields=("confidence",),
+            code_fields={
+                "emotion": [state.value for state in EmotionalState],
+                "crisis_level": [level.value for level in CrisisLevel],
+                "support_needed": [False, True]
+            },
+            capacity=50
+        )
+        # Decayed emotional context per conversation (or per child without a conversation ID)
+        self.conversation_trajectories = SessionStore.from_env("EMOTION_TRAJECTORY", factory=EmotionTrajectory)
     
     async def initialize(self):
         """Initialize the enhanced KidGPT service"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing enhanced KidGPT service...")
             self.initialized = True
@@ -176,25 +263,37 @@ class EnhancedKidGPTService:
         child_id: str,
         child_age: int,
         child_name: Optional[str] = None,
-        conversation_history: Optional[List[Dict]] = None
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate emotion-aware response with crisis detection
         Patent Claim: "Emotion-Aware AI Mentoring with Crisis Detection and Intervention"
+        Context from earlier turns comes from the conversation's emotion trajectory;
+        conversation_history is accepted for compatibility but never replayed
         """
         if not self.initialized:
             await self.initialize()
         
         try:
+            # Single pass over the message for every emotion and crisis pattern
+            matched = self.scan_message(message.lower())
+            
             # Analyze emotional state of the message
-            emotional_analysis = await self._analyze_emotional_state(message, child_id)
+            emotional_analysis = await self._analyze_emotional_state(message, child_id, matched)
             
             # Detect crisis indicators
-            crisis_assessment = await self._assess_crisis_level(message, emotional_analysis)
+            crisis_assessment = await self._assess_crisis_level(message, emotional_analysis, matched)
+            
+            # Fold this turn into the conversation's running emotional context
+            trajectory = self.conversation_trajectories.get_or_create(
+                f"{child_id}:{conversation_id}" if conversation_id else child_id
+            )
+            trajectory.update(emotional_analysis.emotion_scores, crisis_assessment["level"])
             
             # Generate contextual response based on emotion and mode
             response_content = await self._generate_contextual_response(
-                message, mode, emotional_analysis, child_age, child_name
+                message, mode, emotional_analysis, child_age, child_name, trajectory
             )
             
             # Apply age-appropriate language adaptation
@@ -202,7 +301,7 @@ class EnhancedKidGPTService:
             
             # Generate emotional support recommendations
             support_recommendations = await self._generate_support_recommendations(
-                emotional_analysis, crisis_assessment, child_age
+                emotional_analysis, crisis_assessment, child_age, trajectory
             )
             
             # Store emotional state for tracking
@@ -228,6 +327,7 @@ class EnhancedKidGPTService:
                 },
                 "support_recommendations": support_recommendations,
                 "parent_notification": parent_notification,
+                "conversation_context": trajectory.snapshot(),
                 "response_metadata": {
                     "tone": self._determine_response_tone(emotional_analysis),
                     "empathy_score": self._calculate_empathy_score(emotional_analysis),
@@ -241,27 +341,34 @@ class EnhancedKidGPTService:
             logger.error(f"Enhanced KidGPT response generation failed: {e}")
             return self._get_fallback_response(message, mode, child_age)
     
-    async def _analyze_emotional_state(self, message: str, child_id: str) -> EmotionalAnalysis:
+    async def _analyze_emotional_state(
+        self, 
+        message: str, 
+        child_id: str,
+        matched: Optional[Set[int]] = None
+    ) -> EmotionalAnalysis:
         """
         Analyze emotional state from message content
         Patent innovation: Multi-pattern emotional detection with contextual analysis
         """
-        message_lower = message.lower()
+        if matched is None:
+            matched = self.scan_message(message.lower())
         emotion_scores = {}
         detected_indicators = []
+        has_intensity = any(entry_id in matched for entry_id in self._intensity_entry_ids)
         
         # Score each emotional state
-        for emotion, patterns in self.emotional_patterns.items():
+        for emotion, entry_ids in self._emotion_entry_ids.items():
             score = 0.0
             
             # Check keyword matches
-            keyword_matches = sum(1 for keyword in patterns["keywords"] if keyword in message_lower)
+            keyword_matches = sum(1 for entry_id in entry_ids["keywords"] if entry_id in matched)
             score += keyword_matches * 0.3
             
             # Check pattern matches
             pattern_matches = 0
-            for pattern in patterns["patterns"]:
-                if re.search(pattern, message_lower):
+            for entry_id, pattern in entry_ids["patterns"]:
+                if entry_id in matched:
                     pattern_matches += 1
                     detected_indicators.append(f"{emotion.value}: {pattern}")
             
@@ -270,8 +377,7 @@ class EnhancedKidGPTService:
             # Contextual amplification based on message structure
             if emotion in [EmotionalState.SAD, EmotionalState.ANXIOUS, EmotionalState.FRUSTRATED]:
                 # Look for intensity amplifiers
-                intensity_words = ["very", "really", "so", "extremely", "totally"]
-                if any(word in message_lower for word in intensity_words):
+                if has_intensity:
                     score *= 1.5
             
             emotion_scores[emotion] = min(score, 1.0)
@@ -294,23 +400,30 @@ class EnhancedKidGPTService:
             confidence=confidence,
             emotional_indicators=detected_indicators,
             crisis_level=CrisisLevel.NONE,  # Will be determined separately
-            support_needed=support_needed
+            support_needed=support_needed,
+            emotion_scores=emotion_scores
         )
     
-    async def _assess_crisis_level(self, message: str, emotional_analysis: EmotionalAnalysis) -> Dict[str, Any]:
+    async def _assess_crisis_level(
+        self, 
+        message: str, 
+        emotional_analysis: EmotionalAnalysis,
+        matched: Optional[Set[int]] = None
+    ) -> Dict[str, Any]:
         """
         Assess crisis level with automatic escalation protocols
         Patent innovation: Automated crisis detection with confidence-based escalation
         """
-        message_lower = message.lower()
+        if matched is None:
+            matched = self.scan_message(message.lower())
         crisis_indicators = []
         max_crisis_level = CrisisLevel.NONE
         
         # Check crisis patterns in order of severity
         for level in [CrisisLevel.CRITICAL, CrisisLevel.HIGH, CrisisLevel.MEDIUM, CrisisLevel.LOW]:
-            if level in self.crisis_patterns:
-                for pattern_info in self.crisis_patterns[level]:
-                    if re.search(pattern_info["pattern"], message_lower):
+            if level in self._crisis_entry_ids:
+                for entry_id, pattern_info in self._crisis_entry_ids[level]:
+                    if entry_id in matched:
                         crisis_indicators.append({
                             "type": pattern_info["type"],
                             "level": level.value,
@@ -341,13 +454,94 @@ class EnhancedKidGPTService:
             "confidence": 0.85 if crisis_indicators else 0.95
         }
     
+    def _compile_message_scanner(self):
+        """
+        Compile every emotion keyword, emotion pattern, intensity word and crisis
+        pattern once into a single table of scanner entries
+        """
+        entry_patterns = []
+        literal_entries = set()
+        self._emotion_entry_ids = {}
+        self._crisis_entry_ids = {}
+        
+        def add_entry(pattern: str, literal: bool = False) -> int:
+            entry_patterns.append(pattern)
+            if literal:
+                literal_entries.add(len(entry_patterns) - 1)
+            return len(entry_patterns) - 1
+        
+        for emotion, patterns in self.emotional_patterns.items():
+            self._emotion_entry_ids[emotion] = {
+                "keywords": [add_entry(keyword, literal=True) for keyword in patterns["keywords"]],
+                "patterns": [(add_entry(pattern), pattern) for pattern in patterns["patterns"]]
+            }
+        
+        self._intensity_entry_ids = [add_entry(word, literal=True) for word in self.intensity_words]
+        
+        for level, pattern_infos in self.crisis_patterns.items():
+            self._crisis_entry_ids[level] = [
+                (add_entry(pattern_info["pattern"]), pattern_info) for pattern_info in pattern_infos
+            ]
+        
+        # (level, entry id, pattern info) of every crisis pattern, for callers that
+        # read crisis matches out of scan_message() themselves
+        self.crisis_entries: List[Tuple[CrisisLevel, int, Dict[str, str]]] = [
+            (level, entry_id, pattern_info)
+            for level, entries in self._crisis_entry_ids.items()
+            for entry_id, pattern_info in entries
+        ]
+        
+        # Keywords are plain substrings; only real patterns need the regex engine
+        self._literal_entries = [
+            (entry_id, entry_patterns[entry_id]) for entry_id in sorted(literal_entries)
+        ]
+        self._pattern_entries = [
+            (entry_id, re.compile(pattern)) for entry_id, pattern in enumerate(entry_patterns)
+            if entry_id not in literal_entries
+        ]
+        
+        # One automaton over the keywords and the literal anchors of every pattern:
+        # a keyword hit is a match, an anchor hit makes its pattern worth running
+        self._scanner = AhoCorasickAutomaton()
+        for entry_id, literal in self._literal_entries:
+            self._scanner.add(literal, (entry_id, None))
+        self._unanchored_pattern_entries = []
+        for entry_id, regex in self._pattern_entries:
+            anchors = required_literals(regex.pattern)
+            if anchors is None:
+                self._unanchored_pattern_entries.append((entry_id, regex))
+                continue
+            for anchor in anchors:
+                self._scanner.add(anchor, (entry_id, regex))
+        self._scanner.build()
+    
+    def scan_message(self, message_lower: str) -> Set[int]:
+        """
+        Return the ids of every scanner entry that occurs anywhere in the message
+        One automaton pass finds the keywords and which patterns could match; only
+        those patterns are searched. Computed once per message and shared by the
+        emotional and crisis assessments
+        """
+        pattern_ids, _ = self._scanner.scan_ids(message_lower)
+        matched = set()
+        candidates = dict(self._unanchored_pattern_entries)
+        for pattern_id in pattern_ids:
+            entry_id, regex = self._scanner.payloads[pattern_id]
+            if regex is None:
+                matched.add(entry_id)
+            else:
+                candidates[entry_id] = regex
+        matched.update(entry_id for entry_id, regex in candidates.items() if regex.search(message_lower))
+        return matched
+    
     async def _generate_contextual_response(
         self,
         message: str,
         mode: str,
         emotional_analysis: EmotionalAnalysis,
         child_age: int,
-        child_name: Optional[str] = None
+        child_name: Optional[str] = None,
+        trajectory: Optional[EmotionTrajectory] = None
     ) -> str:
         """
         Generate contextual response based on emotion and mode
@@ -365,10 +559,14 @@ class EnhancedKidGPTService:
         else:
             base_response = base_response.replace("{name}", "")
         
-        # Add empathetic opening for emotional distress
+        # Add empathetic opening for emotional distress, in this message or sustained over the conversation
+        sustained_distress = trajectory.sustained_distress() if trajectory is not None else None
         if emotional_analysis.support_needed:
             empathy_opening = self._generate_empathy_opening(emotion, child_age)
             base_response = f"{empathy_opening} {base_response}"
+        elif sustained_distress is not None:
+            empathy_opening = self._generate_empathy_opening(sustained_distress, child_age)
+            base_response = f"{empathy_opening} {base_response}"
         
         # Add mode-specific content
         mode_content = await self._generate_mode_specific_content(message, mode, emotion, child_age)
@@ -497,19 +695,26 @@ class EnhancedKidGPTService:
         self, 
         emotional_analysis: EmotionalAnalysis, 
         crisis_assessment: Dict, 
-        child_age: int
+        child_age: int,
+        trajectory: Optional[EmotionTrajectory] = None
     ) -> List[str]:
         """Generate emotional support recommendations"""
         recommendations = []
         
-        # Crisis-level recommendations
-        if crisis_assessment["level"] == CrisisLevel.CRITICAL:
+        # Crisis-level recommendations, kept for the rest of a conversation that reached a crisis
+        crisis_level = crisis_assessment["level"]
+        if trajectory is not None and (
+            _CRISIS_SEVERITY.index(trajectory.crisis_high_water) > _CRISIS_SEVERITY.index(crisis_level)
+        ):
+            crisis_level = trajectory.crisis_high_water
+        
+        if crisis_level == CrisisLevel.CRITICAL:
             recommendations.extend([
                 "Please talk to a trusted adult immediately",
                 "Consider contacting a crisis helpline for support",
                 "Remember that you are not alone and help is available"
             ])
-        elif crisis_assessment["level"] == CrisisLevel.HIGH:
+        elif crisis_level == CrisisLevel.HIGH:
             recommendations.extend([
                 "It would be helpful to talk to a parent, teacher, or counselor",
                 "Consider reaching out to a mental health professional",
@@ -546,20 +751,14 @@ class EnhancedKidGPTService:
         crisis_assessment: Dict
     ):
         """Track emotional state for trend analysis"""
-        if child_id not in self.emotional_history:
-            self.emotional_history[child_id] = []
-        
-        self.emotional_history[child_id].append({
-            "timestamp": datetime.now().isoformat(),
-            "emotion": emotional_analysis.primary_emotion.value,
-            "confidence": emotional_analysis.confidence,
-            "crisis_level": crisis_assessment["level"].value,
-            "support_needed": emotional_analysis.support_needed
-        })
-        
-        # Keep only last 50 entries for memory management
-        if len(self.emotional_history[child_id]) > 50:
-            self.emotional_history[child_id] = self.emotional_history[child_id][-50:]
+        # Ring buffer keeps only the last 50 entries
+        self.emotional_history.append(
+            child_id,
+            emotion=emotional_analysis.primary_emotion.value,
+            confidence=emotional_analysis.confidence,
+            crisis_level=crisis_assessment["level"].value,
+            support_needed=bool(emotional_analysis.support_needed)
+        )
     
     async def _assess_parent_notification_need(
         self, 
@@ -626,6 +825,7 @@ class EnhancedKidGPTService:
                 "reason": "",
                 "resources": {}
             },
+            "conversation_context": None,
             "response_metadata": {
                 "tone": "supportive",
                 "empathy_score": 0.7,
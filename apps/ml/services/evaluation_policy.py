@@ -0,0 +1,117 @@
+"""
+Evaluation Policy
+Tiered short-circuit rules that skip expensive analysis stages for clearly unsafe content
+"""
+
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from dataclasses import dataclass
+import os
+
+# Stages a rule may skip, in the order they are reported
+SKIPPABLE_STAGES = ("quality", "bias", "perspective_synthesis", "risk")
+
+# Short-circuiting is opt-in: skipped stages report fallback scores, so every
+# stage runs concurrently unless ANALYSIS_SHORT_CIRCUIT_RULES is set, e.g.
+# "perspective_synthesis:70,quality:50,bias:30" to skip perspective synthesis from
+# two safety flags, quality scoring from three and bias analysis from four
+DEFAULT_SHORT_CIRCUIT_RULES = ""
+
+@dataclass(frozen=True)
+class ShortCircuitRule:
+    stage: str
+    safety_score_below: Optional[float] = None
+    any_flags: Tuple[str, ...] = ()  # safety flags that trigger the rule on their own
+    
+    def matches(self, safety_result: Dict[str, Any]) -> bool:
+        """Whether the safety result triggers this rule"""
+        if self.safety_score_below is not None and safety_result["safety_score"] < self.safety_score_below:
+            return True
+        return any(flag in safety_result["safety_flags"] for flag in self.any_flags)
+
+class EvaluationPolicy:
+    """
+    Short-circuit policy for ContentAnalyzer
+    Stages a rule may skip wait for safety; once its result is known, every
+    matching rule removes its stage from the rest of the pipeline. Stages no rule
+    can skip run concurrently with safety, as do all stages when there are no rules
+    """
+    
+    def __init__(self, rules: Iterable[ShortCircuitRule] = ()):
+        self.rules: List[ShortCircuitRule] = list(rules)
+        for rule in self.rules:
+            if rule.stage not in SKIPPABLE_STAGES:
+                raise ValueError(f"Stage cannot be short-circuited: {rule.stage}")
+        
+        self._skippable = frozenset(rule.stage for rule in self.rules)
+        self._counters = {
+            "evaluated": 0,
+            "short_circuited": 0
+        }
+        self._skipped = {stage: 0 for stage in SKIPPABLE_STAGES}
+    
+    @classmethod
+    def from_env(cls) -> "EvaluationPolicy":
+        """Build from ANALYSIS_SHORT_CIRCUIT_RULES; unset or empty disables short-circuiting"""
+        return cls(cls.parse_rules(os.getenv("ANALYSIS_SHORT_CIRCUIT_RULES", DEFAULT_SHORT_CIRCUIT_RULES)))
+    
+    @staticmethod
+    def parse_rules(spec: str) -> List[ShortCircuitRule]:
+        """
+        Parse comma-separated `stage:threshold` and `stage:flag|flag` rules
+        e.g. "perspective_synthesis:70,risk:violence|cyberbullying"
+        """
+        rules = []
+        for entry in spec.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            stage, _, condition = entry.partition(":")
+            condition = condition.strip()
+            try:
+                threshold = float(condition)
+            except ValueError:
+                flags = tuple(flag.strip() for flag in condition.split("|") if flag.strip())
+                if not flags:
+                    raise ValueError(f"Invalid short-circuit rule: {entry}")
+                rules.append(ShortCircuitRule(stage=stage.strip(), any_flags=flags))
+            else:
+                rules.append(ShortCircuitRule(stage=stage.strip(), safety_score_below=threshold))
+        return rules
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rules)
+    
+    def can_skip(self, stage: str) -> bool:
+        """Whether any rule may skip this stage, so it has to wait for safety"""
+        return stage in self._skippable
+    
+    def stages_to_skip(self, safety_result: Dict[str, Any]) -> List[str]:
+        """Stages to short-circuit for a safety result, in SKIPPABLE_STAGES order"""
+        triggered = {rule.stage for rule in self.rules if rule.matches(safety_result)}
+        skipped = [stage for stage in SKIPPABLE_STAGES if stage in triggered]
+        
+        self._counters["evaluated"] += 1
+        if skipped:
+            self._counters["short_circuited"] += 1
+            for stage in skipped:
+                self._skipped[stage] += 1
+        return skipped
+    
+    def stats(self) -> Dict[str, Any]:
+        """Rules and how often each stage was skipped"""
+        evaluated = self._counters["evaluated"]
+        return {
+            "enabled": self.enabled,
+            "rules": [
+                {
+                    "stage": rule.stage,
+                    "safety_score_below": rule.safety_score_below,
+                    "any_flags": list(rule.any_flags)
+                }
+                for rule in self.rules
+            ],
+            **self._counters,
+            "short_circuit_rate": self._counters["short_circuited"] / evaluated if evaluated else 0.0,
+            "skipped_stages": dict(self._skipped)
+        }
@@ -3,13 +3,24 @@ Feature Flags Service for Safe Rollout
 Manages feature flag configuration and evaluation
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Mapping, Sequence, Tuple, Union
+import bisect
 import os
 import json
 import asyncio
+import hashlib
 import logging
+import math
+import random
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
+from utils.lazy_import import lazy_import
+from .flag_sources import FlagSource, flag_source_from_env
+
+# Only bulk evaluation needs numpy
+np = lazy_import("numpy")
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +32,89 @@ class FeatureFlag(Enum):
     CRISIS_DETECTION = "CRISIS_DETECTION"
     REAL_TIME_INTERVENTION = "REAL_TIME_INTERVENTION"
 
+# Position of each flag in decision table rows and FlagContext values
+_FLAG_INDEX = {flag: index for index, flag in enumerate(FeatureFlag)}
+
+# Age bands in decision table order; one extra column holds decisions for an unknown age
+AGE_BANDS = ("AGE_8_10", "AGE_11_13", "AGE_14_16", "AGE_17_PLUS")
+_AGE_BAND_UPPER_BOUNDS = (10, 13, 16)  # inclusive upper age of every band but the last
+_UNKNOWN_AGE_COLUMN = len(AGE_BANDS)
+
+def age_band_name(age: int) -> str:
+    """Name of the age band a known age falls in"""
+    return AGE_BANDS[bisect.bisect_left(_AGE_BAND_UPPER_BOUNDS, age)]
+
+# Rollout buckets 0-100: child_id hashes land in 0-99, the random fallback draws up to 100
+ROLLOUT_BUCKETS = 101
+
+# A table cell is a fixed decision, or one byte per rollout bucket for partial rollouts
+FlagDecision = Union[bool, bytes]
+
+@dataclass(frozen=True)
+class FlagContext:
+    """
+    Every flag evaluated once for one child
+    Built at the start of a request and passed down the pipeline, so later checks
+    are tuple lookups and all stages see the same flag snapshot
+    """
+    child_age: Optional[int]
+    child_id: Optional[str]
+    values: Tuple[bool, ...]  # indexed by FeatureFlag declaration order
+    
+    def is_enabled(self, flag: FeatureFlag) -> bool:
+        return self.values[_FLAG_INDEX[flag]]
+    
+    def enabled_flags(self) -> List[FeatureFlag]:
+        return [flag for flag in FeatureFlag if self.values[_FLAG_INDEX[flag]]]
+
+@dataclass(frozen=True)
+class FlagSnapshot:
+    """
+    Immutable flag state: configuration plus its compiled decision table
+    Changes build a new snapshot and swap it in with one assignment, so readers
+    never lock and never see a half-applied update
+    """
+    flags: Mapping[FeatureFlag, Mapping[str, Any]]
+    decision_table: Tuple[Tuple[FlagDecision, ...], ...]  # [flag][age band]
+    version: int
+    origin: str  # "defaults", "update_flag" or the flag source name
+
+@dataclass(frozen=True)
+class BulkFlagEvaluation:
+    """
+    Every flag evaluated for a cohort of children
+    `matrix` is a numpy bool array with one row per child and one column per
+    flag, in FeatureFlag declaration order
+    """
+    matrix: Any
+    counts: Dict[FeatureFlag, int]  # children with each flag enabled
+    total: int
+    version: int  # snapshot version the cohort was evaluated against
+    
+    def column(self, flag: FeatureFlag) -> Any:
+        """Per-child decisions for one flag"""
+        return self.matrix[:, _FLAG_INDEX[flag]]
+
 class FeatureFlagService:
     """
     Feature Flag Service for safe rollout of enhanced features
     Supports percentage-based rollout, age group targeting, and A/B testing
     """
     
-    def __init__(self):
-        self.flags = {}
+    def __init__(self, source: Optional[FlagSource] = None):
         self.initialized = False
+        self._snapshot = FlagSnapshot(MappingProxyType({}), (), 0, "defaults")
+        
+        # Live configuration; documents from the source are layered over the
+        # defaults and environment overrides in _base_flags
+        self.source = source
+        self._base_flags: Dict[FeatureFlag, Dict[str, Any]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self._source_counters = {
+            "reloads": 0,
+            "reload_errors": 0,
+            "watch_errors": 0
+        }
         
         # Default feature flag configuration
         self.default_flags = {
@@ -77,7 +162,18 @@ class FeatureFlagService:
             logger.info("Initializing feature flag service...")
             
             # Load flags from environment or use defaults
-            self.flags = self._load_feature_flags()
+            self._base_flags = self._load_feature_flags()
+            self._publish(self._base_flags, "defaults")
+            
+            # Then apply the live source's current document, if one is configured
+            if self.source is None:
+                self.source = flag_source_from_env()
+            if self.source is not None:
+                try:
+                    self._on_source_document(await self.source.load())
+                except Exception as e:
+                    self._source_counters["reload_errors"] += 1
+                    logger.error(f"Failed to load feature flags from {self.source.name}: {e}")
             
             self.initialized = True
             logger.info("Feature flag service initialized successfully")
@@ -113,36 +209,37 @@ class FeatureFlagService:
             logger.warning("Feature flag service not initialized, using default configuration")
             return False
         
-        flag_config = self.flags.get(flag, {})
+        # Enabled state, age targeting and full rollouts are resolved in the table
+        decision = self._snapshot.decision_table[_FLAG_INDEX[flag]][self._age_band_column(child_age)]
+        if decision is True or decision is False:
+            return decision
         
-        # Check if flag is globally enabled
-        if not flag_config.get("enabled", False):
-            return False
-        
-        # Check age group targeting
-        if child_age is not None:
-            age_band = self._get_age_band(child_age)
-            target_age_groups = flag_config.get("target_age_groups", [])
-            if target_age_groups and age_band not in target_age_groups:
-                return False
+        return bool(decision[self._rollout_bucket(child_id, user_percentage)])
+    
+    def context(
+        self,
+        child_age: Optional[int] = None,
+        child_id: Optional[str] = None,
+        user_percentage: Optional[float] = None
+    ) -> FlagContext:
+        """Evaluate every flag for one child, hashing the child_id at most once"""
+        if not self.initialized:
+            logger.warning("Feature flag service not initialized, using default configuration")
+            return FlagContext(child_age, child_id, (False,) * len(_FLAG_INDEX))
         
-        # Check rollout percentage
-        rollout_percentage = flag_config.get("rollout_percentage", 0)
-        if rollout_percentage < 100:
-            # Use child_id for consistent rollout or generate percentage
-            if child_id:
-                child_percentage = self._calculate_user_percentage(child_id)
-            elif user_percentage is not None:
-                child_percentage = user_percentage
-            else:
-                # Fallback to random percentage (not recommended for production)
-                import random
-                child_percentage = random.randint(0, 100)
-            
-            if child_percentage > rollout_percentage:
-                return False
+        column = self._age_band_column(child_age)
+        bucket = None
+        values = []
+        for row in self._snapshot.decision_table:
+            decision = row[column]
+            if decision is True or decision is False:
+                values.append(decision)
+                continue
+            if bucket is None:
+                bucket = self._rollout_bucket(child_id, user_percentage)
+            values.append(bool(decision[bucket]))
         
-        return True
+        return FlagContext(child_age, child_id, tuple(values))
     
     def get_enabled_flags(
         self, 
@@ -150,21 +247,106 @@ class FeatureFlagService:
         child_id: Optional[str] = None
     ) -> List[FeatureFlag]:
         """Get list of enabled flags for the given context"""
-        enabled_flags = []
-        
-        for flag in FeatureFlag:
-            if self.is_enabled(flag, child_age, child_id):
-                enabled_flags.append(flag)
+        return self.context(child_age, child_id).enabled_flags()
+    
+    def evaluate_bulk(
+        self,
+        child_ages: Sequence[Optional[int]],
+        child_ids: Sequence[Optional[str]],
+        seed: Optional[int] = None
+    ) -> BulkFlagEvaluation:
+        """
+        Evaluate every flag for a cohort in one vectorized pass
+        Gives the same decisions as context() for each (age, child_id) pair; children
+        without an ID get a random rollout bucket drawn from `seed`
+        """
+        snapshot = self._snapshot
+        columns, buckets = self._cohort_coordinates(child_ages, child_ids, seed)
+        return self._evaluate_cohort(snapshot.decision_table, columns, buckets, snapshot.version)
+    
+    def forecast_document(
+        self,
+        document: Optional[Dict[str, Any]],
+        child_ages: Sequence[Optional[int]],
+        child_ids: Sequence[Optional[str]],
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare per-flag counts for a cohort under the live flags and under a
+        proposed flag document, without applying it
+        """
+        snapshot = self._snapshot
+        proposed_table = self._compile_decision_table(self._resolve_document(document, "forecast"))
+        columns, buckets = self._cohort_coordinates(child_ages, child_ids, seed)
         
-        return enabled_flags
+        current = self._evaluate_cohort(snapshot.decision_table, columns, buckets, snapshot.version)
+        proposed = self._evaluate_cohort(proposed_table, columns, buckets, snapshot.version)
+        return {
+            "total": current.total,
+            "version": snapshot.version,
+            "flags": {
+                flag.value: {
+                    "current": current.counts[flag],
+                    "proposed": proposed.counts[flag],
+                    "change": proposed.counts[flag] - current.counts[flag]
+                }
+                for flag in FeatureFlag
+            }
+        }
+    
+    @property
+    def flags(self) -> Mapping[FeatureFlag, Mapping[str, Any]]:
+        """Read-only view of the current flag configuration"""
+        return self._snapshot.flags
     
     def get_flag_config(self, flag: FeatureFlag) -> Dict[str, Any]:
         """Get configuration for a specific flag"""
-        return self.flags.get(flag, {})
+        return dict(self._snapshot.flags.get(flag, {}))
     
     def get_all_flags(self) -> Dict[FeatureFlag, Dict[str, Any]]:
         """Get all flag configurations"""
-        return self.flags.copy()
+        return {flag: dict(config) for flag, config in self._snapshot.flags.items()}
+    
+    def apply_document(self, document: Optional[Dict[str, Any]], origin: str = "document"):
+        """
+        Replace the live configuration with a flag document layered over the
+        defaults and environment overrides; an invalid document raises and
+        leaves the current snapshot untouched
+        """
+        self._publish(self._resolve_document(document, origin), origin)
+        logger.info(f"Applied feature flags from {origin} (version {self._snapshot.version})")
+    
+    async def start_watching(self):
+        """
+        Follow the flag source from the running event loop
+        Call once per worker process after it starts serving (not before fork)
+        """
+        if self.source is None or (self._watch_task is not None and not self._watch_task.done()):
+            return
+        self._watch_task = asyncio.get_running_loop().create_task(self._watch_source())
+    
+    async def stop_watching(self):
+        """Stop following the flag source and release its connections"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        if self.source is not None:
+            await self.source.close()
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get feature flag snapshot and source status"""
+        return {
+            "initialized": self.initialized,
+            "version": self._snapshot.version,
+            "origin": self._snapshot.origin,
+            "source": self.source.name if self.source is not None else None,
+            "watching": self._watch_task is not None and not self._watch_task.done(),
+            **self._source_counters
+        }
     
     async def update_flag(
         self, 
@@ -174,13 +356,15 @@ class FeatureFlagService:
         target_age_groups: Optional[List[str]] = None
     ):
         """
-        Update feature flag configuration
-        (In production, this would update the database)
+        Update feature flag configuration in this process only
+        A flag source, when configured, is the fleet-wide way to change flags;
+        its next document replaces updates made here
         """
-        if flag not in self.flags:
-            self.flags[flag] = self.default_flags.get(flag, {}).copy()
+        flags = {name: dict(config) for name, config in self._snapshot.flags.items()}
+        if flag not in flags:
+            flags[flag] = self.default_flags.get(flag, {}).copy()
         
-        config = self.flags[flag]
+        config = flags[flag]
         
         if enabled is not None:
             config["enabled"] = enabled
@@ -189,6 +373,7 @@ class FeatureFlagService:
         if target_age_groups is not None:
             config["target_age_groups"] = target_age_groups
         
+        self._publish(flags, "update_flag")
         logger.info(f"Updated feature flag {flag.value}: {config}")
     
     def _load_feature_flags(self) -> Dict[FeatureFlag, Dict[str, Any]]:
@@ -220,24 +405,180 @@ class FeatureFlagService:
         
         return flags
     
+    def _resolve_document(self, document: Optional[Dict[str, Any]], origin: str) -> Dict[FeatureFlag, Dict[str, Any]]:
+        """Flag configuration for a document layered over the base flags"""
+        if document is not None and not isinstance(document, dict):
+            raise ValueError(f"Flag document must be a mapping, got {type(document).__name__}")
+        
+        flags = {flag: dict(config) for flag, config in self._base_flags.items()}
+        for name, value in (document or {}).items():
+            try:
+                flag = FeatureFlag(name)
+            except ValueError:
+                logger.warning(f"Ignoring unknown feature flag in {origin} document: {name}")
+                continue
+            flags[flag] = self._merge_flag_config(flags.get(flag, {}), name, value)
+        return flags
+    
+    def _publish(self, flags: Dict[FeatureFlag, Dict[str, Any]], origin: str):
+        """Compile and swap in a new snapshot"""
+        frozen = MappingProxyType({flag: MappingProxyType(dict(config)) for flag, config in flags.items()})
+        self._snapshot = FlagSnapshot(
+            flags=frozen,
+            decision_table=self._compile_decision_table(frozen),
+            version=self._snapshot.version + 1,
+            origin=origin
+        )
+    
+    def _on_source_document(self, document: Optional[Dict[str, Any]]):
+        """Apply a document pushed by the flag source, keeping the old snapshot if it is invalid"""
+        try:
+            self.apply_document(document, origin=self.source.name)
+            self._source_counters["reloads"] += 1
+        except Exception as e:
+            self._source_counters["reload_errors"] += 1
+            logger.error(f"Rejected feature flag document from {self.source.name}: {e}")
+    
+    async def _watch_source(self):
+        """Keep watching the source, resubscribing after errors"""
+        while True:
+            try:
+                await self.source.watch(self._on_source_document)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._source_counters["watch_errors"] += 1
+                logger.error(f"Feature flag source {self.source.name} failed: {e}")
+            await asyncio.sleep(self.source.retry_seconds)
+    
+    @staticmethod
+    def _merge_flag_config(config: Mapping[str, Any], name: str, value: Any) -> Dict[str, Any]:
+        """Overlay one document entry (a bool or a partial config) onto a flag config"""
+        merged = dict(config)
+        if isinstance(value, bool):
+            merged["enabled"] = value
+            return merged
+        if not isinstance(value, dict):
+            raise ValueError(f"Invalid configuration for {name}: {value!r}")
+        
+        for key, item in value.items():
+            if key == "enabled" and isinstance(item, bool):
+                merged[key] = item
+            elif key == "rollout_percentage" and isinstance(item, (int, float)) and not isinstance(item, bool):
+                merged[key] = max(0, min(100, item))
+            elif key == "target_age_groups" and isinstance(item, list) and all(band in AGE_BANDS for band in item):
+                merged[key] = list(item)
+            elif key == "description" and isinstance(item, str):
+                merged[key] = item
+            else:
+                raise ValueError(f"Invalid {key} for {name}: {item!r}")
+        return merged
+    
+    @staticmethod
+    def _compile_decision_table(
+        flags: Mapping[FeatureFlag, Mapping[str, Any]]
+    ) -> Tuple[Tuple[FlagDecision, ...], ...]:
+        """Precompute the decision for every (flag, age band, rollout bucket)"""
+        table = []
+        for flag in FeatureFlag:
+            config = flags.get(flag, {})
+            rollout_percentage = config.get("rollout_percentage", 0)
+            target_age_groups = config.get("target_age_groups", [])
+            
+            row: List[FlagDecision] = []
+            for age_band in AGE_BANDS + (None,):
+                if not config.get("enabled", False):
+                    row.append(False)
+                elif age_band is not None and target_age_groups and age_band not in target_age_groups:
+                    row.append(False)
+                elif rollout_percentage >= 100:
+                    row.append(True)
+                else:
+                    row.append(bytes(bucket <= rollout_percentage for bucket in range(ROLLOUT_BUCKETS)))
+            table.append(tuple(row))
+        
+        return tuple(table)
+    
+    def _age_band_column(self, age: Optional[int]) -> int:
+        """Decision table column for an age; unknown ages skip age targeting"""
+        if age is None:
+            return _UNKNOWN_AGE_COLUMN
+        return bisect.bisect_left(_AGE_BAND_UPPER_BOUNDS, age)
+    
+    def _cohort_coordinates(
+        self,
+        child_ages: Sequence[Optional[int]],
+        child_ids: Sequence[Optional[str]],
+        seed: Optional[int]
+    ) -> Tuple[Any, Any]:
+        """Decision table column and rollout bucket of every child, as numpy arrays"""
+        if len(child_ages) != len(child_ids):
+            raise ValueError(f"Got {len(child_ages)} ages for {len(child_ids)} child IDs")
+        total = len(child_ids)
+        
+        ages = np.fromiter((np.nan if age is None else age for age in child_ages), dtype=float, count=total)
+        columns = np.searchsorted(_AGE_BAND_UPPER_BOUNDS, ages, side="left")
+        columns[np.isnan(ages)] = _UNKNOWN_AGE_COLUMN
+        
+        # Same bucket as _calculate_user_percentage: the first 4 digest bytes, big-endian, mod 100
+        has_id = np.fromiter((bool(child_id) for child_id in child_ids), dtype=bool, count=total)
+        digests = b"".join(hashlib.md5(child_id.encode()).digest()[:4] for child_id in child_ids if child_id)
+        buckets = np.empty(total, dtype=np.intp)
+        buckets[has_id] = np.frombuffer(digests, dtype=">u4") % 100
+        missing = total - int(has_id.sum())
+        if missing:
+            buckets[~has_id] = np.random.default_rng(seed).integers(0, ROLLOUT_BUCKETS, size=missing)
+        
+        return columns, buckets
+    
+    def _evaluate_cohort(
+        self,
+        decision_table: Tuple[Tuple[FlagDecision, ...], ...],
+        columns: Any,
+        buckets: Any,
+        version: int
+    ) -> BulkFlagEvaluation:
+        """Look up every child's decisions in a dense copy of the decision table"""
+        total = len(columns)
+        if not self.initialized:
+            matrix = np.zeros((total, len(_FLAG_INDEX)), dtype=bool)
+        else:
+            dense = np.zeros((len(decision_table), _UNKNOWN_AGE_COLUMN + 1, ROLLOUT_BUCKETS), dtype=bool)
+            for flag_index, row in enumerate(decision_table):
+                for column, decision in enumerate(row):
+                    if decision is True:
+                        dense[flag_index, column] = True
+                    elif decision is not False:
+                        dense[flag_index, column] = np.frombuffer(decision, dtype=np.uint8).astype(bool)
+            matrix = dense[:, columns, buckets].T
+        
+        flag_counts = matrix.sum(axis=0)
+        return BulkFlagEvaluation(
+            matrix=matrix,
+            counts={flag: int(flag_counts[index]) for flag, index in _FLAG_INDEX.items()},
+            total=total,
+            version=version
+        )
+    
+    def _rollout_bucket(self, child_id: Optional[str], user_percentage: Optional[float]) -> int:
+        """Rollout bucket from the child_id hash, an explicit percentage or a random draw"""
+        if child_id:
+            return self._calculate_user_percentage(child_id)
+        if user_percentage is not None:
+            # Round up so a fractional percentage passes exactly when it is within the rollout
+            return min(max(math.ceil(user_percentage), 0), ROLLOUT_BUCKETS - 1)
+        # Fallback to random percentage (not recommended for production)
+        return random.randint(0, ROLLOUT_BUCKETS - 1)
+    
     def _get_age_band(self, age: int) -> str:
         """Convert age to age band string"""
-        if age <= 10:
-            return "AGE_8_10"
-        elif age <= 13:
-            return "AGE_11_13"
-        elif age <= 16:
-            return "AGE_14_16"
-        else:
-            return "AGE_17_PLUS"
+        return age_band_name(age)
     
     def _calculate_user_percentage(self, child_id: str) -> float:
         """
         Calculate consistent percentage for user-based rollout
         Uses hash of child_id to ensure consistency
         """
-        import hashlib
-        
         # Create hash of child_id
         hash_object = hashlib.md5(child_id.encode())
         hash_hex = hash_object.hexdigest()
@@ -0,0 +1,159 @@
+"""
+Feature Flag Sources
+Live flag configuration from a watched file or Redis, pushed into every worker
+"""
+
+from typing import Dict, Optional, Any, Callable
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Called with each new flag document; a None document means the source is empty
+DocumentCallback = Callable[[Optional[Dict[str, Any]]], None]
+
+class FlagSource:
+    """
+    A place flag documents are read from
+    A document maps flag names to a config dict or a bare enabled boolean, e.g.
+    {"ENHANCED_BIAS_DETECTION": {"rollout_percentage": 25}, "CRISIS_DETECTION": true}
+    """
+    
+    name = "source"
+    retry_seconds = 1.0  # pause before watching again after an error
+    
+    async def load(self) -> Optional[Dict[str, Any]]:
+        """Read the current document"""
+        raise NotImplementedError
+    
+    async def watch(self, on_change: DocumentCallback):
+        """Call on_change with every new document until cancelled"""
+        raise NotImplementedError
+    
+    async def close(self):
+        """Release connections"""
+
+class FileFlagSource(FlagSource):
+    """
+    JSON or YAML file polled for changes
+    The file's mtime and size are checked every `poll_interval` seconds; write
+    new versions atomically (write a temp file, then rename) so a poll never
+    sees a half-written document
+    """
+    
+    name = "file"
+    
+    def __init__(self, path: str, poll_interval: float = 0.25):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._signature = None
+    
+    async def load(self) -> Optional[Dict[str, Any]]:
+        self._signature = self._stat()
+        if self._signature is None:
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if self.path.endswith((".yaml", ".yml")):
+            import yaml  # optional dependency, only needed for YAML flag files
+            return yaml.safe_load(text)
+        return json.loads(text)
+    
+    async def watch(self, on_change: DocumentCallback):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if self._stat() != self._signature:
+                on_change(await self.load())
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+class RedisFlagSource(FlagSource):
+    """
+    Flag document stored under a Redis key, with changes announced on a channel
+    Writers use publish() so the SET and the notification go out together; each
+    worker re-reads the key on every notification. Clients are made per event
+    loop, so a connection opened in the pre-fork parent is never reused by workers
+    """
+    
+    name = "redis"
+    
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        key: str = "aiguardian:feature_flags",
+        channel: str = "aiguardian:feature_flags:updates"
+    ):
+        self.client_factory = client_factory
+        self.key = key
+        self.channel = channel
+        self._client = None
+        self._client_loop = None
+    
+    @property
+    def redis_client(self) -> Any:
+        """Client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = self.client_factory()
+            self._client_loop = loop
+        return self._client
+    
+    async def load(self) -> Optional[Dict[str, Any]]:
+        payload = await self.redis_client.get(self.key)
+        return json.loads(payload) if payload is not None else None
+    
+    async def watch(self, on_change: DocumentCallback):
+        pubsub = self.redis_client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            # Catch up on anything published while the subscription was down
+            on_change(await self.load())
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    on_change(await self.load())
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+    
+    async def publish(self, document: Dict[str, Any]):
+        """Store a new document and notify every subscribed worker"""
+        await self.redis_client.set(self.key, json.dumps(document))
+        await self.redis_client.publish(self.channel, "updated")
+    
+    async def close(self):
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.close()
+        self._client = None
+
+def flag_source_from_env() -> Optional[FlagSource]:
+    """
+    Build the configured flag source, if any
+    FEATURE_FLAG_SOURCE_FILE selects a watched file (FEATURE_FLAG_SOURCE_POLL_SECONDS);
+    FEATURE_FLAG_SOURCE_REDIS_URL selects Redis (FEATURE_FLAG_REDIS_KEY, FEATURE_FLAG_REDIS_CHANNEL)
+    """
+    path = os.getenv("FEATURE_FLAG_SOURCE_FILE")
+    if path:
+        return FileFlagSource(path, poll_interval=float(os.getenv("FEATURE_FLAG_SOURCE_POLL_SECONDS", 0.25)))
+    
+    redis_url = os.getenv("FEATURE_FLAG_SOURCE_REDIS_URL")
+    if redis_url:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("redis package not available, Redis feature flag source disabled")
+            return None
+        kwargs = {}
+        if os.getenv("FEATURE_FLAG_REDIS_KEY"):
+            kwargs["key"] = os.getenv("FEATURE_FLAG_REDIS_KEY")
+        if os.getenv("FEATURE_FLAG_REDIS_CHANNEL"):
+            kwargs["channel"] = os.getenv("FEATURE_FLAG_REDIS_CHANNEL")
+        return RedisFlagSource(lambda: redis_asyncio.from_url(redis_url), **kwargs)
+    
+    return None
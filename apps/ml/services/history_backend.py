@@ -0,0 +1,341 @@
+"""
+History Backend
+Persistent per-child history with a hot in-memory window and write-behind batching
+"""
+
+from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .history_store import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+# (child_id, epoch timestamp, field values)
+HistoryRecord = Tuple[str, float, Dict[str, Any]]
+
+# SQLite connections inherited across fork(); kept referenced so they are never
+# closed (a close may checkpoint the WAL under the parent's feet)
+_inherited_connections: List[sqlite3.Connection] = []
+
+class HistoryBackend:
+    """Durable storage for history records shared by every worker"""
+    
+    async def append_many(self, records: List[HistoryRecord]):
+        """Persist a batch of records"""
+        raise NotImplementedError
+    
+    async def load(self, child_id: str, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return the most recent `limit` records for a child, oldest first"""
+        raise NotImplementedError
+    
+    async def close(self):
+        """Release connections"""
+
+class SQLiteHistoryBackend(HistoryBackend):
+    """
+    Local SQLite file backend; blocking calls run in a worker thread
+    The connection is opened by the process that first uses it: a connection must
+    not cross fork(), and backends are built at import time in the preloading
+    parent of pre-forked workers
+    """
+    
+    def __init__(self, path: str, table: str = "history"):
+        self.path = path
+        self.table = table
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+    
+    async def append_many(self, records: List[HistoryRecord]):
+        rows = [(child_id, timestamp, json.dumps(values)) for child_id, timestamp, values in records]
+        self._check_process()
+        await asyncio.to_thread(self._insert, rows)
+    
+    async def load(self, child_id: str, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        self._check_process()
+        rows = await asyncio.to_thread(self._select, child_id, limit)
+        return [(timestamp, json.loads(payload)) for timestamp, payload in reversed(rows)]
+    
+    async def close(self):
+        self._check_process()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+    
+    def _check_process(self):
+        """Drop state inherited from a parent process (called on the event loop thread)"""
+        if self._pid != os.getpid():
+            # The inherited lock may have been held by a thread that no longer exists
+            self._lock = threading.Lock()
+            if self._connection is not None:
+                _inherited_connections.append(self._connection)
+            self._connection = None
+            self._pid = os.getpid()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open this process's connection and create the table on first use (lock held)"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(child_id TEXT NOT NULL, timestamp REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_child_time ON {self.table} (child_id, timestamp)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _insert(self, rows: List[Tuple[str, float, str]]):
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                f"INSERT INTO {self.table} (child_id, timestamp, payload) VALUES (?, ?, ?)", rows
+            )
+            connection.commit()
+    
+    def _select(self, child_id: str, limit: int) -> List[Tuple[float, str]]:
+        with self._lock:
+            return self._connect().execute(
+                f"SELECT timestamp, payload FROM {self.table} "
+                "WHERE child_id = ? ORDER BY timestamp DESC, rowid DESC LIMIT ?",
+                (child_id, limit)
+            ).fetchall()
+
+class RedisHistoryBackend(HistoryBackend):
+    """Redis list per child, trimmed to the most recent `max_length` records"""
+    
+    def __init__(self, redis_client: Any, key_prefix: str = "aiguardian:history:", max_length: int = 1000):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.max_length = max_length
+    
+    async def append_many(self, records: List[HistoryRecord]):
+        pipeline = self.redis_client.pipeline()
+        touched = set()
+        for child_id, timestamp, values in records:
+            key = self.key_prefix + child_id
+            pipeline.rpush(key, json.dumps({"timestamp": timestamp, "values": values}))
+            touched.add(key)
+        for key in touched:
+            pipeline.ltrim(key, -self.max_length, -1)
+        await pipeline.execute()
+    
+    async def load(self, child_id: str, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        payloads = await self.redis_client.lrange(self.key_prefix + child_id, -limit, -1)
+        entries = [json.loads(payload) for payload in payloads]
+        return [(entry["timestamp"], entry["values"]) for entry in entries]
+    
+    async def close(self):
+        await self.redis_client.close()
+
+def history_backend_from_url(url: Optional[str], namespace: str) -> Optional[HistoryBackend]:
+    """
+    Build a backend from a URL
+    sqlite:///path/to/file.db or redis://host:port/db; None or empty keeps history in memory only
+    """
+    if not url:
+        return None
+    
+    if url.startswith("sqlite:///"):
+        return SQLiteHistoryBackend(url[len("sqlite:///"):], table=namespace)
+    
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning(f"redis package not available, {namespace} kept in memory only")
+            return None
+        return RedisHistoryBackend(redis_asyncio.from_url(url), key_prefix=f"aiguardian:{namespace}:")
+    
+    raise ValueError(f"Unsupported history backend URL: {url}")
+
+class WriteBehindHistory:
+    """
+    Hot in-memory history window in front of a persistent backend
+    Appends land in the ring store immediately and are queued for the backend;
+    a background task flushes the queue in batches. Reads hydrate a child's
+    window from the backend on a miss, and again once it is older than
+    `refresh_seconds`, so every worker converges on the same trend data
+    """
+    
+    def __init__(
+        self,
+        store: HistoryStore,
+        backend: Optional[HistoryBackend] = None,
+        batch_size: int = 100,
+        flush_interval_seconds: float = 1.0,
+        refresh_seconds: float = 30.0,
+        max_pending: int = 10000
+    ):
+        self.store = store
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.refresh_seconds = refresh_seconds
+        self.max_pending = max_pending
+        
+        self._pending: List[HistoryRecord] = []
+        self._hydrated_at: "OrderedDict[str, float]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._counters = {
+            "flushes": 0,
+            "flushed_records": 0,
+            "dropped_records": 0,
+            "hydrations": 0,
+            "backend_errors": 0
+        }
+    
+    @classmethod
+    def from_env(cls, env_prefix: str, store: HistoryStore) -> "WriteBehindHistory":
+        """Build from {env_prefix}_BACKEND, _FLUSH_BATCH_SIZE, _FLUSH_INTERVAL_SECONDS and _REFRESH_SECONDS"""
+        return cls(
+            store,
+            backend=history_backend_from_url(os.getenv(f"{env_prefix}_BACKEND"), env_prefix.lower()),
+            batch_size=int(os.getenv(f"{env_prefix}_FLUSH_BATCH_SIZE", 100)),
+            flush_interval_seconds=float(os.getenv(f"{env_prefix}_FLUSH_INTERVAL_SECONDS", 1.0)),
+            refresh_seconds=float(os.getenv(f"{env_prefix}_REFRESH_SECONDS", 30.0))
+        )
+    
+    @property
+    def persistent(self) -> bool:
+        """Whether records are written through to a backend"""
+        return self.backend is not None
+    
+    def __len__(self) -> int:
+        return len(self.store)
+    
+    def length(self, child_id: str) -> int:
+        """Number of records in the hot window for a child"""
+        return self.store.length(child_id)
+    
+    async def append(self, child_id: str, **values):
+        """Record an entry in the hot window and queue it for the backend"""
+        timestamp = time.time()
+        self.store.append(child_id, timestamp=timestamp, **values)
+        if self.backend is None:
+            return
+        
+        self._pending.append((child_id, timestamp, values))
+        if len(self._pending) > self.max_pending:
+            overflow = len(self._pending) - self.max_pending
+            del self._pending[:overflow]
+            self._counters["dropped_records"] += overflow
+        
+        self._ensure_flush_task()
+        if len(self._pending) >= self.batch_size:
+            self._flush_wakeup.set()
+    
+    async def column(self, child_id: str, name: str, last: Optional[int] = None) -> List[Any]:
+        """Values of one field for a child, refreshing the hot window from the backend if stale"""
+        if self.backend is not None and self._needs_hydration(child_id):
+            await self.hydrate(child_id)
+        return self.store.column(child_id, name, last)
+    
+    async def hydrate(self, child_id: str):
+        """
+        Replace a child's hot window with the most recent records from the backend
+        This worker's records for the child that are still queued are laid over the
+        persisted ones, so a read never waits on a flush
+        """
+        try:
+            rows = await self.backend.load(child_id, self.store.capacity)
+        except Exception as e:
+            self._counters["backend_errors"] += 1
+            logger.warning(f"History hydration failed for {child_id}: {e}")
+            return
+        
+        # A batch being flushed stays queued until written, so it may be in both
+        persisted = {(timestamp, json.dumps(values, sort_keys=True)) for timestamp, values in rows}
+        queued = [
+            (timestamp, values) for pending_child_id, timestamp, values in self._pending
+            if pending_child_id == child_id
+            and (timestamp, json.dumps(values, sort_keys=True)) not in persisted
+        ]
+        if queued:
+            rows = sorted(rows + queued, key=lambda row: row[0])[-self.store.capacity:]
+        
+        self.store.discard(child_id)
+        for timestamp, values in rows:
+            self.store.append(child_id, timestamp=timestamp, **values)
+        
+        self._hydrated_at[child_id] = time.monotonic()
+        self._hydrated_at.move_to_end(child_id)
+        while len(self._hydrated_at) > self.store.max_children:
+            self._hydrated_at.popitem(last=False)
+        self._counters["hydrations"] += 1
+    
+    async def flush(self):
+        """Write every queued record to the backend in batches"""
+        if self.backend is None:
+            return
+        
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                try:
+                    await self.backend.append_many(batch)
+                except Exception as e:
+                    self._counters["backend_errors"] += 1
+                    logger.warning(f"History flush failed, {len(self._pending)} records kept queued: {e}")
+                    return
+                del self._pending[:len(batch)]
+                self._counters["flushes"] += 1
+                self._counters["flushed_records"] += len(batch)
+    
+    async def close(self):
+        """Stop the flush task, drain the queue and close the backend"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        if self.backend is not None:
+            await self.flush()
+            await self.backend.close()
+            # Closing twice (e.g. shared assessor shut down by several owners) is a no-op
+            self.backend = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hot window stats plus write-behind counters"""
+        return {
+            **self.store.stats(),
+            **self._counters,
+            "persistent": self.persistent,
+            "pending_records": len(self._pending)
+        }
+    
+    def _needs_hydration(self, child_id: str) -> bool:
+        hydrated_at = self._hydrated_at.get(child_id)
+        if hydrated_at is None or child_id not in self.store:
+            return True
+        return time.monotonic() - hydrated_at > self.refresh_seconds
+    
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        """Flush when a batch fills up or the interval elapses"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            await self.flush()
@@ -0,0 +1,212 @@
+"""
+History Store
+Bounded per-child history kept in fixed-size ring buffers
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Iterable, Sequence
+from collections import OrderedDict
+from array import array
+from datetime import datetime
+import os
+import sys
+import time
+
+class HistoryRing:
+    """
+    Fixed-capacity ring buffer for one child
+    Each field is a preallocated typed array; appends overwrite the oldest slot
+    instead of growing and re-slicing a list of dicts
+    """
+    __slots__ = ("capacity", "timestamps", "columns", "head", "size", "last_seen")
+    
+    def __init__(self, capacity: int, float_fields: Iterable[str], code_fields: Iterable[str]):
+        self.capacity = capacity
+        self.timestamps = array("d", [0.0]) * capacity  # epoch seconds
+        self.columns = {name: array("d", [0.0]) * capacity for name in float_fields}
+        self.columns.update({name: array("b", [0]) * capacity for name in code_fields})
+        self.head = 0  # next slot to write
+        self.size = 0
+        self.last_seen = 0.0
+    
+    def append(self, timestamp: float, values: Dict[str, Any]):
+        """Write one record into the next slot"""
+        slot = self.head
+        self.timestamps[slot] = timestamp
+        for name, column in self.columns.items():
+            column[slot] = values[name]
+        self.head = (slot + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+    
+    def slots(self, last: Optional[int] = None) -> List[int]:
+        """Slot indexes of the most recent `last` records, oldest first"""
+        count = self.size if last is None else max(0, min(last, self.size))
+        start = (self.head - count) % self.capacity
+        return [(start + i) % self.capacity for i in range(count)]
+    
+    def nbytes(self) -> int:
+        """Approximate memory held by this ring"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.timestamps)
+            + sys.getsizeof(self.columns)
+            + sum(sys.getsizeof(column) for column in self.columns.values())
+        )
+
+class HistoryStore:
+    """
+    Per-child history with bounded memory
+    Every child gets a ring of `capacity` records; children are evicted globally
+    in least-recently-updated order once `max_children` is exceeded, and children
+    with no update for longer than `idle_ttl_seconds` are dropped
+    """
+    
+    def __init__(
+        self,
+        float_fields: Sequence[str] = (),
+        code_fields: Optional[Dict[str, Sequence[Any]]] = None,
+        capacity: int = 30,
+        max_children: int = 100000,
+        idle_ttl_seconds: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        
+        self.float_fields = tuple(float_fields)
+        # Enum-like fields are stored as small integer codes
+        self.code_values = {name: tuple(values) for name, values in (code_fields or {}).items()}
+        self._code_lookup = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.code_values.items()
+        }
+        self.capacity = capacity
+        self.max_children = max_children
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.clock = clock
+        
+        self._rings: "OrderedDict[str, HistoryRing]" = OrderedDict()
+        self._ring_bytes = HistoryRing(capacity, self.float_fields, self.code_values).nbytes()
+        self._counters = {
+            "appends": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+    
+    @classmethod
+    def from_env(cls, env_prefix: str, **kwargs) -> "HistoryStore":
+        """Build a store, reading {env_prefix}_MAX_CHILDREN and {env_prefix}_IDLE_TTL_SECONDS"""
+        max_children = os.getenv(f"{env_prefix}_MAX_CHILDREN")
+        idle_ttl_seconds = os.getenv(f"{env_prefix}_IDLE_TTL_SECONDS")
+        if max_children is not None:
+            kwargs["max_children"] = int(max_children)
+        if idle_ttl_seconds is not None:
+            kwargs["idle_ttl_seconds"] = float(idle_ttl_seconds)
+        return cls(**kwargs)
+    
+    def __len__(self) -> int:
+        return len(self._rings)
+    
+    def __contains__(self, child_id: str) -> bool:
+        return self._live_ring(child_id, self.clock()) is not None
+    
+    def append(self, child_id: str, timestamp: Optional[float] = None, **values):
+        """Record one entry for a child"""
+        now = self.clock()
+        self._expire_idle(now)
+        
+        encoded = dict(values)
+        for name, lookup in self._code_lookup.items():
+            try:
+                encoded[name] = lookup[values[name]]
+            except KeyError:
+                raise ValueError(f"Unknown value for history field '{name}': {values.get(name)!r}")
+        
+        ring = self._rings.get(child_id)
+        if ring is None:
+            ring = HistoryRing(self.capacity, self.float_fields, self.code_values)
+            self._rings[child_id] = ring
+        else:
+            self._rings.move_to_end(child_id)
+        
+        ring.append(now if timestamp is None else timestamp, encoded)
+        ring.last_seen = now
+        self._counters["appends"] += 1
+        
+        while len(self._rings) > self.max_children:
+            self._rings.popitem(last=False)
+            self._counters["evictions"] += 1
+    
+    def length(self, child_id: str) -> int:
+        """Number of records held for a child"""
+        ring = self._live_ring(child_id, self.clock())
+        return ring.size if ring else 0
+    
+    def column(self, child_id: str, name: str, last: Optional[int] = None) -> List[Any]:
+        """Values of one field for a child, oldest first"""
+        ring = self._live_ring(child_id, self.clock())
+        if ring is None:
+            return []
+        
+        if name == "timestamp":
+            return [ring.timestamps[slot] for slot in ring.slots(last)]
+        
+        column = ring.columns[name]
+        values = [column[slot] for slot in ring.slots(last)]
+        if name in self.code_values:
+            decode = self.code_values[name]
+            return [decode[code] for code in values]
+        return values
+    
+    def records(self, child_id: str, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Decoded records for a child, oldest first, with ISO timestamps"""
+        ring = self._live_ring(child_id, self.clock())
+        if ring is None:
+            return []
+        
+        records = []
+        for slot in ring.slots(last):
+            record = {"timestamp": datetime.fromtimestamp(ring.timestamps[slot]).isoformat()}
+            for name, column in ring.columns.items():
+                value = column[slot]
+                record[name] = self.code_values[name][value] if name in self.code_values else value
+            records.append(record)
+        return records
+    
+    def discard(self, child_id: str):
+        """Drop all history for a child"""
+        self._rings.pop(child_id, None)
+    
+    def clear(self):
+        """Drop all history"""
+        self._rings.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy, eviction counters and memory footprint"""
+        return {
+            **self._counters,
+            "children": len(self._rings),
+            "max_children": self.max_children,
+            "capacity": self.capacity,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "bytes_per_child": self._ring_bytes,
+            "memory_bytes": self._ring_bytes * len(self._rings) + sys.getsizeof(self._rings)
+        }
+    
+    def _live_ring(self, child_id: str, now: float) -> Optional[HistoryRing]:
+        """Return the child's ring unless it has gone idle past the TTL"""
+        ring = self._rings.get(child_id)
+        if ring is not None and now - ring.last_seen > self.idle_ttl_seconds:
+            del self._rings[child_id]
+            self._counters["expirations"] += 1
+            return None
+        return ring
+    
+    def _expire_idle(self, now: float):
+        """Drop idle children from the least recently used end"""
+        while self._rings:
+            child_id, ring = next(iter(self._rings.items()))
+            if now - ring.last_seen <= self.idle_ttl_seconds:
+                break
+            del self._rings[child_id]
+            self._counters["expirations"] += 1
@@ -21,12 +21,15 @@ class KidGPTService:
     Delegates to enhanced KidGPT service while maintaining existing API
     """
     
-    def __init__(self):
-        self.enhanced_service = EnhancedKidGPTService()
+    def __init__(self, enhanced_service: Optional[EnhancedKidGPTService] = None):
+        self.enhanced_service = enhanced_service or EnhancedKidGPTService()
         self.initialized = False
     
     async def initialize(self):
         """Initialize the KidGPT service"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing legacy KidGPT service...")
             await self.enhanced_service.initialize()
@@ -41,7 +44,8 @@ class KidGPTService:
         message: str,
         mode: str,
         child_age: int,
-        child_id: Optional[str] = None
+        child_id: Optional[str] = None,
+        conversation_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Legacy response generation interface
@@ -57,7 +61,8 @@ class KidGPTService:
                     message=message,
                     mode=mode,
                     child_id=child_id,
-                    child_age=child_age
+                    child_age=child_age,
+                    conversation_id=conversation_id
                 )
                 
                 # Return backward-compatible response with optional enhancements
@@ -73,7 +78,8 @@ class KidGPTService:
                         "emotional_analysis": enhanced_response.get("emotional_analysis"),
                         "crisis_assessment": enhanced_response.get("crisis_assessment"),
                         "support_recommendations": enhanced_response.get("support_recommendations"),
-                        "parent_notification": enhanced_response.get("parent_notification")
+                        "parent_notification": enhanced_response.get("parent_notification"),
+                        "conversation_context": enhanced_response.get("conversation_context")
                     }
                 }
             else:
@@ -84,6 +90,15 @@ class KidGPTService:
             logger.error(f"KidGPT response generation failed: {e}")
             return self._get_fallback_response(message, mode)
     
+    async def get_status(self) -> Dict[str, Any]:
+        """Get KidGPT service status"""
+        return {
+            "initialized": self.initialized,
+            "enhanced_service_initialized": self.enhanced_service.initialized,
+            "emotional_history": self.enhanced_service.emotional_history.stats(),
+            "conversation_trajectories": self.enhanced_service.conversation_trajectories.stats()
+        }
+    
     async def _generate_legacy_response(self, message: str, mode: str, child_age: int) -> Dict[str, Any]:
         """Generate legacy-style response without emotional features"""
         # Simple response generation for backward compatibility
@@ -9,8 +9,14 @@ import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
-import numpy as np
 import json
+from utils.lazy_import import lazy_import
+from .text_preprocessor import PreprocessedText, ensure_preprocessed
+from .history_store import HistoryStore
+from .history_backend import WriteBehindHistory
+
+# numpy loads on first scoring call, not at service import
+np = lazy_import("numpy")
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,9 @@ class RiskFactor(Enum):
     EMOTIONAL_INDICATOR = "emotional_indicator"
     CUMULATIVE_EXPOSURE = "cumulative_exposure"
 
+# Column order of the batch scoring arrays
+RISK_FACTOR_COLUMNS: Tuple[RiskFactor, ...] = tuple(RiskFactor)
+
 @dataclass
 class RiskIndicator:
     factor: RiskFactor
@@ -112,10 +121,23 @@ class PredictiveRiskAssessor:
         }
         
         self.initialized = False
-        self.risk_history = {}  # In-memory cache (would be database in production)
+        # Hot window of the last 30 assessments per child, written behind to
+        # the RISK_HISTORY_BACKEND store when one is configured
+        self.risk_history = WriteBehindHistory.from_env(
+            "RISK_HISTORY",
+            HistoryStore.from_env(
+                "RISK_HISTORY",
+                float_fields=("composite_score",),
+                code_fields={"risk_level": [level.value for level in RiskLevel]},
+                capacity=30
+            )
+        )
     
     async def initialize(self):
         """Initialize the risk assessor"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing predictive risk assessor...")
             self.initialized = True
@@ -124,13 +146,18 @@ class PredictiveRiskAssessor:
             logger.error(f"Failed to initialize risk assessor: {e}")
             raise
     
+    async def shutdown(self):
+        """Flush queued risk history to the persistent backend"""
+        await self.risk_history.close()
+    
     async def assess_risk(
         self,
         content: str,
         content_type: str,
         child_id: str,
         child_age: int,
-        session_context: Optional[Dict] = None
+        session_context: Optional[Dict] = None,
+        preprocessed: Optional[PreprocessedText] = None
     ) -> Dict[str, Any]:
         """
         Comprehensive risk assessment with predictive modeling
@@ -144,7 +171,8 @@ class PredictiveRiskAssessor:
             current_session = session_context or await self._get_session_context(child_id)
             
             # Analyze individual risk factors
-            content_safety_risk = await self._assess_content_safety_risk(content, child_age)
+            text = ensure_preprocessed(content, preprocessed)
+            content_safety_risk = await self._assess_content_safety_risk(text, child_age)
             behavioral_risk = await self._assess_behavioral_risk(child_id, current_session)
             temporal_risk = await self._assess_temporal_risk(child_id, current_session)
             emotional_risk = await self._assess_emotional_risk(child_id, content)
@@ -174,8 +202,7 @@ class PredictiveRiskAssessor:
             # Store risk data for trend analysis
             await self._store_risk_assessment(child_id, {
                 "composite_score": composite_score,
-                "risk_level": risk_level.value,
-                "timestamp": datetime.now().isoformat()
+                "risk_level": risk_level.value
             })
             
             return {
@@ -211,11 +238,11 @@ class PredictiveRiskAssessor:
             logger.error(f"Risk assessment failed: {e}")
             return self._get_fallback_risk_assessment()
     
-    async def _assess_content_safety_risk(self, content: str, child_age: int) -> RiskIndicator:
+    async def _assess_content_safety_risk(self, text: PreprocessedText, child_age: int) -> RiskIndicator:
         """Assess risk from current content safety analysis"""
         # Simplified content analysis (would integrate with safety detector)
         safety_keywords = ["violence", "inappropriate", "mature", "dangerous"]
-        content_lower = content.lower()
+        content_lower = text.lowered
         
         risk_score = 0.0
         evidence = []
@@ -410,6 +437,87 @@ class PredictiveRiskAssessor:
         
         return min(composite_score, 1.0)
     
+    def score_risk_arrays(self, scores: "np.ndarray", confidences: "np.ndarray") -> Dict[str, "np.ndarray"]:
+        """
+        Batch risk scoring: composite score, risk level and confidence for N children
+        `scores` and `confidences` are (N, 5) arrays with columns in RISK_FACTOR_COLUMNS
+        order; results are arrays of length N. Each step mirrors the scalar path
+        operation for operation so results are bit-identical to assess_risk: factors
+        are accumulated in the same order, then the same normalization, risk curve,
+        thresholds and confidence are applied
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        if scores.ndim != 2 or scores.shape[1] != len(RISK_FACTOR_COLUMNS) or confidences.shape != scores.shape:
+            raise ValueError(
+                f"Expected score and confidence arrays of shape (N, {len(RISK_FACTOR_COLUMNS)}), "
+                f"got {scores.shape} and {confidences.shape}"
+            )
+        
+        weighted_sum = np.zeros(scores.shape[0], dtype=np.float64)
+        confidence_weights = np.zeros(scores.shape[0], dtype=np.float64)
+        
+        for column, factor in enumerate(RISK_FACTOR_COLUMNS):
+            confidence_adjusted_weight = self.risk_weights[factor] * confidences[:, column]
+            weighted_sum += scores[:, column] * confidence_adjusted_weight
+            confidence_weights += confidence_adjusted_weight
+        
+        composite_scores = weighted_sum / np.maximum(confidence_weights, 0.1)
+        composite_scores = np.minimum(self._apply_risk_curve(composite_scores), 1.0)
+        
+        risk_levels = np.select(
+            [
+                composite_scores >= self.intervention_thresholds[RiskLevel.CRITICAL],
+                composite_scores >= self.intervention_thresholds[RiskLevel.HIGH],
+                composite_scores >= self.intervention_thresholds[RiskLevel.MEDIUM]
+            ],
+            [RiskLevel.CRITICAL.value, RiskLevel.HIGH.value, RiskLevel.MEDIUM.value],
+            default=RiskLevel.LOW.value
+        )
+        
+        return {
+            "composite_risk_score": composite_scores,
+            "risk_level": risk_levels,
+            "risk_confidence": self._calculate_prediction_confidence(composite_scores)
+        }
+    
+    @staticmethod
+    def risk_factor_arrays(
+        risk_factor_sets: List[Dict[RiskFactor, RiskIndicator]]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(scores, confidences) arrays for score_risk_arrays from per-child indicators"""
+        shape = (len(risk_factor_sets), len(RISK_FACTOR_COLUMNS))
+        indicators = [
+            risk_factors[factor] for risk_factors in risk_factor_sets for factor in RISK_FACTOR_COLUMNS
+        ]
+        scores = np.fromiter((indicator.score for indicator in indicators), np.float64, len(indicators))
+        confidences = np.fromiter((indicator.confidence for indicator in indicators), np.float64, len(indicators))
+        return scores.reshape(shape), confidences.reshape(shape)
+    
+    async def assess_risk_batch(
+        self, 
+        risk_factor_sets: List[Dict[RiskFactor, RiskIndicator]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Adapter over score_risk_arrays for callers holding RiskIndicator dicts
+        Returns composite score, risk level and confidence per child. Converting
+        the dicts is a Python loop over every child, so large batches should keep
+        factor scores in arrays and call score_risk_arrays directly
+        """
+        scored = self.score_risk_arrays(*self.risk_factor_arrays(risk_factor_sets))
+        return [
+            {
+                "composite_risk_score": composite_score,
+                "risk_level": risk_level,
+                "risk_confidence": risk_confidence
+            }
+            for composite_score, risk_level, risk_confidence in zip(
+                scored["composite_risk_score"].tolist(),
+                scored["risk_level"].tolist(),
+                scored["risk_confidence"].tolist()
+            )
+        ]
+    
     def _apply_risk_curve(self, linear_score: float) -> float:
         """Apply non-linear risk curve for better sensitivity"""
         # Sigmoid-like curve that amplifies higher risks
@@ -478,7 +586,7 @@ class PredictiveRiskAssessor:
     
     async def _calculate_risk_trend(self, child_id: str) -> Dict[str, Any]:
         """Calculate risk trend analysis"""
-        risk_history = self.risk_history.get(child_id, [])
+        risk_history = await self.risk_history.column(child_id, "composite_score")
         
         if len(risk_history) < 3:
             return {
@@ -488,8 +596,8 @@ class PredictiveRiskAssessor:
             }
         
         # Simple trend calculation (would be more sophisticated in production)
-        recent_scores = [entry["composite_score"] for entry in risk_history[-7:]]
-        older_scores = [entry["composite_score"] for entry in risk_history[-14:-7]] if len(risk_history) >= 14 else []
+        recent_scores = risk_history[-7:]
+        older_scores = risk_history[-14:-7] if len(risk_history) >= 14 else []
         
         if older_scores:
             recent_avg = np.mean(recent_scores)
@@ -583,9 +691,9 @@ class PredictiveRiskAssessor:
         return recommendations
     
     def _calculate_prediction_confidence(self, composite_score: float) -> float:
-        """Calculate confidence in risk predictions"""
+        """Calculate confidence in risk predictions (scalar or array)"""
         # Higher confidence for more extreme scores
-        return 0.6 + (0.3 * abs(composite_score - 0.5) * 2)
+        return 0.6 + (0.3 * np.abs(composite_score - 0.5) * 2)
     
     def _get_age_group(self, age: int) -> str:
         """Get age group classification"""
@@ -600,14 +708,12 @@ class PredictiveRiskAssessor:
     
     async def _store_risk_assessment(self, child_id: str, assessment_data: Dict):
         """Store risk assessment for trend analysis"""
-        if child_id not in self.risk_history:
-            self.risk_history[child_id] = []
-        
-        self.risk_history[child_id].append(assessment_data)
-        
-        # Keep only last 30 assessments for memory management
-        if len(self.risk_history[child_id]) > 30:
-            self.risk_history[child_id] = self.risk_history[child_id][-30:]
+        # Ring buffer keeps only the last 30 assessments
+        await self.risk_history.append(
+            child_id,
+            composite_score=assessment_data["composite_score"],
+            risk_level=assessment_data["risk_level"]
+        )
     
     # Mock data methods (would connect to database in production)
     
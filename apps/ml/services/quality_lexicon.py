@@ -0,0 +1,82 @@
+"""
+Quality Lexicon
+Single-pass indicator matching and per-dimension weights for quality scoring
+"""
+
+from typing import Dict, List, Iterable, Mapping, Set, Tuple
+from dataclasses import dataclass, replace
+import json
+import logging
+import os
+
+from utils.aho_corasick import AhoCorasickAutomaton
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class DimensionWeights:
+    """How indicator counts turn into one dimension's score"""
+    base: float
+    positive: float  # points per distinct positive indicator
+    negative: float  # points per distinct negative indicator
+    weight: float = 1.0  # share of the overall quality score
+
+DEFAULT_DIMENSION_WEIGHTS = {
+    "factuality": DimensionWeights(base=70, positive=5, negative=3),
+    "depth": DimensionWeights(base=60, positive=6, negative=4),
+    "clarity": DimensionWeights(base=75, positive=5, negative=5)
+}
+
+def dimension_weights_from_env() -> Dict[str, DimensionWeights]:
+    """
+    Default weights with overrides from QUALITY_SCORER_WEIGHTS, a JSON object of
+    partial weights per dimension, e.g. {"depth": {"positive": 8}, "clarity": {"weight": 2}}
+    """
+    weights = dict(DEFAULT_DIMENSION_WEIGHTS)
+    env_value = os.getenv("QUALITY_SCORER_WEIGHTS")
+    if not env_value:
+        return weights
+    
+    try:
+        overrides = json.loads(env_value)
+        for dimension, fields in overrides.items():
+            if dimension not in weights:
+                raise ValueError(f"unknown dimension {dimension}")
+            weights[dimension] = replace(weights[dimension], **{key: float(value) for key, value in fields.items()})
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.warning(f"Invalid QUALITY_SCORER_WEIGHTS, using defaults: {e}")
+        return dict(DEFAULT_DIMENSION_WEIGHTS)
+    return weights
+
+class QualityLexicon:
+    """
+    Every dimension's indicators in one automaton
+    One pass over the lowercased text finds which indicators occur; each distinct
+    indicator counts once, like the substring checks it replaces
+    """
+    
+    def __init__(self, indicators: Mapping[str, Mapping[str, List[str]]]):
+        self.dimensions = tuple(indicators)
+        self.matcher = AhoCorasickAutomaton()
+        for dimension, polarities in indicators.items():
+            for polarity, words in polarities.items():
+                for word in words:
+                    self.matcher.add(word, (dimension, polarity, word))
+        self.matcher.build()
+    
+    def scan(self, lowered: str, state: int = 0) -> Tuple[Set[Tuple[str, str, str]], int]:
+        """Indicators found in lowercased text, and the state to resume scanning from"""
+        pattern_ids, state = self.matcher.scan_ids(lowered, state)
+        return {self.matcher.payloads[pattern_id] for pattern_id in pattern_ids}, state
+    
+    def count(self, lowered: str) -> Dict[str, Tuple[int, int]]:
+        """Distinct (positive, negative) indicator counts per dimension"""
+        found, _ = self.scan(lowered)
+        return self.tally(found)
+    
+    def tally(self, found: Iterable[Tuple[str, str, str]]) -> Dict[str, Tuple[int, int]]:
+        """Per-dimension (positive, negative) counts for a set of found indicators"""
+        counts = {dimension: [0, 0] for dimension in self.dimensions}
+        for dimension, polarity, _ in found:
+            counts[dimension][0 if polarity == "positive" else 1] += 1
+        return {dimension: (positive, negative) for dimension, (positive, negative) in counts.items()}
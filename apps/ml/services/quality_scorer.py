@@ -3,10 +3,11 @@ Quality Scorer Service
 Evaluates content quality including factuality, depth, and clarity
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 import asyncio
 import logging
-import re
+from .quality_lexicon import QualityLexicon, dimension_weights_from_env
+from .text_preprocessor import PreprocessedText, SENTENCE_SPLIT_PATTERN, ensure_preprocessed
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +35,16 @@ class QualityScorer:
                 "negative": ["confusing", "unclear", "complex", "jargon"]
             }
         }
+        
+        # Every indicator is matched in one pass; scoring weights come from configuration
+        self.lexicon = QualityLexicon(self.quality_indicators)
+        self.weights = dimension_weights_from_env()
     
     async def initialize(self):
         """Initialize the quality scorer"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing quality scorer...")
             self.initialized = True
@@ -45,7 +53,12 @@ class QualityScorer:
             logger.error(f"Failed to initialize quality scorer: {e}")
             raise
     
-    async def score_quality(self, content: str, content_type: str = "text") -> Dict[str, Any]:
+    async def score_quality(
+        self, 
+        content: str, 
+        content_type: str = "text",
+        preprocessed: Optional[PreprocessedText] = None
+    ) -> Dict[str, Any]:
         """
         Score content quality across multiple dimensions
         Returns quality scores and confidence metrics
@@ -54,28 +67,10 @@ class QualityScorer:
             await self.initialize()
         
         try:
-            # Calculate individual quality metrics
-            factuality = self._score_factuality(content)
-            depth = self._score_depth(content)
-            clarity = self._score_clarity(content)
-            
-            # Calculate overall quality score
-            quality_score = int((factuality + depth + clarity) / 3)
-            
-            # Calculate confidence based on content analysis
-            confidence = self._calculate_confidence(content, content_type)
-            
-            return {
-                "quality_score": quality_score,
-                "quality_confidence": confidence,
-                "factuality": factuality,
-                "depth": depth,
-                "clarity": clarity,
-                "content_type": content_type,
-                "word_count": len(content.split()),
-                "analysis_timestamp": "2024-01-01T00:00:00Z"
-            }
-            
+            text = ensure_preprocessed(content, preprocessed)
+            counts = self.lexicon.count(text.lowered)
+            return self.build_result(counts, text.word_count, text.sentence_count, content_type)
+        
         except Exception as e:
             logger.error(f"Quality scoring failed: {e}")
             return {
@@ -89,62 +84,89 @@ class QualityScorer:
                 "analysis_timestamp": "2024-01-01T00:00:00Z"
             }
     
-    def _score_factuality(self, content: str) -> int:
+    def accumulator(self, content_type: str = "text") -> "QualityAccumulator":
+        """Start incremental scoring of an append-only document"""
+        return QualityAccumulator(self, content_type)
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get quality scorer status"""
+        return {
+            "initialized": self.initialized,
+            "dimensions": list(self.quality_indicators.keys()),
+            "weights": {dimension: vars(weights) for dimension, weights in self.weights.items()}
+        }
+    
+    def build_result(
+        self,
+        counts: Dict[str, Tuple[int, int]],
+        word_count: int,
+        sentence_count: int,
+        content_type: str = "text"
+    ) -> Dict[str, Any]:
+        """
+        Score per-dimension (positive, negative) indicator counts
+        Shared by whole-content and streaming analysis
+        """
+        # Calculate individual quality metrics
+        factuality = self._score_factuality(*counts["factuality"])
+        depth = self._score_depth(*counts["depth"], word_count)
+        clarity = self._score_clarity(*counts["clarity"], word_count, sentence_count)
+        
+        # Calculate overall quality score
+        quality_score = int(
+            (factuality * self.weights["factuality"].weight
+             + depth * self.weights["depth"].weight
+             + clarity * self.weights["clarity"].weight)
+            / sum(weights.weight for weights in self.weights.values())
+        )
+        
+        # Calculate confidence based on content analysis
+        confidence = self._calculate_confidence(word_count, content_type)
+        
+        return {
+            "quality_score": quality_score,
+            "quality_confidence": confidence,
+            "factuality": factuality,
+            "depth": depth,
+            "clarity": clarity,
+            "content_type": content_type,
+            "word_count": word_count,
+            "analysis_timestamp": "2024-01-01T00:00:00Z"
+        }
+    
+    def _score_factuality(self, positive_count: int, negative_count: int) -> int:
         """Score content factuality"""
-        content_lower = content.lower()
-        indicators = self.quality_indicators["factuality"]
-        
-        positive_count = sum(1 for word in indicators["positive"] if word in content_lower)
-        negative_count = sum(1 for word in indicators["negative"] if word in content_lower)
+        # Base score adjusted by indicators
+        weights = self.weights["factuality"]
+        score = weights.base + (positive_count * weights.positive) - (negative_count * weights.negative)
         
-        # Base score of 70, adjust based on indicators
-        base_score = 70
-        score = base_score + (positive_count * 5) - (negative_count * 3)
-        
-        return max(min(score, 100), 0)
+        return max(min(int(score), 100), 0)
     
-    def _score_depth(self, content: str) -> int:
+    def _score_depth(self, positive_count: int, negative_count: int, word_count: int) -> int:
         """Score content depth and thoroughness"""
-        content_lower = content.lower()
-        indicators = self.quality_indicators["depth"]
-        
-        positive_count = sum(1 for word in indicators["positive"] if word in content_lower)
-        negative_count = sum(1 for word in indicators["negative"] if word in content_lower)
-        
         # Factor in content length
-        word_count = len(content.split())
         length_bonus = min(word_count / 100, 10)  # Up to 10 points for length
         
-        base_score = 60
-        score = base_score + (positive_count * 6) - (negative_count * 4) + length_bonus
+        weights = self.weights["depth"]
+        score = weights.base + (positive_count * weights.positive) - (negative_count * weights.negative) + length_bonus
         
         return max(min(int(score), 100), 0)
     
-    def _score_clarity(self, content: str) -> int:
+    def _score_clarity(self, positive_count: int, negative_count: int, word_count: int, sentence_count: int) -> int:
         """Score content clarity and readability"""
-        content_lower = content.lower()
-        indicators = self.quality_indicators["clarity"]
-        
-        positive_count = sum(1 for word in indicators["positive"] if word in content_lower)
-        negative_count = sum(1 for word in indicators["negative"] if word in content_lower)
-        
         # Simple readability assessment
-        sentences = len(re.split(r'[.!?]+', content))
-        words = len(content.split())
-        avg_words_per_sentence = words / max(sentences, 1)
+        avg_words_per_sentence = word_count / max(sentence_count, 1)
         
         # Penalize very long sentences
         readability_penalty = max(0, (avg_words_per_sentence - 20) / 2)
         
-        base_score = 75
-        score = base_score + (positive_count * 5) - (negative_count * 5) - readability_penalty
+        weights = self.weights["clarity"]
+        score = weights.base + (positive_count * weights.positive) - (negative_count * weights.negative) - readability_penalty
         
         return max(min(int(score), 100), 0)
     
-    def _calculate_confidence(self, content: str, content_type: str) -> float:
+    def _calculate_confidence(self, word_count: int, content_type: str) -> float:
         """Calculate confidence in quality assessment"""
-        word_count = len(content.split())
-        
         # Base confidence
         confidence = 0.7
         
@@ -158,4 +180,59 @@ class QualityScorer:
         if content_type in ["text", "article"]:
             confidence += 0.05
         
-        return min(confidence, 0.95)
\ No newline at end of file
+        return min(confidence, 0.95)
+
+class QualityAccumulator:
+    """
+    Running quality counts for a document that only grows
+    Each update() scans just the appended text, carrying automaton state and
+    token/terminator continuations across the boundary, so result() always
+    equals score_quality() on the whole text so far
+    """
+    
+    def __init__(self, scorer: QualityScorer, content_type: str = "text"):
+        self.scorer = scorer
+        self.content_type = content_type
+        
+        self._lexicon_state = 0
+        self._found: Set[Tuple[str, str, str]] = set()
+        self._word_count = 0
+        self._terminator_runs = 0
+        self._ends_in_token = False
+        self._ends_in_terminator = False
+    
+    @property
+    def word_count(self) -> int:
+        return self._word_count
+    
+    @property
+    def sentence_count(self) -> int:
+        # N terminator runs split the text into N + 1 sentence segments
+        return self._terminator_runs + 1
+    
+    def update(self, text: str, lowered: Optional[str] = None):
+        """Append text; pass `lowered` if the caller already lowercased it"""
+        if not text:
+            return
+        if lowered is None:
+            lowered = text.lower()
+        
+        found, self._lexicon_state = self.scorer.lexicon.scan(lowered, self._lexicon_state)
+        self._found.update(found)
+        
+        # A token or terminator run continuing from the previous text is counted once
+        self._word_count += len(lowered.split())
+        if self._ends_in_token and not lowered[0].isspace():
+            self._word_count -= 1
+        self._ends_in_token = not lowered[-1].isspace()
+        
+        self._terminator_runs += sum(1 for _ in SENTENCE_SPLIT_PATTERN.finditer(text))
+        if self._ends_in_terminator and text[0] in ".!?":
+            self._terminator_runs -= 1
+        self._ends_in_terminator = text[-1] in ".!?"
+    
+    def result(self) -> Dict[str, Any]:
+        """Quality result for everything appended so far"""
+        return self.scorer.build_result(
+            self.scorer.lexicon.tally(self._found), self._word_count, self.sentence_count, self.content_type
+        )
@@ -0,0 +1,113 @@
+"""
+Service Registry
+Builds each ML service once per process and shares it between endpoints
+"""
+
+from typing import Any, Callable, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """
+    Minimal dependency-injection container
+    Factories receive the registry and resolve their own dependencies with get(),
+    so every service (and its compiled patterns or model weights) exists once
+    """
+    
+    def __init__(self):
+        self._factories: Dict[str, Callable[["ServiceRegistry"], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._building: List[str] = []
+    
+    def register(self, name: str, factory: Callable[["ServiceRegistry"], Any]):
+        """Register a factory; it is called at most once, on first get()"""
+        if name in self._instances:
+            raise RuntimeError(f"Service '{name}' has already been built")
+        self._factories[name] = factory
+    
+    def get(self, name: str) -> Any:
+        """Return the shared instance, building it and its dependencies on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        if name not in self._factories:
+            raise KeyError(f"Unknown service '{name}'")
+        if name in self._building:
+            cycle = " -> ".join(self._building + [name])
+            raise RuntimeError(f"Circular service dependency: {cycle}")
+        
+        self._building.append(name)
+        try:
+            instance = self._factories[name](self)
+        finally:
+            self._building.pop()
+        
+        # Dependencies finish building first, so insertion order is dependency order
+        self._instances[name] = instance
+        return instance
+    
+    def instances(self) -> Dict[str, Any]:
+        """Every service built so far, in dependency order"""
+        return dict(self._instances)
+    
+    async def initialize_all(self):
+        """Build every registered service and initialize each exactly once"""
+        for name in list(self._factories):
+            self.get(name)
+        
+        for name, instance in self._instances.items():
+            initialize = getattr(instance, "initialize", None)
+            if initialize is not None and not getattr(instance, "initialized", False):
+                await initialize()
+    
+    async def shutdown_all(self):
+        """Shut services down in reverse dependency order"""
+        for name, instance in reversed(list(self._instances.items())):
+            shutdown = getattr(instance, "shutdown", None)
+            if shutdown is None:
+                continue
+            try:
+                await shutdown()
+            except Exception as e:
+                logger.error(f"Failed to shut down {name}: {e}")
+
+def build_service_registry() -> ServiceRegistry:
+    """Registry wired with the ML service graph"""
+    from .enhanced_bias_detector import EnhancedBiasDetector
+    from .bias_detector import BiasDetector
+    from .safety_detector import SafetyDetector
+    from .quality_scorer import QualityScorer
+    from .predictive_risk_assessor import PredictiveRiskAssessor
+    from .enhanced_kidgpt import EnhancedKidGPTService
+    from .kidgpt import KidGPTService
+    from .content_analyzer import ContentAnalyzer
+    from .streaming_analyzer import StreamingAnalyzer
+    
+    registry = ServiceRegistry()
+    registry.register("enhanced_bias_detector", lambda r: EnhancedBiasDetector())
+    registry.register("safety_detector", lambda r: SafetyDetector())
+    registry.register("quality_scorer", lambda r: QualityScorer())
+    registry.register("bias_detector", lambda r: BiasDetector(
+        enhanced_detector=r.get("enhanced_bias_detector")
+    ))
+    registry.register("risk_assessor", lambda r: PredictiveRiskAssessor())
+    registry.register("enhanced_kidgpt", lambda r: EnhancedKidGPTService())
+    registry.register("kidgpt_service", lambda r: KidGPTService(
+        enhanced_service=r.get("enhanced_kidgpt")
+    ))
+    registry.register("content_analyzer", lambda r: ContentAnalyzer(
+        safety_detector=r.get("safety_detector"),
+        bias_detector=r.get("bias_detector"),
+        quality_scorer=r.get("quality_scorer"),
+        enhanced_bias_detector=r.get("enhanced_bias_detector"),
+        risk_assessor=r.get("risk_assessor"),
+        kidgpt_service=r.get("enhanced_kidgpt")
+    ))
+    registry.register("streaming_analyzer", lambda r: StreamingAnalyzer(
+        safety_detector=r.get("safety_detector"),
+        quality_scorer=r.get("quality_scorer"),
+        kidgpt_service=r.get("enhanced_kidgpt")
+    ))
+    return registry
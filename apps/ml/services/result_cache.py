@@ -0,0 +1,155 @@
+"""
+Analysis Result Cache
+Content-hash keyed cache for analysis results with TTL, LRU eviction and an optional Redis tier
+"""
+
+from typing import Dict, Optional, Any, Iterable, Tuple
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class AnalysisResultCache:
+    """
+    Two-tier result cache for content analysis
+    The in-process tier is a size-bounded LRU with per-entry TTL; the optional
+    Redis tier is shared across workers and consulted on in-process misses
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        redis_client: Optional[Any] = None,
+        key_prefix: str = "aiguardian:analysis:"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._counters = {
+            "hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "redis_errors": 0
+        }
+    
+    @classmethod
+    def from_env(cls) -> "AnalysisResultCache":
+        """Build the cache from ANALYSIS_CACHE_* environment variables"""
+        redis_client = None
+        redis_url = os.getenv("ANALYSIS_CACHE_REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as redis_asyncio
+                redis_client = redis_asyncio.from_url(redis_url)
+            except ImportError:
+                logger.warning("redis package not available, analysis cache Redis tier disabled")
+        
+        return cls(
+            max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 10000)),
+            ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 3600)),
+            redis_client=redis_client
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all"""
+        return self.max_entries > 0 or self.redis_client is not None
+    
+    @staticmethod
+    def make_key(
+        content: str,
+        content_type: str,
+        age_band: Any,
+        cultural_context: str,
+        enabled_flags: Iterable[str]
+    ) -> str:
+        """Build a cache key from a content hash and the analysis context"""
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        flags = ",".join(sorted(enabled_flags))
+        return f"{content_hash}:{content_type}:{age_band}:{cultural_context}:{flags}"
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a private copy of the cached result, or None on a miss"""
+        now = time.monotonic()
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+            self._counters["expirations"] += 1
+        
+        if self.redis_client is not None:
+            try:
+                payload = await self.redis_client.get(self.key_prefix + key)
+                if payload is not None:
+                    value = json.loads(payload)
+                    self._store_local(key, value, now)
+                    self._counters["redis_hits"] += 1
+                    return copy.deepcopy(value)
+            except Exception as e:
+                self._counters["redis_errors"] += 1
+                logger.warning(f"Analysis cache Redis lookup failed: {e}")
+        
+        self._counters["misses"] += 1
+        return None
+    
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a result in both tiers"""
+        value = copy.deepcopy(value)
+        self._store_local(key, value, time.monotonic())
+        self._counters["sets"] += 1
+        
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(
+                    self.key_prefix + key,
+                    json.dumps(value, default=str),
+                    ex=max(int(self.ttl_seconds), 1)
+                )
+            except Exception as e:
+                self._counters["redis_errors"] += 1
+                logger.warning(f"Analysis cache Redis store failed: {e}")
+    
+    def clear(self):
+        """Drop every in-process entry"""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy"""
+        lookups = self._counters["hits"] + self._counters["redis_hits"] + self._counters["misses"]
+        hits = self._counters["hits"] + self._counters["redis_hits"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "redis_enabled": self.redis_client is not None
+        }
+    
+    def _store_local(self, key: str, value: Dict[str, Any], now: float):
+        """Insert into the in-process LRU tier, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
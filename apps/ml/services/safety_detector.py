@@ -3,12 +3,19 @@ Safety Detector Service
 Maintains existing safety detection functionality
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 import asyncio
 import logging
+import os
+from utils.aho_corasick import AhoCorasickAutomaton
+from .session_store import SessionStore
+from .text_preprocessor import PreprocessedText, ensure_preprocessed
 
 logger = logging.getLogger(__name__)
 
+# Evidence spans kept per conversation; later spans are counted but not returned
+MAX_CONVERSATION_EVIDENCE_SPANS = int(os.getenv("SAFETY_CONVERSATION_MAX_EVIDENCE_SPANS", 1000))
+
 class SafetyDetector:
     """
     Safety detection service for content analysis
@@ -26,18 +33,36 @@ class SafetyDetector:
             "cyberbullying": ["bully", "harassment", "threat", "intimidation"],
             "privacy_risk": ["personal information", "address", "phone", "password"]
         }
+        
+        # Compiled keyword automaton over all categories (built in initialize)
+        self.matcher: Optional[AhoCorasickAutomaton] = None
+        
+        # Running safety state per chat conversation
+        self.conversations = SessionStore.from_env(
+            "SAFETY_CONVERSATION",
+            factory=lambda: self.session("chat", max_evidence_spans=MAX_CONVERSATION_EVIDENCE_SPANS)
+        )
     
     async def initialize(self):
         """Initialize the safety detector"""
+        if self.initialized:
+            return
+        
         try:
             logger.info("Initializing safety detector...")
+            self.matcher = self._build_matcher()
             self.initialized = True
             logger.info("Safety detector initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize safety detector: {e}")
             raise
     
-    async def detect_safety(self, content: str, content_type: str = "text") -> Dict[str, Any]:
+    async def detect_safety(
+        self, 
+        content: str, 
+        content_type: str = "text",
+        preprocessed: Optional[PreprocessedText] = None
+    ) -> Dict[str, Any]:
         """
         Detect safety issues in content
         Returns safety score, confidence, flags, and evidence
@@ -46,33 +71,12 @@ class SafetyDetector:
             await self.initialize()
         
         try:
-            # Analyze content for safety issues
-            safety_flags = []
-            safety_evidence = []
-            content_lower = content.lower()
-            
-            # Check each safety category
-            for category, indicators in self.safety_categories.items():
-                found_indicators = [ind for ind in indicators if ind in content_lower]
-                if found_indicators:
-                    safety_flags.append(category)
-                    safety_evidence.extend(found_indicators)
-            
-            # Calculate safety score (inverse of risk)
-            risk_score = len(safety_flags) * 20  # Each flag reduces safety by 20 points
-            safety_score = max(100 - risk_score, 0)
+            # Find every indicator of every category in a single pass
+            text = ensure_preprocessed(content, preprocessed)
+            matches = self.matcher.find_all(text.lowered)
+            safety_flags, safety_evidence, evidence_spans = self._collect_findings(matches)
             
-            # Calculate confidence based on content analysis depth
-            confidence = min(0.8 + (len(content) / 1000) * 0.1, 0.95)
-            
-            return {
-                "safety_score": safety_score,
-                "safety_confidence": confidence,
-                "safety_flags": safety_flags,
-                "safety_evidence": safety_evidence,
-                "content_type": content_type,
-                "analysis_timestamp": "2024-01-01T00:00:00Z"  # Would use actual timestamp
-            }
+            return self.build_result(safety_flags, safety_evidence, evidence_spans, len(content), content_type)
             
         except Exception as e:
             logger.error(f"Safety detection failed: {e}")
@@ -81,6 +85,185 @@ class SafetyDetector:
                 "safety_confidence": 0.5,
                 "safety_flags": [],
                 "safety_evidence": [],
+                "safety_evidence_spans": [],
                 "content_type": content_type,
                 "analysis_timestamp": "2024-01-01T00:00:00Z"
-            }
\ No newline at end of file
+            }
+    
+    async def detect_conversation_safety(
+        self,
+        conversation_id: str,
+        message: str,
+        content_type: str = "chat"
+    ) -> Dict[str, Any]:
+        """
+        Append a message to a conversation and return safety for the whole transcript
+        Costs only the new message; the result equals detect_safety() on the
+        messages joined with newlines, up to the evidence span cap
+        """
+        if not self.initialized:
+            await self.initialize()
+        
+        session = self.conversations.get_or_create(conversation_id)
+        session.content_type = content_type
+        # The separator matches no indicator, so nothing is found across messages
+        session.update(message if session.chars == 0 else "\n" + message)
+        session.messages += 1
+        
+        result = session.result()
+        result["conversation_id"] = conversation_id
+        result["messages"] = session.messages
+        result["evidence_span_count"] = session.evidence_span_count
+        return result
+    
+    def end_conversation(self, conversation_id: str):
+        """Forget a conversation's running safety state"""
+        self.conversations.discard(conversation_id)
+    
+    def session(self, content_type: str = "text", max_evidence_spans: Optional[int] = None) -> "SafetySession":
+        """Start incremental safety detection of append-only text"""
+        if self.matcher is None:
+            raise RuntimeError("Safety detector must be initialized before starting a session")
+        return SafetySession(self, content_type, max_evidence_spans)
+    
+    def build_result(
+        self,
+        safety_flags: List[str],
+        safety_evidence: List[str],
+        evidence_spans: List[Dict[str, Any]],
+        content_length: int,
+        content_type: str = "text"
+    ) -> Dict[str, Any]:
+        """Score findings; shared by whole-content and streaming analysis"""
+        # Calculate safety score (inverse of risk)
+        risk_score = len(safety_flags) * 20  # Each flag reduces safety by 20 points
+        safety_score = max(100 - risk_score, 0)
+        
+        # Calculate confidence based on content analysis depth
+        confidence = min(0.8 + (content_length / 1000) * 0.1, 0.95)
+        
+        return {
+            "safety_score": safety_score,
+            "safety_confidence": confidence,
+            "safety_flags": safety_flags,
+            "safety_evidence": safety_evidence,
+            "safety_evidence_spans": evidence_spans,
+            "content_type": content_type,
+            "analysis_timestamp": "2024-01-01T00:00:00Z"  # Would use actual timestamp
+        }
+    
+    def order_findings(self, found: Set[Tuple[str, str]]) -> Tuple[List[str], List[str]]:
+        """Flags and evidence for found (category, indicator) pairs, in declaration order"""
+        safety_flags = []
+        safety_evidence = []
+        for category, indicators in self.safety_categories.items():
+            found_indicators = [ind for ind in indicators if (category, ind) in found]
+            if found_indicators:
+                safety_flags.append(category)
+                safety_evidence.extend(found_indicators)
+        return safety_flags, safety_evidence
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get safety detector status"""
+        return {
+            "initialized": self.initialized,
+            "categories": len(self.safety_categories),
+            "indicators": len(self.matcher.patterns) if self.matcher else 0,
+            "conversations": self.conversations.stats()
+        }
+    
+    def _build_matcher(self) -> AhoCorasickAutomaton:
+        """Compile all category indicators into one keyword automaton"""
+        matcher = AhoCorasickAutomaton()
+        for category, indicators in self.safety_categories.items():
+            for indicator in indicators:
+                matcher.add(indicator.lower(), (category, indicator))
+        return matcher.build()
+    
+    def _collect_findings(
+        self, 
+        matches: List[Tuple[int, int, int]]
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """
+        Turn automaton matches into flags, evidence and evidence spans
+        Flags and evidence keep category/indicator declaration order;
+        span offsets refer to the lowercased content
+        """
+        found = set()
+        evidence_spans = []
+        for start, end, pattern_id in matches:
+            category, indicator = self.matcher.payloads[pattern_id]
+            found.add((category, indicator))
+            evidence_spans.append({
+                "category": category,
+                "indicator": indicator,
+                "start": start,
+                "end": end
+            })
+        
+        safety_flags, safety_evidence = self.order_findings(found)
+        return safety_flags, safety_evidence, evidence_spans
+
+class SafetySession:
+    """
+    Running safety findings for text that only grows
+    Keeps the automaton state at the end of the text so far plus the findings
+    and spans, so each update() scans just the new text
+    """
+    
+    def __init__(self, detector: SafetyDetector, content_type: str = "text", max_evidence_spans: Optional[int] = None):
+        self.detector = detector
+        self.content_type = content_type
+        self.max_evidence_spans = max_evidence_spans
+        self.messages = 0
+        
+        self._state = 0
+        self._found: Set[Tuple[str, str]] = set()
+        self._evidence_spans: List[Dict[str, Any]] = []
+        self._evidence_span_count = 0
+        self._chars = 0
+        self._lowered_chars = 0  # span offsets refer to the lowercased text
+    
+    @property
+    def chars(self) -> int:
+        return self._chars
+    
+    @property
+    def evidence_span_count(self) -> int:
+        """Every span found, including those past the cap"""
+        return self._evidence_span_count
+    
+    @property
+    def flag_count(self) -> int:
+        return len({category for category, _ in self._found})
+    
+    def update(self, text: str, lowered: Optional[str] = None):
+        """Append text; pass `lowered` if the caller already lowercased it"""
+        if not text:
+            return
+        if lowered is None:
+            lowered = text.lower()
+        
+        matcher = self.detector.matcher
+        matches, self._state = matcher.scan(lowered, self._state, self._lowered_chars)
+        for start, end, pattern_id in matches:
+            category, indicator = matcher.payloads[pattern_id]
+            self._found.add((category, indicator))
+            self._evidence_span_count += 1
+            if self.max_evidence_spans is None or len(self._evidence_spans) < self.max_evidence_spans:
+                self._evidence_spans.append({
+                    "category": category,
+                    "indicator": indicator,
+                    "start": start,
+                    "end": end
+                })
+        
+        self._chars += len(text)
+        self._lowered_chars += len(lowered)
+    
+    def result(self) -> Dict[str, Any]:
+        """Safety result for everything appended so far"""
+        safety_flags, safety_evidence = self.detector.order_findings(self._found)
+        return self.detector.build_result(
+            safety_flags, safety_evidence, list(self._evidence_spans), self._chars, self.content_type
+        )
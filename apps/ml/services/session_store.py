@@ -0,0 +1,112 @@
+"""
+Session Store
+Bounded per-conversation state with least-recently-used eviction and idle expiry
+"""
+
+from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+import os
+import time
+
+class SessionStore:
+    """
+    Per-conversation session objects with bounded memory
+    Sessions are created on first use by `factory`; once `max_sessions` is
+    exceeded the least recently used one is evicted, and sessions untouched for
+    longer than `idle_ttl_seconds` are dropped
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_sessions: int = 10000,
+        idle_ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        if max_sessions <= 0:
+            raise ValueError("Session store size must be positive")
+        
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.clock = clock
+        
+        # conversation_id -> [last_seen, session], least recently used first
+        self._sessions: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._counters = {
+            "created": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+    
+    @classmethod
+    def from_env(cls, env_prefix: str, factory: Callable[[], Any], **kwargs) -> "SessionStore":
+        """Build a store, reading {env_prefix}_MAX_SESSIONS and {env_prefix}_IDLE_TTL_SECONDS"""
+        max_sessions = os.getenv(f"{env_prefix}_MAX_SESSIONS")
+        idle_ttl_seconds = os.getenv(f"{env_prefix}_IDLE_TTL_SECONDS")
+        if max_sessions is not None:
+            kwargs["max_sessions"] = int(max_sessions)
+        if idle_ttl_seconds is not None:
+            kwargs["idle_ttl_seconds"] = float(idle_ttl_seconds)
+        return cls(factory, **kwargs)
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, conversation_id: str) -> bool:
+        return self.get(conversation_id) is not None
+    
+    def get(self, conversation_id: str) -> Optional[Any]:
+        """Return a live session without creating or touching it"""
+        entry = self._sessions.get(conversation_id)
+        if entry is None:
+            return None
+        if self.clock() - entry[0] > self.idle_ttl_seconds:
+            del self._sessions[conversation_id]
+            self._counters["expirations"] += 1
+            return None
+        return entry[1]
+    
+    def get_or_create(self, conversation_id: str) -> Any:
+        """Return the conversation's session, creating it if needed, and mark it used"""
+        now = self.clock()
+        self._expire_idle(now)
+        
+        entry = self._sessions.get(conversation_id)
+        if entry is None:
+            entry = [now, self.factory()]
+            self._sessions[conversation_id] = entry
+            self._counters["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._counters["evictions"] += 1
+        else:
+            entry[0] = now
+            self._sessions.move_to_end(conversation_id)
+        return entry[1]
+    
+    def discard(self, conversation_id: str):
+        """Drop a conversation's session"""
+        self._sessions.pop(conversation_id, None)
+    
+    def clear(self):
+        """Drop all sessions"""
+        self._sessions.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and eviction counters"""
+        return {
+            **self._counters,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds
+        }
+    
+    def _expire_idle(self, now: float):
+        """Drop idle sessions from the least recently used end"""
+        while self._sessions:
+            conversation_id, entry = next(iter(self._sessions.items()))
+            if now - entry[0] <= self.idle_ttl_seconds:
+                break
+            del self._sessions[conversation_id]
+            self._counters["expirations"] += 1
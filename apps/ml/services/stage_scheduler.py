@@ -0,0 +1,179 @@
+"""
+Stage Scheduler Service
+Runs independent analysis stages concurrently with per-stage timeouts
+"""
+
+from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Event loop per executor thread for CPU-bound stages written as coroutines
+_thread_state = threading.local()
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Any]  # coroutine function; when cpu_bound, called in the executor (may return a coroutine)
+    fallback: Callable[[], Any]
+    timeout: Optional[float] = None  # seconds, overrides the scheduler default
+    cpu_bound: bool = False
+
+@dataclass
+class StageResults:
+    results: Dict[str, Any]
+    degraded: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+class StageScheduler:
+    """
+    Concurrent stage scheduler for the analysis pipeline
+    I/O-bound stages are gathered on the event loop, CPU-bound stages run in an executor;
+    a stage that fails or times out is replaced by its fallback and marked degraded.
+    Timeouts only bite on stages that yield: a coroutine with no await points runs
+    to completion once started, so CPU-heavy stages must be marked cpu_bound
+    
+    A thread cannot be stopped, so a CPU-bound stage that times out keeps its executor
+    thread until it finishes. The executor is dedicated and bounded: once
+    `max_workers` threads are busy and `max_pending` stages are queued behind them,
+    further CPU-bound stages degrade at once as saturated instead of piling up
+    """
+    
+    def __init__(
+        self,
+        default_timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.default_timeout = default_timeout
+        # Same size as asyncio's default executor, which CPU-bound stages used before
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_pending = self.max_workers if max_pending is None else max_pending
+        
+        # Created on first use, so each pre-forked server worker gets its own threads
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+        self._running: set = set()    # submitted and not finished
+        self._abandoned: set = set()  # timed out but still running
+        self._counters = {
+            "cpu_submitted": 0,
+            "timed_out": 0,
+            "saturated_rejections": 0
+        }
+    
+    @property
+    def executor(self) -> Executor:
+        """Executor for CPU-bound work, shared with callers that preprocess off the loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="analysis-stage"
+            )
+        return self._executor
+    
+    async def run(self, stages: List[Stage]) -> StageResults:
+        """Run all stages concurrently and collect their results"""
+        outcomes = await asyncio.gather(
+            *(self._run_stage(stage) for stage in stages),
+            return_exceptions=True
+        )
+        
+        results = StageResults(results={})
+        for stage, outcome in zip(stages, outcomes):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    error = str(outcome) or f"timed out after {self._timeout_for(stage)}s"
+                else:
+                    error = str(outcome) or type(outcome).__name__
+                logger.error(f"Analysis stage {stage.name} degraded: {error}")
+                results.results[stage.name] = stage.fallback()
+                results.degraded.append(stage.name)
+                results.errors[stage.name] = error
+            else:
+                results.results[stage.name] = outcome
+        
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy of the CPU-bound stage executor"""
+        with self._lock:
+            running = len(self._running)
+            abandoned = len(self._abandoned)
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            **self._counters,
+            "running": running,
+            "abandoned": abandoned,
+            "saturated": running >= self.max_workers + self.max_pending
+        }
+    
+    def shutdown(self):
+        """Stop the stage executor without waiting for abandoned stages"""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def _run_stage(self, stage: Stage) -> Any:
+        """Run a single stage under its timeout"""
+        timeout = self._timeout_for(stage)
+        if not stage.cpu_bound:
+            if timeout is None:
+                return await stage.run()
+            return await asyncio.wait_for(stage.run(), timeout)
+        
+        future = self._submit(stage)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self._counters["timed_out"] += 1
+            with self._lock:
+                if future.done():
+                    raise
+                self._abandoned.add(future)
+            raise asyncio.TimeoutError(
+                f"timed out after {timeout}s, still running in the stage executor"
+            ) from None
+    
+    def _submit(self, stage: Stage) -> Future:
+        """Hand a CPU-bound stage to the executor, or refuse it when the executor is saturated"""
+        with self._lock:
+            running = len(self._running)
+        if running >= self.max_workers + self.max_pending:
+            self._counters["saturated_rejections"] += 1
+            raise RuntimeError(
+                f"stage executor saturated: {running} CPU-bound stages running or queued"
+            )
+        
+        future = self.executor.submit(_call_in_thread, stage.run)
+        self._counters["cpu_submitted"] += 1
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._finished)
+        return future
+    
+    def _finished(self, future: Future):
+        """Done callback, called from the executor thread"""
+        with self._lock:
+            self._running.discard(future)
+            self._abandoned.discard(future)
+    
+    def _timeout_for(self, stage: Stage) -> Optional[float]:
+        """Resolve the effective timeout for a stage"""
+        return stage.timeout if stage.timeout is not None else self.default_timeout
+
+def _call_in_thread(run: Callable[[], Any]) -> Any:
+    """Executor body for CPU-bound stages; async detector methods are driven on a thread-local loop"""
+    result = run()
+    if asyncio.iscoroutine(result):
+        loop = getattr(_thread_state, "loop", None)
+        if loop is None:
+            loop = _thread_state.loop = asyncio.new_event_loop()
+        result = loop.run_until_complete(result)
+    return result
@@ -0,0 +1,202 @@
+"""
+Streaming Analyzer Service
+Incremental safety, quality and crisis analysis of content that arrives in chunks
+"""
+
+from typing import Dict, List, Optional, Any
+import logging
+import os
+from .safety_detector import SafetyDetector
+from .quality_scorer import QualityScorer
+from .enhanced_kidgpt import EnhancedKidGPTService, CrisisLevel
+
+logger = logging.getLogger(__name__)
+
+# Characters analyzed per window; one running result is emitted per window
+STREAM_WINDOW_CHARS = int(os.getenv("ANALYSIS_STREAM_WINDOW_CHARS", 8192))
+
+# Tail of the previous window rescanned with the next so crisis phrases split across windows still match
+CRISIS_OVERLAP_CHARS = 256
+
+# Evidence spans kept per stream; later spans are counted but not returned
+MAX_STREAM_EVIDENCE_SPANS = 100
+
+CRISIS_SEVERITY = [CrisisLevel.NONE, CrisisLevel.LOW, CrisisLevel.MEDIUM, CrisisLevel.HIGH, CrisisLevel.CRITICAL]
+
+class StreamingAnalysisSession:
+    """
+    Running analysis of one document
+    Keeps only scanner state, counters and a bounded text buffer, so memory use
+    does not grow with the size of the document. Safety and quality results
+    after the last window equal whole-document analysis of the same text.
+    """
+    
+    def __init__(self, analyzer: "StreamingAnalyzer", content_type: str = "text"):
+        self.analyzer = analyzer
+        self.content_type = content_type
+        self.window_chars = analyzer.window_chars
+        
+        self._buffer = ""
+        self._chars = 0
+        self._windows = 0
+        
+        # Safety: resumable automaton state and findings so far
+        self._safety = analyzer.safety_detector.session(content_type, max_evidence_spans=MAX_STREAM_EVIDENCE_SPANS)
+        
+        # Quality: indicators present, token and sentence counts
+        self._quality = analyzer.quality_scorer.accumulator(content_type)
+        
+        # Crisis: matched indicators and the overlap tail
+        self._crisis_tail = ""
+        self._crisis_found: Dict[str, Dict[str, Any]] = {}
+        self._crisis_level = CrisisLevel.NONE
+    
+    @property
+    def chars_processed(self) -> int:
+        return self._chars
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Buffer a chunk and return the events for every window it completes"""
+        self._buffer += chunk
+        events = []
+        while len(self._buffer) >= self.window_chars:
+            # Cut at whitespace so no word straddles two windows
+            cut = max(self._buffer.rfind(" ", 0, self.window_chars), self._buffer.rfind("\n", 0, self.window_chars))
+            cut = cut + 1 if cut > 0 else self.window_chars
+            window, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            events.extend(self._process_window(window))
+        return events
+    
+    def finish(self) -> List[Dict[str, Any]]:
+        """Analyze whatever is buffered and return the remaining events, ending with the final result"""
+        events = self._process_window(self._buffer) if self._buffer or not self._windows else []
+        self._buffer = ""
+        events.append({
+            "event": "final",
+            "chars": self._chars,
+            "windows": self._windows,
+            "safety": self.safety_result(),
+            "quality": self.quality_result(),
+            "crisis": self.crisis_result()
+        })
+        return events
+    
+    def safety_result(self) -> Dict[str, Any]:
+        """Safety result for everything analyzed so far"""
+        result = self._safety.result()
+        result["evidence_span_count"] = self._safety.evidence_span_count
+        return result
+    
+    def quality_result(self) -> Dict[str, Any]:
+        """Quality result for everything analyzed so far"""
+        return self._quality.result()
+    
+    def crisis_result(self) -> Dict[str, Any]:
+        """Highest crisis level and every crisis indicator seen so far"""
+        return {
+            "level": self._crisis_level.value,
+            "indicators": list(self._crisis_found.values()),
+            "requires_intervention": self._crisis_level in [CrisisLevel.HIGH, CrisisLevel.CRITICAL]
+        }
+    
+    def _process_window(self, window: str) -> List[Dict[str, Any]]:
+        start = self._chars
+        lowered = window.lower()
+        previous_flags = self._safety.flag_count
+        previous_crisis = self._crisis_level
+        
+        self._safety.update(window, lowered)
+        self._quality.update(window, lowered)
+        self._scan_crisis(lowered)
+        
+        self._chars += len(window)
+        self._windows += 1
+        
+        safety = self.safety_result()
+        events = [{
+            "event": "window",
+            "window": self._windows - 1,
+            "start": start,
+            "end": self._chars,
+            "safety": {key: safety[key] for key in ("safety_score", "safety_confidence", "safety_flags", "safety_evidence")},
+            "quality": {key: value for key, value in self.quality_result().items() if key != "analysis_timestamp"},
+            "crisis": {"level": self._crisis_level.value}
+        }]
+        
+        # Alerts give an early verdict without waiting for the rest of the document
+        if len(safety["safety_flags"]) > previous_flags:
+            events.append({
+                "event": "safety_alert",
+                "at": self._chars,
+                "safety_score": safety["safety_score"],
+                "safety_flags": safety["safety_flags"]
+            })
+        if CRISIS_SEVERITY.index(self._crisis_level) > CRISIS_SEVERITY.index(previous_crisis):
+            events.append({"event": "crisis_alert", "at": self._chars, **self.crisis_result()})
+        return events
+    
+    def _scan_crisis(self, lowered: str):
+        scanned = self._crisis_tail + lowered
+        # KidGPT's own compiled scanner, so streamed and whole-message crisis
+        # detection can never disagree
+        kidgpt_service = self.analyzer.kidgpt_service
+        matched = kidgpt_service.scan_message(scanned)
+        for level, entry_id, pattern_info in kidgpt_service.crisis_entries:
+            if pattern_info["type"] in self._crisis_found or entry_id not in matched:
+                continue
+            self._crisis_found[pattern_info["type"]] = {
+                "type": pattern_info["type"],
+                "level": level.value,
+                "pattern": pattern_info["pattern"]
+            }
+            if CRISIS_SEVERITY.index(level) > CRISIS_SEVERITY.index(self._crisis_level):
+                self._crisis_level = level
+        self._crisis_tail = scanned[-CRISIS_OVERLAP_CHARS:]
+
+class StreamingAnalyzer:
+    """
+    Factory for streaming analysis sessions
+    Reuses the shared safety automaton, quality indicators and KidGPT crisis patterns
+    """
+    
+    def __init__(
+        self,
+        safety_detector: Optional[SafetyDetector] = None,
+        quality_scorer: Optional[QualityScorer] = None,
+        kidgpt_service: Optional[EnhancedKidGPTService] = None,
+        window_chars: int = STREAM_WINDOW_CHARS
+    ):
+        self.safety_detector = safety_detector or SafetyDetector()
+        self.quality_scorer = quality_scorer or QualityScorer()
+        self.kidgpt_service = kidgpt_service or EnhancedKidGPTService()
+        self.window_chars = window_chars
+        self.initialized = False
+    
+    async def initialize(self):
+        """Initialize the detectors"""
+        if self.initialized:
+            return
+        
+        try:
+            logger.info("Initializing streaming analyzer...")
+            await self.safety_detector.initialize()
+            await self.quality_scorer.initialize()
+            self.initialized = True
+            logger.info("Streaming analyzer initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize streaming analyzer: {e}")
+            raise
+    
+    async def session(self, content_type: str = "text") -> StreamingAnalysisSession:
+        """Start analyzing a new document"""
+        if not self.initialized:
+            await self.initialize()
+        return StreamingAnalysisSession(self, content_type)
+    
+    async def get_status(self) -> Dict[str, Any]:
+        """Get streaming analyzer status"""
+        return {
+            "initialized": self.initialized,
+            "window_chars": self.window_chars,
+            "crisis_patterns": len(self.kidgpt_service.crisis_entries)
+        }
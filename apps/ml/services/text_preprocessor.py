@@ -0,0 +1,64 @@
+"""
+Text Preprocessing Service
+Single-pass text preprocessing shared by every detector in the analysis pipeline
+"""
+
+from typing import FrozenSet, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import cached_property
+import re
+
+# Sentence terminators used for readability scoring
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+@dataclass
+class PreprocessedText:
+    """
+    Text derived once per request and passed down to every detector
+    Replaces repeated content.lower() / content.split() calls in each service
+    """
+    raw: str
+    lowered: str
+    tokens: List[str]  # lowercased whitespace tokens
+    token_set: FrozenSet[str]
+    sentence_boundaries: List[Tuple[int, int]]  # (start, end) spans of raw text
+    word_count: int
+    
+    @classmethod
+    def from_text(cls, content: str) -> "PreprocessedText":
+        """Preprocess raw content"""
+        lowered = content.lower()
+        tokens = lowered.split()
+        
+        # Segments between runs of terminators, same segmentation as re.split
+        sentence_boundaries = []
+        start = 0
+        for match in SENTENCE_SPLIT_PATTERN.finditer(content):
+            sentence_boundaries.append((start, match.start()))
+            start = match.end()
+        sentence_boundaries.append((start, len(content)))
+        
+        return cls(
+            raw=content,
+            lowered=lowered,
+            tokens=tokens,
+            token_set=frozenset(tokens),
+            sentence_boundaries=sentence_boundaries,
+            word_count=len(tokens)
+        )
+    
+    @property
+    def sentence_count(self) -> int:
+        """Number of sentence segments"""
+        return len(self.sentence_boundaries)
+    
+    @cached_property
+    def compact(self) -> str:
+        """Lowercased text with spaces removed, for space-insensitive pattern checks"""
+        return self.lowered.replace(" ", "")
+
+def ensure_preprocessed(content: str, preprocessed: Optional[PreprocessedText] = None) -> PreprocessedText:
+    """Return the shared preprocessed text, or derive it for legacy str-only callers"""
+    if preprocessed is not None:
+        return preprocessed
+    return PreprocessedText.from_text(content)
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Test Suite for the Analysis Executor
+Tests the inline/offload split, result parity with inline analysis and pool stats
+"""
+
+import pytest
+import threading
+
+import sys
+sys.path.append('../')
+
+from services.analysis_executor import AnalysisExecutor, run_analysis_stage
+from services.content_analyzer import ContentAnalyzer
+from services.text_preprocessor import PreprocessedText
+
+LONG_CONTENT = (
+    "Research shows that children learn science because they are curious. "
+    "Some videos show violence and weapons, which can be scary for kids. "
+    "Boys are always better at math than girls, according to the narrator. "
+) * 20
+
+class TestAnalysisExecutor:
+    """Test suite for AnalysisExecutor"""
+    
+    def test_threshold_and_disabled_executor(self):
+        """Only content at or above the threshold is offloaded, and 0 workers disables offload"""
+        executor = AnalysisExecutor(max_workers=1, offload_threshold_chars=100)
+        assert executor.should_offload("x" * 100)
+        assert not executor.should_offload("x" * 99)
+        
+        disabled = AnalysisExecutor(max_workers=0, offload_threshold_chars=100)
+        assert not disabled.enabled
+        assert not disabled.should_offload("x" * 1000)
+        assert disabled.stats()["started"] is False
+    
+    def test_from_env(self, monkeypatch):
+        """Pool size and threshold come from the environment"""
+        monkeypatch.setenv("ANALYSIS_OFFLOAD_WORKERS", "3")
+        monkeypatch.setenv("ANALYSIS_OFFLOAD_THRESHOLD_CHARS", "1234")
+        executor = AnalysisExecutor.from_env()
+        assert executor.max_workers == 3
+        assert executor.offload_threshold_chars == 1234
+    
+    def test_unknown_stage_rejected(self):
+        """Only content-only stages can run in the pool"""
+        with pytest.raises(ValueError):
+            run_analysis_stage("risk", "hello", "text", 12, "western")
+    
+    @pytest.mark.asyncio
+    async def test_offloaded_analysis_matches_inline(self):
+        """Large content analyzed in the pool gives the same result as inline analysis"""
+        executor = AnalysisExecutor(max_workers=1, offload_threshold_chars=1000)
+        offloading = ContentAnalyzer(analysis_executor=executor)
+        inline = ContentAnalyzer(analysis_executor=AnalysisExecutor(max_workers=0))
+        try:
+            await offloading.initialize()
+            await inline.initialize()
+            
+            offloaded_result = await offloading.analyze(LONG_CONTENT, "text", 12)
+            inline_result = await inline.analyze(LONG_CONTENT, "text", 12)
+            
+            assert offloaded_result["degraded_stages"] == []
+            assert offloaded_result == inline_result
+            
+            stats = (await offloading.get_status())["analysis_executor"]
+            assert stats["started"] is True
+            assert stats["submitted"] == 3
+            assert stats["completed"] == 3
+            assert stats["failed"] == 0
+            assert stats["in_flight"] == 0
+            assert stats["queue_depth"] == 0
+            assert stats["busy_seconds"] > 0
+            assert 0 < stats["utilization"] <= 1
+        finally:
+            await offloading.shutdown()
+            await inline.shutdown()
+        
+        assert executor.stats()["started"] is False
+    
+    @pytest.mark.asyncio
+    async def test_offloaded_risk_preprocesses_off_the_event_loop(self, monkeypatch):
+        """Risk assessment of offloaded content never tokenizes it on the event loop"""
+        executor = AnalysisExecutor(max_workers=1, offload_threshold_chars=1000)
+        analyzer = ContentAnalyzer(analysis_executor=executor)
+        preprocessed_on = []
+        from_text = PreprocessedText.from_text
+        
+        def recording_from_text(content):
+            preprocessed_on.append(threading.current_thread() is threading.main_thread())
+            return from_text(content)
+        
+        monkeypatch.setattr(PreprocessedText, "from_text", staticmethod(recording_from_text))
+        try:
+            await analyzer.initialize()
+            result = await analyzer._analyze_content(
+                LONG_CONTENT, "text", 12, child_id="child_1",
+                flags={"enhanced_bias": False, "risk_assessment": True}
+            )
+        finally:
+            await analyzer.shutdown()
+        
+        assert result["risk_assessment"]
+        assert preprocessed_on == [False]
+    
+    @pytest.mark.asyncio
+    async def test_pool_start_up_is_outside_stage_timeout(self):
+        """A cold pool is warmed before offloaded stages are timed, against their own timeout"""
+        executor = AnalysisExecutor(max_workers=1, offload_threshold_chars=1000)
+        analyzer = ContentAnalyzer(analysis_executor=executor)
+        analyzer.stage_scheduler.default_timeout = 0.001
+        try:
+            await analyzer.initialize()
+            assert executor.stats()["started"] is False
+            
+            result = await analyzer.analyze(LONG_CONTENT, "text", 12)
+            
+            assert result["degraded_stages"] == []
+            assert executor.stats()["warm"] is True
+        finally:
+            await analyzer.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_small_content_stays_inline(self):
+        """Short content never starts the pool"""
+        executor = AnalysisExecutor(max_workers=1, offload_threshold_chars=len(LONG_CONTENT) + 1)
+        analyzer = ContentAnalyzer(analysis_executor=executor)
+        await analyzer.initialize()
+        
+        await analyzer.analyze(LONG_CONTENT, "text", 12)
+        
+        stats = executor.stats()
+        assert stats["started"] is False
+        assert stats["submitted"] == 0
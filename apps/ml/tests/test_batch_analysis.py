@@ -0,0 +1,191 @@
+"""
+Test Suite for Batch Content Analysis
+Tests per-item results, per-item errors and work sharing in analyze_many
+"""
+
+import pytest
+import asyncio
+
+import sys
+sys.path.append('../')
+
+from services.content_analyzer import ContentAnalyzer
+
+class TestAnalyzeMany:
+    """Test suite for ContentAnalyzer.analyze_many"""
+    
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_analysis(self):
+        """Batch results should match analyzing each item individually"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        items = [
+            {"content": "A detailed study with clear examples", "content_type": "text", "child_age": 12},
+            {"content": "Kids fight with a weapon", "content_type": "video", "child_age": 9},
+        ]
+        
+        results = await analyzer.analyze_many(items)
+        
+        assert [entry["index"] for entry in results] == [0, 1]
+        for item, entry in zip(items, results):
+            assert entry["error"] is None
+            single = await analyzer.analyze(
+                content=item["content"],
+                content_type=item["content_type"],
+                child_age=item["child_age"]
+            )
+            assert entry["result"]["safety_score"] == single["safety_score"]
+            assert entry["result"]["safety_flags"] == single["safety_flags"]
+            assert entry["result"]["quality_score"] == single["quality_score"]
+            assert entry["result"]["bias_score"] == single["bias_score"]
+    
+    @pytest.mark.asyncio
+    async def test_per_item_errors(self):
+        """A bad item should produce an error without failing the batch"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        results = await analyzer.analyze_many([
+            {"content": "Hello world", "content_type": "text", "child_age": 12},
+            {"content_type": "text", "child_age": 12},  # missing content
+        ])
+        
+        assert results[0]["error"] is None
+        assert results[0]["result"] is not None
+        assert results[1]["result"] is None
+        assert results[1]["error"]
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_items_are_independent_copies(self):
+        """Deduplicated items should not share mutable result objects"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        item = {"content": "Same transcript", "content_type": "video", "child_age": 10}
+        results = await analyzer.analyze_many([item, dict(item)])
+        
+        first, second = results[0]["result"], results[1]["result"]
+        assert first == second
+        first["recommendations"].append("mutated")
+        assert "mutated" not in second["recommendations"]
+
+    @pytest.mark.asyncio
+    async def test_items_run_concurrently_and_keep_their_order(self):
+        """Items overlap up to batch_concurrency, and results stay in item order when some fail"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        analyzer.batch_concurrency = 3
+        running = []
+        peak = []
+        
+        async def slow_analyze_content(content, *args, **kwargs):
+            running.append(content)
+            peak.append(len(running))
+            try:
+                # Later items finish first
+                await asyncio.sleep(0.01 * (10 - int(content.split()[-1])))
+                if content.startswith("boom"):
+                    raise RuntimeError("detector crashed")
+                return {"content": content}
+            finally:
+                running.remove(content)
+        
+        analyzer._analyze_content = slow_analyze_content
+        items = [
+            {"content": f"{'boom' if i % 3 == 1 else 'item'} {i}", "content_type": "text", "child_age": 12}
+            for i in range(9)
+        ]
+        
+        results = await analyzer.analyze_many(items)
+        
+        assert [entry["index"] for entry in results] == list(range(9))
+        for i, entry in enumerate(results):
+            if i % 3 == 1:
+                assert entry == {"index": i, "result": None, "error": "Content analysis failed"}
+            else:
+                assert entry["result"] == {"content": f"item {i}"}
+        assert max(peak) == 3
+    
+    @pytest.mark.asyncio
+    async def test_items_for_one_child_run_in_order(self):
+        """A child's items update risk history one at a time, in batch order"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        order = []
+        
+        async def recording_analyze_content(content, content_type, child_age, child_id, *args, **kwargs):
+            order.append((child_id, content, "start"))
+            await asyncio.sleep(0.01 if content == "first" else 0)
+            order.append((child_id, content, "end"))
+            return {}
+        
+        analyzer._analyze_content = recording_analyze_content
+        await analyzer.analyze_many([
+            {"content": "first", "content_type": "text", "child_age": 12, "child_id": "a"},
+            {"content": "second", "content_type": "text", "child_age": 12, "child_id": "a"}
+        ])
+        
+        assert order == [
+            ("a", "first", "start"), ("a", "first", "end"),
+            ("a", "second", "start"), ("a", "second", "end")
+        ]
+
+class TestBatchEndpoint:
+    """Test suite for POST /analyze/batch"""
+    
+    async def post_batch(self, items):
+        import httpx
+        import main
+        
+        await main.startup_event()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/analyze/batch",
+                headers={"Authorization": "Bearer dev-key-123"},
+                json={"items": items}
+            )
+    
+    @pytest.mark.asyncio
+    async def test_results_and_per_item_errors(self, monkeypatch):
+        """Each item gets a validated result or a serialized error, in request order"""
+        import main
+        
+        analyze_content = main.content_analyzer._analyze_content
+        
+        async def failing_analyze_content(content, *args, **kwargs):
+            if content == "boom":
+                raise RuntimeError("detector crashed")
+            return await analyze_content(content, *args, **kwargs)
+        
+        monkeypatch.setattr(main.content_analyzer, "_analyze_content", failing_analyze_content)
+        
+        response = await self.post_batch([
+            {"content": "A detailed study with clear examples", "content_type": "text", "child_age": 12},
+            {"content": "boom", "content_type": "text", "child_age": 12},
+            {"content": "Kids fight with a weapon", "content_type": "video", "child_age": 9}
+        ])
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["succeeded"] == 2
+        assert body["failed"] == 1
+        assert [entry["index"] for entry in body["results"]] == [0, 1, 2]
+        assert body["results"][1] == {"index": 1, "result": None, "error": "Content analysis failed"}
+        assert body["results"][2]["error"] is None
+        assert "violence" in body["results"][2]["result"]["safety_flags"]
+        assert set(body["results"][0]["result"]) >= {"safety_score", "quality_score", "bias_score", "age_fit"}
+    
+    @pytest.mark.asyncio
+    async def test_oversized_batch_rejected(self, monkeypatch):
+        """Batches above MAX_BATCH_SIZE are rejected with 413 before any analysis"""
+        import main
+        
+        monkeypatch.setattr(main, "MAX_BATCH_SIZE", 2)
+        item = {"content": "Hello world", "content_type": "text", "child_age": 12}
+        
+        response = await self.post_batch([item, item, item])
+        
+        assert response.status_code == 413
+        assert "max 2" in response.json()["detail"]
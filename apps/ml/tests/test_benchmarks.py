@@ -0,0 +1,49 @@
+"""
+Test Suite for the Benchmark Runner
+Tests result reporting and baseline comparison on a tiny run
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from benchmarks.run_benchmarks import (
+    CONTENT_SIZES, compare_to_baseline, generate_content, percentile, run_benchmarks
+)
+
+class TestBenchmarkRunner:
+    """Test suite for the benchmark runner"""
+    
+    def test_generated_content_size_is_deterministic(self):
+        """Synthetic content has the requested word count and is reproducible"""
+        for words in CONTENT_SIZES.values():
+            content = generate_content(words, seed=1)
+            assert len(content.split()) == words
+            assert content == generate_content(words, seed=1)
+    
+    def test_percentile_interpolates(self):
+        """Percentiles interpolate between ranked samples"""
+        samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentile(samples, 50) == 3.0
+        assert percentile(samples, 95) == pytest.approx(4.8)
+        assert percentile([], 99) == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_run_and_compare(self):
+        """Every target reports latency percentiles and compares against a baseline"""
+        report = await run_benchmarks(sizes=["tweet"], iterations=3, warmup=1)
+        
+        targets = {result["target"] for result in report["results"]}
+        assert {"safety", "quality", "bias", "risk", "risk_batch", "kidgpt", "api_analyze", "api_coach"} <= targets
+        for result in report["results"]:
+            assert result["iterations"] == 3
+            assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        
+        slower = {
+            "results": [dict(result, p95_ms=result["p95_ms"] / 10) for result in report["results"]]
+        }
+        comparisons = compare_to_baseline(report, slower, threshold=0.25)
+        assert len(comparisons) == len(report["results"])
+        assert all(c["regression"] for c in comparisons)
+        assert not any(c["regression"] for c in compare_to_baseline(report, report))
@@ -0,0 +1,79 @@
+"""
+Test Suite for Shared Enhanced Bias Analysis Fragments
+Tests age-band adaptation text and the read-only module constants shared by every analysis
+"""
+
+import pytest
+import json
+
+import sys
+sys.path.append('../')
+
+from services.enhanced_bias_detector import EnhancedBiasDetector, AGE_BANDS, age_band_for
+
+class TestAgeBands:
+    """Test suite for age-band adaptation"""
+    
+    def test_ages_map_to_bands(self):
+        """Band boundaries match the complexity levels of the analysis"""
+        assert [age_band_for(age).language_level for age in (5, 10, 11, 13, 14, 30)] == [
+            "elementary", "elementary", "middle_school", "middle_school", "high_school", "high_school"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_age_text_is_built_once_per_band(self):
+        """Children in one band share the same adaptation text objects"""
+        bias_detector = EnhancedBiasDetector()
+        younger = await bias_detector.detect_comprehensive_bias("Boys like trucks.", 8, "eastern")
+        same_band = await bias_detector.detect_comprehensive_bias("Girls like dolls.", 10, "western")
+        older = await bias_detector.detect_comprehensive_bias("Girls like dolls.", 15, "eastern")
+        
+        adaptation = younger["balanced_perspectives"]["age_adaptation"]
+        assert adaptation["age_appropriate_discussion"] is AGE_BANDS[0].discussion_prompts
+        assert adaptation["age_appropriate_discussion"] is \
+            same_band["balanced_perspectives"]["age_adaptation"]["age_appropriate_discussion"]
+        assert adaptation["simplified_summary"].startswith(AGE_BANDS[0].summary_intro)
+        assert adaptation["language_level"] == "elementary"
+        
+        older_adaptation = older["balanced_perspectives"]["age_adaptation"]
+        assert older_adaptation["complexity_level"] == "advanced"
+        assert older_adaptation["age_appropriate_discussion"] is AGE_BANDS[2].discussion_prompts
+    
+    @pytest.mark.asyncio
+    async def test_adapt_for_age_retargets_band(self):
+        """A stored balanced perspective can be re-adapted for a child in another band"""
+        bias_detector = EnhancedBiasDetector()
+        result = await bias_detector.detect_comprehensive_bias("Boys like trucks.", 9, "western")
+        
+        adapted = bias_detector.adapt_for_age(result["balanced_perspectives"], 12)
+        assert adapted["age_adaptation"]["language_level"] == "middle_school"
+        assert adapted["age_adaptation"]["age_appropriate_discussion"] is AGE_BANDS[1].discussion_prompts
+        assert adapted["synthesis"] == result["balanced_perspectives"]["synthesis"]
+
+class TestSharedFragments:
+    """Test suite for the read-only constants shared between analyses"""
+    
+    @pytest.mark.asyncio
+    async def test_shared_fragments_are_read_only(self):
+        """Content-independent parts are shared module constants that cannot be mutated"""
+        bias_detector = EnhancedBiasDetector()
+        first = await bias_detector.detect_comprehensive_bias("Boys like trucks.", 8, "eastern")
+        second = await bias_detector.detect_comprehensive_bias("Girls like dolls.", 15, "western")
+        
+        coverage = first["perspective_synthesis"]["perspectives_present"]
+        assert coverage is second["perspective_synthesis"]["perspectives_present"]
+        with pytest.raises(TypeError):
+            bias_detector._analyze_perspective_coverage("", ())["missing"] = []
+        
+        # Shared fragments still serialize as plain JSON
+        assert json.loads(json.dumps(first["perspective_synthesis"]))["perspectives_missing"] == \
+            ["Subject experts", "Affected communities"]
+    
+    @pytest.mark.asyncio
+    async def test_unknown_context_falls_back_to_legacy(self):
+        """Invalid contexts fall back to legacy detection"""
+        bias_detector = EnhancedBiasDetector()
+        result = await bias_detector.detect_comprehensive_bias("Test content", 12, "unknown")
+        
+        assert "cultural_analysis" not in result
+        assert result["bias_score"] == 75
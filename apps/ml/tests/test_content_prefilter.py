@@ -0,0 +1,150 @@
+"""
+Test Suite for the Content Pre-filter
+Tests vocabulary coverage, crisis regex anchors, audit sampling and ContentAnalyzer integration
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.content_prefilter import (
+    ContentPrefilter, required_literals, VERDICT_AUDIT, VERDICT_CLEAN, VERDICT_HIT
+)
+from services.content_analyzer import ContentAnalyzer
+from services.enhanced_bias_detector import EnhancedBiasDetector
+from services.enhanced_kidgpt import CrisisLevel, EnhancedKidGPTService
+from services.safety_detector import SafetyDetector
+from services.text_preprocessor import PreprocessedText
+
+BENIGN_CONTENT = "Plants use sunlight, water and air to make their own food."
+
+CRISIS_MESSAGES = [
+    "I want  to\tdie",
+    "sometimes I just want to cut myself",
+    "I can't take it anymore",
+    "everyone hates me at school",
+    "I'm feeling down today"
+]
+
+def build_prefilter(**kwargs):
+    return ContentPrefilter.from_services(
+        SafetyDetector(), EnhancedBiasDetector(), EnhancedKidGPTService(), **kwargs
+    )
+
+class TestContentPrefilter:
+    """Test suite for ContentPrefilter"""
+    
+    def test_required_literals(self):
+        """Every match of a regex contains one of its whitespace-free anchors"""
+        assert required_literals(r"\b(want\s+to\s+die|kill\s+myself)\b") == {"wanttodie", "killmyself"}
+        assert required_literals(r"can'?t\s+(do|figure)") == {"can"}
+        assert required_literals(r"\d+") is None
+    
+    def test_numeric_escapes_have_no_anchor(self):
+        """Escapes the parser cannot read as text give no anchor rather than a wrong one"""
+        for pattern in (r"\x41bc", r"\101", r"a\101", r"(a)\1", r"\u0041bc", r"\N{LATIN CAPITAL LETTER A}bc"):
+            assert required_literals(pattern) is None, pattern
+        assert required_literals(r"\d+\s+items") == {"items"}
+    
+    def test_every_crisis_pattern_is_anchored(self):
+        """Messages that hit a crisis pattern are never cleared"""
+        prefilter = build_prefilter()
+        kidgpt = EnhancedKidGPTService()
+        crisis_entry_ids = {entry_id for _, entry_id, _ in kidgpt.crisis_entries}
+        
+        for message in CRISIS_MESSAGES:
+            assert kidgpt.scan_message(message.lower()) & crisis_entry_ids, message
+            assert prefilter.screen(PreprocessedText.from_text(message)) == VERDICT_HIT, message
+    
+    def test_safety_and_bias_vocabulary_hits(self):
+        """Indicators are found regardless of case and spacing"""
+        prefilter = build_prefilter()
+        
+        for content in ["Never share your PASSWORD", "cultural   superiority", "Boys are better at sports"]:
+            assert prefilter.screen(PreprocessedText.from_text(content)) == VERDICT_HIT, content
+        
+        assert prefilter.screen(PreprocessedText.from_text(BENIGN_CONTENT)) == VERDICT_CLEAN
+    
+    def test_audit_sampling_and_stats(self):
+        """A share of clean items is sampled through the full pipeline"""
+        draws = iter([0.01, 0.9])
+        prefilter = build_prefilter(audit_sample_rate=0.05)
+        prefilter.random_source = lambda: next(draws)
+        
+        text = PreprocessedText.from_text(BENIGN_CONTENT)
+        assert prefilter.screen(text) == VERDICT_AUDIT
+        assert prefilter.screen(text) == VERDICT_CLEAN
+        assert prefilter.screen(PreprocessedText.from_text("a weapon")) == VERDICT_HIT
+        
+        stats = prefilter.stats()
+        assert stats["screened"] == 3
+        assert stats["cleared"] == 1
+        assert stats["audited"] == 1
+        assert stats["clear_rate"] == pytest.approx(1 / 3)
+
+class TestContentAnalyzerPrefilter:
+    """Test suite for the pre-filter tier in ContentAnalyzer"""
+    
+    async def _analyzer(self, audit_sample_rate=0.0):
+        analyzer = ContentAnalyzer(prefilter=build_prefilter(audit_sample_rate=audit_sample_rate))
+        analyzer.result_cache.max_entries = 0
+        await analyzer.initialize()
+        return analyzer
+    
+    @pytest.mark.asyncio
+    async def test_clean_content_takes_fast_path(self):
+        """Cleared content skips safety scanning and enhanced bias analysis"""
+        analyzer = await self._analyzer()
+        
+        async def unexpected(*args, **kwargs):
+            raise AssertionError("detector should have been skipped")
+        
+        analyzer.safety_detector.detect_safety = unexpected
+        analyzer.enhanced_bias_detector.detect_comprehensive_bias = unexpected
+        
+        result = await analyzer.analyze(content=BENIGN_CONTENT, content_type="text", child_age=12)
+        
+        assert result["prefilter_verdict"] == VERDICT_CLEAN
+        assert result["safety_score"] == 100
+        assert result["safety_flags"] == []
+        assert result["degraded_stages"] == []
+        assert result["short_circuited_stages"] == ["enhanced_bias"]
+        assert "enhanced_bias_analysis" not in result
+    
+    @pytest.mark.asyncio
+    async def test_clean_verdict_matches_full_safety_result(self):
+        """The fast path reports the same safety result the detector would"""
+        analyzer = await self._analyzer()
+        
+        fast = await analyzer.analyze(content=BENIGN_CONTENT, content_type="text", child_age=12)
+        full = await analyzer.safety_detector.detect_safety(BENIGN_CONTENT, "text")
+        
+        for field in ("safety_score", "safety_confidence", "safety_flags", "safety_evidence"):
+            assert fast[field] == full[field]
+    
+    @pytest.mark.asyncio
+    async def test_hits_and_audits_run_full_pipeline(self):
+        """Content with a hit, or sampled for audit, gets every detector"""
+        analyzer = await self._analyzer(audit_sample_rate=1.0)
+        
+        audited = await analyzer.analyze(content=BENIGN_CONTENT, content_type="text", child_age=12)
+        flagged = await analyzer.analyze(content="Kids fight with a weapon", content_type="text", child_age=12)
+        
+        assert audited["prefilter_verdict"] == VERDICT_AUDIT
+        assert "enhanced_bias_analysis" in audited
+        assert flagged["prefilter_verdict"] == VERDICT_HIT
+        assert "violence" in flagged["safety_flags"]
+        assert analyzer.prefilter.stats()["screened"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_unanchored_crisis_pattern_disables_prefilter(self, monkeypatch):
+        """A crisis pattern the screen cannot anchor turns the screen off rather than failing startup"""
+        monkeypatch.setenv("ANALYSIS_PREFILTER_ENABLED", "true")
+        analyzer = ContentAnalyzer()
+        analyzer.kidgpt_service.crisis_patterns[CrisisLevel.HIGH].append({"pattern": r"(?=\w)\d+", "type": "unanchored"})
+        
+        await analyzer.initialize()
+        
+        assert analyzer.initialized
+        assert analyzer.prefilter is None
@@ -0,0 +1,97 @@
+"""
+Test Suite for Conversation Emotion Trajectories
+Tests decayed emotion state, the crisis high-water mark and their use across /coach turns
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.enhanced_kidgpt import (
+    EmotionTrajectory, EmotionalState, CrisisLevel, EnhancedKidGPTService
+)
+
+class TestEmotionTrajectory:
+    """Test suite for EmotionTrajectory"""
+    
+    def test_scores_decay_by_half_life(self):
+        """A single turn's weight halves every half-life"""
+        trajectory = EmotionTrajectory(half_life_turns=2)
+        trajectory.update({EmotionalState.SAD: 1.0}, CrisisLevel.NONE)
+        first = trajectory.score(EmotionalState.SAD)
+        
+        trajectory.update({}, CrisisLevel.NONE)
+        trajectory.update({}, CrisisLevel.NONE)
+        
+        assert trajectory.score(EmotionalState.SAD) == pytest.approx(first / 2)
+        assert trajectory.turns == 3
+    
+    def test_sustained_distress_needs_repeated_turns(self):
+        """One sad message is not sustained distress; several are"""
+        trajectory = EmotionTrajectory(half_life_turns=3)
+        trajectory.update({EmotionalState.SAD: 1.0}, CrisisLevel.NONE)
+        assert trajectory.sustained_distress() is None
+        
+        for _ in range(3):
+            trajectory.update({EmotionalState.SAD: 0.8, EmotionalState.HAPPY: 0.1}, CrisisLevel.NONE)
+        assert trajectory.sustained_distress() is EmotionalState.SAD
+        assert trajectory.dominant_emotion() is EmotionalState.SAD
+    
+    def test_crisis_high_water_mark(self):
+        """The highest crisis level is kept after calmer turns"""
+        trajectory = EmotionTrajectory()
+        for level in [CrisisLevel.LOW, CrisisLevel.HIGH, CrisisLevel.NONE, CrisisLevel.MEDIUM]:
+            trajectory.update({}, level)
+        
+        assert trajectory.crisis_high_water is CrisisLevel.HIGH
+        assert trajectory.snapshot()["crisis_high_water"] == "high"
+
+class TestConversationContext:
+    """Test suite for trajectories in EnhancedKidGPTService responses"""
+    
+    @pytest.mark.asyncio
+    async def test_context_carries_across_turns(self):
+        """Later turns see earlier distress without re-analyzing earlier messages"""
+        service = EnhancedKidGPTService()
+        messages = [
+            "I hate myself and feel worthless",
+            "I'm feeling really sad and upset today",
+            "I feel so sad, I want to cry",
+            "ok what is 7 times 8"
+        ]
+        
+        scanned = []
+        scan = service.scan_message
+        service.scan_message = lambda message_lower: scanned.append(message_lower) or scan(message_lower)
+        
+        for message in messages:
+            result = await service.generate_response(message, "resilience", "child_1", 12, conversation_id="conv-1")
+        
+        assert len(scanned) == len(messages)
+        context = result["conversation_context"]
+        assert context["turns"] == 4
+        assert context["crisis_high_water"] in ["high", "critical"]
+        assert context["sustained_distress"] == "sad"
+        
+        # The neutral last message still gets crisis-aware recommendations and an empathetic opening
+        assert result["crisis_assessment"]["level"] == "none"
+        assert not result["parent_notification"]["needs_notification"]
+        assert "It would be helpful to talk to a parent, teacher, or counselor" in result["support_recommendations"] \
+            or "Please talk to a trusted adult immediately" in result["support_recommendations"]
+        assert result["response"].startswith("I sense that you're going through a difficult time.")
+    
+    @pytest.mark.asyncio
+    async def test_conversations_are_independent(self):
+        """Each conversation, and each child without one, has its own trajectory"""
+        service = EnhancedKidGPTService()
+        
+        await service.generate_response("I hate myself and feel worthless", "resilience", "child_1", 12,
+                                        conversation_id="conv-1")
+        other = await service.generate_response("hello", "curiosity", "child_1", 12, conversation_id="conv-2")
+        no_conversation = await service.generate_response("hello", "curiosity", "child_1", 12)
+        
+        assert other["conversation_context"]["turns"] == 1
+        assert other["conversation_context"]["crisis_high_water"] == "none"
+        assert no_conversation["conversation_context"]["turns"] == 1
+        assert len(service.conversation_trajectories) == 3
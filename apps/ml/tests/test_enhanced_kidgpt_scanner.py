@@ -0,0 +1,112 @@
+"""
+Test Suite for the EnhancedKidGPT Message Scanner
+Tests that the shared emotion/crisis scan matches per-pattern regex search
+"""
+
+import pytest
+import random
+import re
+
+import sys
+sys.path.append('../')
+
+from services.enhanced_kidgpt import CrisisLevel, EnhancedKidGPTService
+from utils.regex_literals import required_literals
+
+def legacy_scan(service, message_lower):
+    """Reference result: search each entry separately, as before the combined scanner"""
+    entries = [(entry_id, re.escape(literal)) for entry_id, literal in service._literal_entries]
+    entries += [(entry_id, regex.pattern) for entry_id, regex in service._pattern_entries]
+    return {entry_id for entry_id, pattern in entries if re.search(pattern, message_lower)}
+
+class TestRegexAnchors:
+    """Test suite for the literal anchors that gate pattern searches"""
+    
+    def test_required_literals(self):
+        """Anchors are substrings every match contains"""
+        assert required_literals(r"\b(so|really|very)\s+(happy|excited|good)\b") == {"happy", "excited", "good"}
+        assert required_literals(r"makes?\s+me\s+sad") == {"make"}
+        assert required_literals(r"what\s+does\s+.+\s+mean") == {"what"}
+        assert required_literals(r"love\s+this", ignore_whitespace=True) == {"lovethis"}
+        assert required_literals(r"(?=ab)c") is None
+        assert required_literals(r"\d+|word") is None
+    
+    def test_every_pattern_is_anchored(self):
+        """No emotion or crisis pattern has to be searched on every message"""
+        service = EnhancedKidGPTService()
+        
+        assert service._unanchored_pattern_entries == []
+        for _, regex in service._pattern_entries:
+            for match in re.finditer(regex, "i can't take it, so happy, what does it mean, makes me sad"):
+                assert any(anchor in match.group(0) for anchor in required_literals(regex.pattern))
+
+    def test_unanchored_patterns_are_always_searched(self):
+        """A pattern the parser cannot anchor is searched on every message, never skipped"""
+        service = EnhancedKidGPTService()
+        unanchored = [r"\x68urt\s+me", r"(?=\w)give\s+up", r"(a)\1h", r"wa\156t\s+out"]
+        service.crisis_patterns[CrisisLevel.HIGH].extend(
+            {"pattern": pattern, "type": "unanchored"} for pattern in unanchored
+        )
+        service._compile_message_scanner()
+        
+        entry_ids = [
+            entry_id for entry_id, info in service._crisis_entry_ids[CrisisLevel.HIGH]
+            if info["type"] == "unanchored"
+        ]
+        assert {entry_id for entry_id, _ in service._unanchored_pattern_entries} == set(entry_ids)
+        for entry_id, message in zip(entry_ids, ["they hurt me", "i give up", "aah", "i want out"]):
+            assert entry_id in service.scan_message(message), message
+            assert service.scan_message(message) == legacy_scan(service, message), message
+
+class TestMessageScanner:
+    """Test suite for the shared message scan"""
+    
+    def test_matches_individual_searches(self):
+        """Every entry found by a separate re.search is found by the shared scan"""
+        service = EnhancedKidGPTService()
+        messages = [
+            "I feel so sad and I want to cry",
+            "I'm really frustrated, I can't figure this out and nothing works",
+            "everyone hates me and I hate myself, I want to die",
+            "what does photosynthesis mean? I don't understand",
+            "i'm scared and nervous, worried about tomorrow",
+            "so happy! love this, feels great",
+            "",
+            "hello there"
+        ]
+        
+        for message in messages:
+            lowered = message.lower()
+            assert service.scan_message(lowered) == legacy_scan(service, lowered), message
+    
+    def test_randomized_overlapping_matches(self):
+        """Overlapping and adjacent matches agree with per-pattern search"""
+        service = EnhancedKidGPTService()
+        vocabulary = [
+            "so", "really", "very", "sad", "down", "feel", "feeling", "want", "to", "cry",
+            "hate", "myself", "this", "can't", "cant", "understand", "don't", "what", "does",
+            "mean", "scared", "worried", "about", "nervous", "too", "much", "no", "point", "x"
+        ]
+        rng = random.Random(11)
+        
+        for _ in range(300):
+            message = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 15)))
+            assert service.scan_message(message) == legacy_scan(service, message), message
+    
+    @pytest.mark.asyncio
+    async def test_precomputed_matches_give_same_analysis(self):
+        """Analysis with a shared scan equals analysis that scans on its own"""
+        service = EnhancedKidGPTService()
+        message = "I'm really scared and I feel so worthless, nobody cares"
+        matched = service.scan_message(message.lower())
+        
+        shared = await service._analyze_emotional_state(message, "child-a", matched)
+        standalone = await service._analyze_emotional_state(message, "child-b")
+        assert shared.primary_emotion == standalone.primary_emotion
+        assert shared.emotional_indicators == standalone.emotional_indicators
+        
+        crisis = await service._assess_crisis_level(message, shared, matched)
+        assert crisis == await service._assess_crisis_level(message, standalone)
+        assert [i["type"] for i in crisis["indicators"]] == [
+            "hopelessness", "severe_negative_self_talk", "fear_anxiety"
+        ]
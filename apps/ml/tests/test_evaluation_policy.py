@@ -0,0 +1,148 @@
+"""
+Test Suite for the Tiered Evaluation Policy
+Tests short-circuit rules and how ContentAnalyzer skips stages for clearly unsafe content
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.evaluation_policy import EvaluationPolicy, ShortCircuitRule
+from services.content_analyzer import ContentAnalyzer
+
+UNSAFE_CONTENT = "A bully made a threat to attack with a weapon, then shared drugs, alcohol and a password"
+
+class TestEvaluationPolicy:
+    """Test suite for EvaluationPolicy"""
+    
+    def test_parse_threshold_and_flag_rules(self):
+        """Rules accept a safety score threshold or a list of triggering flags"""
+        rules = EvaluationPolicy.parse_rules("perspective_synthesis:70, risk:violence|cyberbullying,")
+        
+        assert rules == [
+            ShortCircuitRule(stage="perspective_synthesis", safety_score_below=70.0),
+            ShortCircuitRule(stage="risk", any_flags=("violence", "cyberbullying"))
+        ]
+        assert EvaluationPolicy.parse_rules("") == []
+    
+    def test_unknown_stage_rejected(self):
+        """Safety itself can never be short-circuited"""
+        with pytest.raises(ValueError):
+            EvaluationPolicy([ShortCircuitRule(stage="safety", safety_score_below=50)])
+    
+    def test_stages_to_skip_and_stats(self):
+        """Matching rules are reported in stage order and counted"""
+        policy = EvaluationPolicy(EvaluationPolicy.parse_rules("bias:30,quality:50,risk:violence"))
+        
+        assert policy.stages_to_skip({"safety_score": 100, "safety_flags": []}) == []
+        assert policy.stages_to_skip({"safety_score": 40, "safety_flags": ["violence"]}) == ["quality", "risk"]
+        assert policy.stages_to_skip({"safety_score": 20, "safety_flags": []}) == ["quality", "bias"]
+        
+        stats = policy.stats()
+        assert stats["evaluated"] == 3
+        assert stats["short_circuited"] == 2
+        assert stats["skipped_stages"]["quality"] == 2
+        assert stats["skipped_stages"]["perspective_synthesis"] == 0
+    
+    def test_short_circuiting_is_opt_in(self, monkeypatch):
+        """Without ANALYSIS_SHORT_CIRCUIT_RULES no stage waits for safety"""
+        monkeypatch.delenv("ANALYSIS_SHORT_CIRCUIT_RULES", raising=False)
+        assert not EvaluationPolicy.from_env().enabled
+        
+        monkeypatch.setenv("ANALYSIS_SHORT_CIRCUIT_RULES", "quality:50")
+        assert EvaluationPolicy.from_env().can_skip("quality")
+
+class TestContentAnalyzerShortCircuit:
+    """Test suite for short-circuited stages in ContentAnalyzer"""
+    
+    async def _analyzer(self, spec):
+        analyzer = ContentAnalyzer(evaluation_policy=EvaluationPolicy(EvaluationPolicy.parse_rules(spec)))
+        analyzer.result_cache.max_entries = 0
+        await analyzer.initialize()
+        return analyzer
+    
+    @pytest.mark.asyncio
+    async def test_unsafe_content_skips_stages(self):
+        """Stages ruled out by the safety result are never run"""
+        analyzer = await self._analyzer("perspective_synthesis:70,quality:50")
+        
+        async def unexpected(*args, **kwargs):
+            raise AssertionError("quality scoring should have been skipped")
+        
+        analyzer.quality_scorer.score_quality = unexpected
+        
+        result = await analyzer.analyze(content=UNSAFE_CONTENT, content_type="text", child_age=12)
+        
+        assert result["safety_score"] < 50
+        assert result["degraded_stages"] == []
+        assert result["short_circuited_stages"] == ["quality", "perspective_synthesis"]
+        assert result["quality_score"] == 50
+        assert result["enhanced_bias_analysis"]["perspective_synthesis"] is None
+        assert result["enhanced_bias_analysis"]["cultural_analysis"] is not None
+    
+    @pytest.mark.asyncio
+    async def test_benign_content_runs_every_stage(self):
+        """Content below every threshold gets the full pipeline"""
+        analyzer = await self._analyzer("perspective_synthesis:70,quality:50")
+        
+        result = await analyzer.analyze(
+            content="Plants use sunlight to make food. Research shows this clearly.",
+            content_type="text",
+            child_age=12
+        )
+        
+        assert result["short_circuited_stages"] == []
+        assert result["enhanced_bias_analysis"]["perspective_synthesis"] is not None
+        assert analyzer.evaluation_policy.stats()["evaluated"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_degraded_safety_never_short_circuits(self):
+        """The fallback safety score is a placeholder, not evidence of unsafe content"""
+        analyzer = await self._analyzer("quality:60")
+        
+        async def broken_safety(content, content_type="text", preprocessed=None):
+            raise RuntimeError("safety model crashed")
+        
+        scored = []
+        score_quality = analyzer.quality_scorer.score_quality
+        
+        async def spy_quality(content, content_type="text", preprocessed=None):
+            scored.append(content)
+            return await score_quality(content, content_type, preprocessed)
+        
+        analyzer.safety_detector.detect_safety = broken_safety
+        analyzer.quality_scorer.score_quality = spy_quality
+        
+        result = await analyzer.analyze(content=UNSAFE_CONTENT, content_type="text", child_age=12)
+        
+        assert result["degraded_stages"] == ["safety"]
+        assert result["short_circuited_stages"] == []
+        assert scored == [UNSAFE_CONTENT]
+    
+    @pytest.mark.asyncio
+    async def test_stages_no_rule_can_skip_run_with_safety(self):
+        """Only stages a rule could skip are held back until safety finishes"""
+        analyzer = await self._analyzer("quality:50")
+        tiers = []
+        run = analyzer.stage_scheduler.run
+        
+        async def recording_run(stages):
+            tiers.append(sorted(stage.name for stage in stages))
+            return await run(stages)
+        
+        analyzer.stage_scheduler.run = recording_run
+        result = await analyzer.analyze(content=UNSAFE_CONTENT, content_type="text", child_age=12)
+        
+        assert tiers == [["bias", "safety"], []]
+        assert result["short_circuited_stages"] == ["quality"]
+    
+    @pytest.mark.asyncio
+    async def test_empty_policy_runs_every_stage(self):
+        """Without rules the analyzer behaves exactly as before"""
+        analyzer = await self._analyzer("")
+        
+        result = await analyzer.analyze(content=UNSAFE_CONTENT, content_type="text", child_age=12)
+        
+        assert result["short_circuited_stages"] == []
+        assert analyzer.evaluation_policy.stats()["evaluated"] == 0
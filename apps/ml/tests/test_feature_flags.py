@@ -0,0 +1,181 @@
+"""
+Test Suite for the Feature Flag Decision Table
+Tests table lookups against the per-call rules, rebuilds on update, per-request flag contexts and bulk evaluation
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.feature_flags import FeatureFlagService, FeatureFlag, FlagContext
+from services.content_analyzer import ContentAnalyzer
+
+AGES = [None, 6, 9, 10, 11, 13, 14, 16, 17, 21]
+CHILD_IDS = [f"child_{i}" for i in range(60)]
+
+def reference_is_enabled(service, flag, child_age, child_id):
+    """Flag rules evaluated directly from the configuration"""
+    config = service.flags.get(flag, {})
+    if not config.get("enabled", False):
+        return False
+    if child_age is not None:
+        targets = config.get("target_age_groups", [])
+        if targets and service._get_age_band(child_age) not in targets:
+            return False
+    rollout = config.get("rollout_percentage", 0)
+    return rollout >= 100 or service._calculate_user_percentage(child_id) <= rollout
+
+async def initialized_service():
+    service = FeatureFlagService()
+    await service.initialize()
+    return service
+
+class TestDecisionTable:
+    """Test suite for FeatureFlagService decision table lookups"""
+    
+    @pytest.mark.asyncio
+    async def test_table_matches_flag_rules(self):
+        """Every (flag, age, child) decision equals the configured rules"""
+        service = await initialized_service()
+        await service.update_flag(FeatureFlag.ENHANCED_BIAS_DETECTION, rollout_percentage=37)
+        await service.update_flag(FeatureFlag.REAL_TIME_INTERVENTION, enabled=True, rollout_percentage=5,
+                                  target_age_groups=["AGE_14_16"])
+        
+        for flag in FeatureFlag:
+            for age in AGES:
+                for child_id in CHILD_IDS:
+                    expected = reference_is_enabled(service, flag, age, child_id)
+                    assert service.is_enabled(flag, age, child_id) is expected, (flag, age, child_id)
+    
+    @pytest.mark.asyncio
+    async def test_update_flag_rebuilds_table(self):
+        """Flag updates take effect on the next lookup"""
+        service = await initialized_service()
+        flag = FeatureFlag.PREDICTIVE_RISK_ASSESSMENT
+        assert service.is_enabled(flag, 12, "child_1")
+        
+        await service.update_flag(flag, enabled=False)
+        assert not service.is_enabled(flag, 12, "child_1")
+        
+        await service.update_flag(flag, enabled=True, target_age_groups=["AGE_17_PLUS"])
+        assert not service.is_enabled(flag, 12, "child_1")
+        assert service.is_enabled(flag, 18, "child_1")
+    
+    @pytest.mark.asyncio
+    async def test_user_percentage_rollout(self):
+        """Explicit percentages pass exactly when within the rollout"""
+        service = await initialized_service()
+        await service.update_flag(FeatureFlag.CRISIS_DETECTION, rollout_percentage=40)
+        
+        assert service.is_enabled(FeatureFlag.CRISIS_DETECTION, 12, user_percentage=40)
+        assert not service.is_enabled(FeatureFlag.CRISIS_DETECTION, 12, user_percentage=40.5)
+        assert not service.is_enabled(FeatureFlag.CRISIS_DETECTION, 12, user_percentage=150)
+
+class TestFlagContext:
+    """Test suite for per-request flag contexts"""
+    
+    @pytest.mark.asyncio
+    async def test_context_matches_is_enabled_and_hashes_once(self):
+        """A context evaluates every flag with a single child_id hash"""
+        service = await initialized_service()
+        await service.update_flag(FeatureFlag.ENHANCED_BIAS_DETECTION, rollout_percentage=50)
+        
+        hashes = []
+        calculate = service._calculate_user_percentage
+        service._calculate_user_percentage = lambda child_id: hashes.append(child_id) or calculate(child_id)
+        
+        context = service.context(12, "child_7")
+        
+        assert hashes == ["child_7"]
+        for flag in FeatureFlag:
+            assert context.is_enabled(flag) is service.is_enabled(flag, 12, "child_7")
+        assert context.enabled_flags() == service.get_enabled_flags(12, "child_7")
+    
+    @pytest.mark.asyncio
+    async def test_context_is_a_snapshot(self):
+        """Updates after a request starts do not change its decisions"""
+        service = await initialized_service()
+        context = service.context(12, "child_1")
+        
+        await service.update_flag(FeatureFlag.ENHANCED_BIAS_DETECTION, enabled=False)
+        
+        assert context.is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION)
+        assert not service.context(12, "child_1").is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION)
+    
+    def test_uninitialized_service_disables_everything(self):
+        """Before initialize() every flag is off"""
+        context = FeatureFlagService().context(12, "child_1")
+        
+        assert isinstance(context, FlagContext)
+        assert context.enabled_flags() == []
+    
+    @pytest.mark.asyncio
+    async def test_analyzer_uses_supplied_context(self):
+        """ContentAnalyzer takes its pipeline switches from the request's context"""
+        analyzer = ContentAnalyzer()
+        analyzer.result_cache.max_entries = 0
+        await analyzer.initialize()
+        
+        context = FlagContext(12, None, tuple(flag is FeatureFlag.CRISIS_DETECTION for flag in FeatureFlag))
+        result = await analyzer.analyze(
+            content="A friendly science lesson", content_type="text", child_age=12, flag_context=context
+        )
+        
+        assert "enhanced_bias_analysis" not in result
+
+class TestBulkEvaluation:
+    """Test suite for cohort-wide flag evaluation"""
+    
+    @pytest.mark.asyncio
+    async def test_matrix_matches_per_child_contexts(self):
+        """Every row equals the child's own context and counts sum the columns"""
+        service = await initialized_service()
+        await service.update_flag(FeatureFlag.ENHANCED_BIAS_DETECTION, rollout_percentage=37)
+        await service.update_flag(FeatureFlag.REAL_TIME_INTERVENTION, enabled=True, rollout_percentage=5,
+                                  target_age_groups=["AGE_14_16"])
+        ages = [AGES[i % len(AGES)] for i in range(len(CHILD_IDS))]
+        
+        result = service.evaluate_bulk(ages, CHILD_IDS)
+        
+        assert result.matrix.shape == (len(CHILD_IDS), len(FeatureFlag))
+        for row, age, child_id in zip(result.matrix, ages, CHILD_IDS):
+            assert tuple(bool(value) for value in row) == service.context(age, child_id).values
+        for flag in FeatureFlag:
+            assert result.counts[flag] == int(result.column(flag).sum())
+        assert result.total == len(CHILD_IDS)
+    
+    @pytest.mark.asyncio
+    async def test_missing_ids_use_seeded_buckets(self):
+        """Children without an ID get reproducible random buckets"""
+        service = await initialized_service()
+        await service.update_flag(FeatureFlag.CRISIS_DETECTION, rollout_percentage=50)
+        ages = [12] * 500
+        ids = [None] * 500
+        
+        first = service.evaluate_bulk(ages, ids, seed=7)
+        second = service.evaluate_bulk(ages, ids, seed=7)
+        
+        assert (first.matrix == second.matrix).all()
+        assert 0 < first.counts[FeatureFlag.CRISIS_DETECTION] < 500
+        
+        with pytest.raises(ValueError):
+            service.evaluate_bulk([12], ["child_1", "child_2"])
+    
+    @pytest.mark.asyncio
+    async def test_forecast_leaves_live_flags_alone(self):
+        """A proposed document is counted against the cohort but not applied"""
+        service = await initialized_service()
+        version = service.evaluate_bulk([], []).version
+        
+        forecast = service.forecast_document(
+            {"ENHANCED_BIAS_DETECTION": {"rollout_percentage": 20}}, [12] * len(CHILD_IDS), CHILD_IDS
+        )
+        
+        bias = forecast["flags"]["ENHANCED_BIAS_DETECTION"]
+        assert bias["current"] == len(CHILD_IDS)
+        assert bias["proposed"] == sum(service._calculate_user_percentage(c) <= 20 for c in CHILD_IDS)
+        assert bias["change"] == bias["proposed"] - bias["current"]
+        assert forecast["flags"]["CRISIS_DETECTION"]["change"] == 0
+        assert service.evaluate_bulk([], []).version == version
+        assert service.is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION, 12, "child_1")
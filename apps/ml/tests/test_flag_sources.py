@@ -0,0 +1,197 @@
+"""
+Test Suite for Hot-Reloadable Feature Flags
+Tests file and Redis flag sources, document validation and copy-on-write snapshots
+"""
+
+import asyncio
+import json
+import os
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.feature_flags import FeatureFlagService, FeatureFlag
+from services.flag_sources import FileFlagSource, RedisFlagSource, flag_source_from_env
+
+async def wait_for(condition, timeout=1.0):
+    """Poll until condition() holds, failing after timeout seconds"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+def write_document(path, document):
+    """Replace a flag file atomically, as deployments should"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(document if isinstance(document, str) else json.dumps(document))
+    os.replace(tmp_path, path)
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+    
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+    
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+    
+    async def unsubscribe(self, channel):
+        self.redis.subscribers[channel].remove(self.queue)
+    
+    async def close(self):
+        pass
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client calls the source makes"""
+    
+    def __init__(self):
+        self.values = {}
+        self.subscribers = {}
+        self.closed = False
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def set(self, key, value):
+        self.values[key] = value
+    
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+    
+    def pubsub(self):
+        return FakePubSub(self)
+    
+    async def close(self):
+        self.closed = True
+
+class TestFileFlagSource:
+    """Test suite for flags loaded from a watched file"""
+    
+    @pytest.mark.asyncio
+    async def test_initial_document_and_hot_reload(self, tmp_path):
+        """The file is applied at startup and again whenever it changes"""
+        path = str(tmp_path / "flags.json")
+        write_document(path, {"ENHANCED_BIAS_DETECTION": False})
+        service = FeatureFlagService(source=FileFlagSource(path, poll_interval=0.01))
+        await service.initialize()
+        
+        assert not service.is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION, 12, "child_1")
+        
+        await service.start_watching()
+        try:
+            write_document(path, {"ENHANCED_BIAS_DETECTION": {"enabled": True, "rollout_percentage": 100}})
+            await wait_for(lambda: service.is_enabled(FeatureFlag.ENHANCED_BIAS_DETECTION, 12, "child_1"))
+            
+            status = await service.get_status()
+            assert status["source"] == "file"
+            assert status["watching"]
+            assert status["reloads"] == 2
+        finally:
+            await service.stop_watching()
+    
+    @pytest.mark.asyncio
+    async def test_yaml_document(self, tmp_path):
+        """YAML flag files are parsed like JSON ones"""
+        path = str(tmp_path / "flags.yaml")
+        write_document(path, "CRISIS_DETECTION:\n  target_age_groups: [AGE_17_PLUS]\n")
+        service = FeatureFlagService(source=FileFlagSource(path))
+        await service.initialize()
+        
+        assert not service.is_enabled(FeatureFlag.CRISIS_DETECTION, 12, "child_1")
+        assert service.is_enabled(FeatureFlag.CRISIS_DETECTION, 18, "child_1")
+    
+    def test_source_from_env(self, monkeypatch):
+        """FEATURE_FLAG_SOURCE_FILE selects a file source"""
+        monkeypatch.setenv("FEATURE_FLAG_SOURCE_FILE", "/etc/aiguardian/flags.json")
+        monkeypatch.setenv("FEATURE_FLAG_SOURCE_POLL_SECONDS", "0.5")
+        
+        source = flag_source_from_env()
+        
+        assert isinstance(source, FileFlagSource)
+        assert source.poll_interval == 0.5
+
+class TestFlagDocuments:
+    """Test suite for applying flag documents"""
+    
+    @pytest.mark.asyncio
+    async def test_invalid_document_keeps_previous_snapshot(self):
+        """A document with any invalid entry is rejected as a whole"""
+        service = FeatureFlagService()
+        await service.initialize()
+        service.apply_document({"CRISIS_DETECTION": {"rollout_percentage": 30}})
+        version = (await service.get_status())["version"]
+        
+        with pytest.raises(ValueError):
+            service.apply_document({
+                "ENHANCED_BIAS_DETECTION": False,
+                "CRISIS_DETECTION": {"rollout_percentage": "all"}
+            })
+        
+        assert (await service.get_status())["version"] == version
+        assert service.get_flag_config(FeatureFlag.CRISIS_DETECTION)["rollout_percentage"] == 30
+        assert service.get_flag_config(FeatureFlag.ENHANCED_BIAS_DETECTION)["enabled"]
+    
+    @pytest.mark.asyncio
+    async def test_document_overlays_defaults(self):
+        """Each document replaces the last one rather than accumulating onto it"""
+        service = FeatureFlagService()
+        await service.initialize()
+        
+        service.apply_document({"ENHANCED_BIAS_DETECTION": {"rollout_percentage": 150}, "NOT_A_FLAG": True})
+        assert service.get_flag_config(FeatureFlag.ENHANCED_BIAS_DETECTION)["rollout_percentage"] == 100
+        
+        service.apply_document({"CRISIS_DETECTION": False})
+        assert service.get_flag_config(FeatureFlag.ENHANCED_BIAS_DETECTION) == \
+            service.default_flags[FeatureFlag.ENHANCED_BIAS_DETECTION]
+        assert not service.get_flag_config(FeatureFlag.CRISIS_DETECTION)["enabled"]
+    
+    @pytest.mark.asyncio
+    async def test_readers_see_whole_snapshots(self):
+        """Published configuration is read-only and replaced, never modified"""
+        service = FeatureFlagService()
+        await service.initialize()
+        flags = service.flags
+        
+        with pytest.raises(TypeError):
+            flags[FeatureFlag.CRISIS_DETECTION]["enabled"] = False
+        
+        await service.update_flag(FeatureFlag.CRISIS_DETECTION, enabled=False)
+        
+        assert flags[FeatureFlag.CRISIS_DETECTION]["enabled"]
+        assert not service.flags[FeatureFlag.CRISIS_DETECTION]["enabled"]
+
+class TestRedisFlagSource:
+    """Test suite for flags pushed over Redis pub/sub"""
+    
+    @pytest.mark.asyncio
+    async def test_publish_reaches_every_worker(self):
+        """Each watching service applies a published document"""
+        redis = FakeRedis()
+        writer = RedisFlagSource(lambda: redis)
+        await writer.publish({"REAL_TIME_INTERVENTION": {"enabled": True, "rollout_percentage": 100}})
+        
+        workers = [FeatureFlagService(source=RedisFlagSource(lambda: redis)) for _ in range(3)]
+        for worker in workers:
+            await worker.initialize()
+            assert worker.is_enabled(FeatureFlag.REAL_TIME_INTERVENTION, 12, "child_1")
+            await worker.start_watching()
+        
+        try:
+            await wait_for(lambda: len(redis.subscribers.get(writer.channel, [])) == 3)
+            await writer.publish({"REAL_TIME_INTERVENTION": False})
+            
+            await wait_for(lambda: not any(
+                worker.is_enabled(FeatureFlag.REAL_TIME_INTERVENTION, 12, "child_1") for worker in workers
+            ))
+        finally:
+            for worker in workers:
+                await worker.stop_watching()
+        
+        assert redis.closed
+        assert redis.subscribers[writer.channel] == []
@@ -0,0 +1,223 @@
+"""
+Test Suite for the History Store
+Tests ring buffers, eviction, memory stats and the write-behind backend
+"""
+
+import pytest
+import asyncio
+import os
+
+import sys
+sys.path.append('../')
+
+from services.history_store import HistoryStore
+from services.history_backend import SQLiteHistoryBackend, WriteBehindHistory
+from services.predictive_risk_assessor import PredictiveRiskAssessor
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+def make_store(**kwargs) -> HistoryStore:
+    return HistoryStore(
+        float_fields=("score",),
+        code_fields={"level": ["low", "medium", "high", "critical"]},
+        **kwargs
+    )
+
+class TestHistoryStore:
+    """Test suite for bounded per-child history"""
+    
+    def test_ring_keeps_most_recent_records_in_order(self):
+        """Appends past capacity overwrite the oldest records, like list[-capacity:]"""
+        store = make_store(capacity=5)
+        reference = []
+        
+        for i in range(13):
+            level = ["low", "medium", "high", "critical"][i % 4]
+            store.append("child", score=i / 10, level=level)
+            reference = (reference + [(i / 10, level)])[-5:]
+            
+            assert store.column("child", "score") == [score for score, _ in reference]
+            assert store.column("child", "level") == [level for _, level in reference]
+        
+        assert store.column("child", "score", last=2) == [1.1, 1.2]
+        assert [r["level"] for r in store.records("child")] == [level for _, level in reference]
+        assert store.length("child") == 5
+    
+    def test_unknown_code_value_is_rejected(self):
+        """Enum fields only accept declared values"""
+        store = make_store()
+        with pytest.raises(ValueError):
+            store.append("child", score=0.5, level="extreme")
+        assert len(store) == 0
+    
+    def test_least_recently_updated_child_is_evicted(self):
+        """The store never holds more than max_children"""
+        store = make_store(max_children=2)
+        store.append("a", score=0.1, level="low")
+        store.append("b", score=0.2, level="low")
+        store.append("a", score=0.3, level="low")
+        store.append("c", score=0.4, level="low")
+        
+        assert "b" not in store
+        assert "a" in store and "c" in store
+        assert store.stats()["evictions"] == 1
+    
+    def test_idle_children_expire(self):
+        """Children with no recent updates are dropped"""
+        clock = FakeClock()
+        store = make_store(idle_ttl_seconds=60, clock=clock)
+        store.append("a", score=0.1, level="low")
+        clock.now += 30
+        store.append("b", score=0.2, level="low")
+        
+        clock.now += 45
+        assert store.column("a", "score") == []
+        assert store.column("b", "score") == [0.2]
+        
+        clock.now += 100
+        store.append("c", score=0.3, level="low")
+        assert len(store) == 1
+        assert store.stats()["expirations"] == 2
+    
+    def test_stats_report_memory_footprint(self):
+        """Memory scales with the number of children held"""
+        store = make_store(capacity=30)
+        empty = store.stats()["memory_bytes"]
+        for i in range(100):
+            store.append(f"child-{i}", score=0.5, level="medium")
+        
+        stats = store.stats()
+        assert stats["children"] == 100
+        assert stats["bytes_per_child"] > 30 * 9
+        assert stats["memory_bytes"] >= empty + 100 * stats["bytes_per_child"]
+
+class RecordingBackend(SQLiteHistoryBackend):
+    """SQLite backend that records the size of every batch written"""
+    
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.batches = []
+    
+    async def append_many(self, records):
+        self.batches.append(len(records))
+        await super().append_many(records)
+
+class TestWriteBehindHistory:
+    """Test suite for the persistent history backend"""
+    
+    @pytest.mark.asyncio
+    async def test_flushes_in_batches(self, tmp_path):
+        """Queued records are written in batch_size chunks"""
+        backend = RecordingBackend(str(tmp_path / "history.db"))
+        history = WriteBehindHistory(make_store(), backend, batch_size=4, flush_interval_seconds=60)
+        
+        for i in range(10):
+            await history.append("child", score=i / 10, level="low")
+        await history.flush()
+        
+        assert sum(backend.batches) == 10
+        assert max(backend.batches) <= 4
+        assert history.stats()["pending_records"] == 0
+        await history.close()
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_trend_data(self, tmp_path):
+        """A second worker hydrates its hot window from the shared backend"""
+        path = str(tmp_path / "history.db")
+        writer = WriteBehindHistory(make_store(capacity=5), SQLiteHistoryBackend(path), flush_interval_seconds=60)
+        reader = WriteBehindHistory(make_store(capacity=5), SQLiteHistoryBackend(path), refresh_seconds=0)
+        
+        for i in range(8):
+            await writer.append("child", score=i / 10, level="medium")
+        assert await reader.column("child", "score") == []
+        
+        await writer.close()
+        assert await reader.column("child", "score") == pytest.approx([0.3, 0.4, 0.5, 0.6, 0.7])
+        assert await reader.column("child", "level") == ["medium"] * 5
+        await reader.close()
+    
+    @pytest.mark.asyncio
+    async def test_reads_do_not_flush(self, tmp_path):
+        """Hydration overlays this worker's queued records instead of waiting on a flush"""
+        path = str(tmp_path / "history.db")
+        first = WriteBehindHistory(make_store(), SQLiteHistoryBackend(path))
+        await first.append("child", score=0.1, level="low")
+        await first.close()
+        
+        backend = RecordingBackend(path)
+        history = WriteBehindHistory(make_store(), backend, batch_size=100, flush_interval_seconds=60)
+        await history.append("child", score=0.2, level="medium")
+        await history.append("other", score=0.5, level="high")
+        history.store.clear()
+        
+        assert await history.column("child", "score") == pytest.approx([0.1, 0.2])
+        assert backend.batches == []
+        assert history.stats()["pending_records"] == 2
+        
+        await history.flush()
+        history._hydrated_at.clear()
+        assert await history.column("child", "score") == pytest.approx([0.1, 0.2])
+        await history.close()
+    
+    @pytest.mark.asyncio
+    async def test_restart_keeps_history(self, tmp_path):
+        """History written before a restart is visible after it"""
+        path = str(tmp_path / "history.db")
+        first = WriteBehindHistory(make_store(), SQLiteHistoryBackend(path))
+        await first.append("child", score=0.9, level="critical")
+        await first.close()
+        
+        second = WriteBehindHistory(make_store(), SQLiteHistoryBackend(path))
+        assert await second.column("child", "level") == ["critical"]
+        assert second.stats()["hydrations"] == 1
+        await second.close()
+    
+    @pytest.mark.asyncio
+    async def test_forked_worker_opens_its_own_connection(self, tmp_path):
+        """No connection is opened at construction, and a forked child never reuses the parent's"""
+        backend = SQLiteHistoryBackend(str(tmp_path / "history.db"))
+        assert backend._connection is None
+        
+        await backend.append_many([("child", 1.0, {"score": 0.1})])
+        parent_connection = backend._connection
+        
+        pid = os.fork()
+        if pid == 0:
+            try:
+                asyncio.run(backend.append_many([("child", 2.0, {"score": 0.2})]))
+                reused = backend._connection is parent_connection
+                os._exit(1 if reused else 0)
+            except BaseException:
+                os._exit(2)
+        
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert backend._connection is parent_connection
+        assert [values["score"] for _, values in await backend.load("child", 10)] == [0.1, 0.2]
+        await backend.close()
+
+class TestRiskHistory:
+    """Test suite for risk trend analysis on the history store"""
+    
+    @pytest.mark.asyncio
+    async def test_trend_uses_ring_history(self):
+        """Trend compares the last 7 scores with the 7 before them"""
+        assessor = PredictiveRiskAssessor()
+        for score in [0.2] * 7 + [0.6] * 7:
+            await assessor._store_risk_assessment("child", {"composite_score": score, "risk_level": "medium"})
+        
+        trend = await assessor._calculate_risk_trend("child")
+        assert trend["trend"] == "increasing"
+        assert trend["trend_magnitude"] == pytest.approx(0.4)
+        
+        for _ in range(30):
+            await assessor._store_risk_assessment("child", {"composite_score": 0.6, "risk_level": "high"})
+        assert assessor.risk_history.length("child") == 30
+        assert (await assessor._calculate_risk_trend("child"))["trend"] == "stable"
@@ -0,0 +1,72 @@
+"""
+Test Suite for Service Import Time
+Tests that heavy ML dependencies stay out of service startup
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append('../')
+
+from utils.lazy_import import LazyModule, lazy_import
+
+ML_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous enough for slow CI machines; importing scikit-learn alone exceeds it
+IMPORT_BUDGET_SECONDS = float(os.getenv("ML_IMPORT_BUDGET_SECONDS", 1.5))
+HEAVY_MODULES = ["numpy", "sklearn", "scipy", "pandas", "torch", "transformers"]
+
+def measure_import(module: str) -> dict:
+    """Import a module in a fresh interpreter and report time and loaded heavy modules"""
+    script = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed)\n"
+        "print(','.join(heavy))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ML_ROOT, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return {"seconds": float(output[0]), "heavy": [m for m in output[1].split(",") if m]}
+
+class TestImportBudget:
+    """Test suite for cold-start import cost"""
+    
+    def test_main_app_import_avoids_heavy_dependencies(self):
+        """Importing main:app loads no heavy ML libraries and stays within budget"""
+        result = measure_import("main")
+        assert result["heavy"] == []
+        assert result["seconds"] < IMPORT_BUDGET_SECONDS
+    
+    @pytest.mark.parametrize("module", [
+        "services.enhanced_bias_detector",
+        "services.predictive_risk_assessor",
+        "services.content_analyzer"
+    ])
+    def test_service_modules_defer_heavy_dependencies(self, module):
+        """Services import numpy and scikit-learn only on first use"""
+        assert measure_import(module)["heavy"] == []
+
+class TestLazyModule:
+    """Test suite for the lazy module proxy"""
+    
+    def test_imports_on_first_attribute_access(self):
+        """The proxy resolves attributes from the real module"""
+        json_module = lazy_import("json")
+        assert json_module.loads("[1, 2]") == [1, 2]
+        assert json_module.loaded
+    
+    def test_missing_module_fails_on_use(self):
+        """A missing dependency only fails when it is actually needed"""
+        # Built directly so the broken proxy never joins the preload list
+        missing = LazyModule("module_that_does_not_exist")
+        assert not missing.loaded
+        with pytest.raises(ImportError):
+            missing.anything
@@ -0,0 +1,65 @@
+"""
+Test Suite for Incremental Quality Scoring
+Tests that QualityAccumulator matches a full rescan for any way a document grows
+"""
+
+import random
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.quality_scorer import QualityScorer
+
+THREAD = [
+    "Hi! Can you explain how volcanoes work?",
+    " Sure. A volcano is an opening in the crust... Magma rises because it is less dense",
+    "; the research and data show eruptions follow pressure build-up!!",
+    "\nThat's confusing",
+    "?! Could be. Here is a clear, step-by-step example: think of a shaken soda bottle",
+    " and a detailed, thorough analysis of why the cap pops.",
+    "",
+    "   "
+]
+
+class TestQualityAccumulator:
+    """Test suite for QualityAccumulator"""
+    
+    @pytest.mark.asyncio
+    async def test_each_update_matches_full_rescan(self):
+        """Re-scoring after every message gives the full-text numbers"""
+        scorer = QualityScorer()
+        accumulator = scorer.accumulator("text")
+        
+        text = ""
+        for message in THREAD:
+            text += message
+            accumulator.update(message)
+            assert accumulator.result() == await scorer.score_quality(text, "text"), repr(text)
+    
+    @pytest.mark.asyncio
+    async def test_any_split_matches_full_rescan(self):
+        """Splits inside words, indicators and terminator runs are carried across updates"""
+        scorer = QualityScorer()
+        document = "".join(THREAD) * 3
+        expected = await scorer.score_quality(document, "article")
+        rng = random.Random(3)
+        
+        for _ in range(25):
+            accumulator = scorer.accumulator("article")
+            position = 0
+            while position < len(document):
+                step = rng.randint(1, 12)
+                accumulator.update(document[position:position + step])
+                position += step
+            assert accumulator.result() == expected
+    
+    @pytest.mark.asyncio
+    async def test_empty_document(self):
+        """No updates scores like empty content"""
+        scorer = QualityScorer()
+        accumulator = scorer.accumulator()
+        
+        assert accumulator.word_count == 0
+        assert accumulator.sentence_count == 1
+        assert accumulator.result() == await scorer.score_quality("")
@@ -0,0 +1,80 @@
+"""
+Test Suite for the Quality Lexicon
+Tests single-pass indicator counts against substring checks and configurable dimension weights
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.quality_lexicon import DEFAULT_DIMENSION_WEIGHTS, dimension_weights_from_env
+from services.quality_scorer import QualityScorer
+
+SAMPLES = [
+    "",
+    "This detailed study explains the evidence step-by-step with a clear example.",
+    "I believe it might be confusing. Probably a quick summary; could be unclear jargon!",
+    "Research data research data: a thorough, comprehensive analysis that explains everything.",
+    "EXPLAINS Explains explains"
+]
+
+def reference_counts(scorer, content):
+    """Substring checks per indicator, as the scorer used to do"""
+    lowered = content.lower()
+    return {
+        dimension: (
+            sum(1 for word in indicators["positive"] if word in lowered),
+            sum(1 for word in indicators["negative"] if word in lowered)
+        )
+        for dimension, indicators in scorer.quality_indicators.items()
+    }
+
+class TestQualityLexicon:
+    """Test suite for QualityLexicon"""
+    
+    def test_counts_match_substring_checks(self):
+        """One automaton pass counts each distinct indicator once per dimension"""
+        scorer = QualityScorer()
+        for content in SAMPLES:
+            assert scorer.lexicon.count(content.lower()) == reference_counts(scorer, content), content
+    
+    def test_resumable_scan(self):
+        """Indicators split across scanned pieces are still found"""
+        lexicon = QualityScorer().lexicon
+        
+        first, state = lexicon.scan("a compre")
+        second, _ = lexicon.scan("hensive study", state)
+        
+        assert lexicon.tally(first | second) == lexicon.count("a comprehensive study")
+
+class TestDimensionWeights:
+    """Test suite for configurable quality weights"""
+    
+    def test_weights_from_env(self, monkeypatch):
+        """QUALITY_SCORER_WEIGHTS overrides individual fields"""
+        monkeypatch.setenv("QUALITY_SCORER_WEIGHTS", '{"depth": {"positive": 8}, "clarity": {"weight": 2}}')
+        
+        weights = dimension_weights_from_env()
+        
+        assert weights["depth"].positive == 8
+        assert weights["depth"].base == DEFAULT_DIMENSION_WEIGHTS["depth"].base
+        assert weights["clarity"].weight == 2
+        assert weights["factuality"] == DEFAULT_DIMENSION_WEIGHTS["factuality"]
+    
+    @pytest.mark.parametrize("env_value", ['{"style": {"base": 50}}', '{"depth": {"positive": "many"}}', "[1, 2]"])
+    def test_invalid_weights_fall_back_to_defaults(self, monkeypatch, env_value):
+        """Bad configuration never breaks scoring"""
+        monkeypatch.setenv("QUALITY_SCORER_WEIGHTS", env_value)
+        assert dimension_weights_from_env() == DEFAULT_DIMENSION_WEIGHTS
+    
+    @pytest.mark.asyncio
+    async def test_overall_score_uses_dimension_weights(self, monkeypatch):
+        """The overall score is the weighted mean of the dimension scores"""
+        monkeypatch.setenv("QUALITY_SCORER_WEIGHTS", '{"factuality": {"weight": 3}}')
+        scorer = QualityScorer()
+        
+        result = await scorer.score_quality(SAMPLES[1])
+        
+        expected = int((3 * result["factuality"] + result["depth"] + result["clarity"]) / 5)
+        assert result["quality_score"] == expected
@@ -0,0 +1,142 @@
+"""
+Test Suite for the Analysis Result Cache
+Tests LRU eviction, TTL expiry, the Redis tier and ContentAnalyzer integration
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.result_cache import AnalysisResultCache
+from services.content_analyzer import ContentAnalyzer
+
+class FakeRedis:
+    """Local stand-in for the redis.asyncio client"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    async def get(self, key):
+        return self.store.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.store[key] = value.encode()
+
+class TestAnalysisResultCache:
+    """Test suite for AnalysisResultCache"""
+    
+    @pytest.mark.asyncio
+    async def test_hit_miss_counters_and_private_copies(self):
+        """Hits return copies that callers can mutate safely"""
+        cache = AnalysisResultCache(max_entries=10)
+        key = cache.make_key("hello", "text", 12, "western", ["enhanced_bias"])
+        
+        assert await cache.get(key) is None
+        await cache.set(key, {"flags": ["a"]})
+        
+        first = await cache.get(key)
+        first["flags"].append("mutated")
+        assert await cache.get(key) == {"flags": ["a"]}
+        
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """The least recently used entry is evicted first"""
+        cache = AnalysisResultCache(max_entries=2)
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        await cache.get("a")
+        await cache.set("c", {"v": 3})
+        
+        assert await cache.get("a") == {"v": 1}
+        assert await cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Expired entries are treated as misses"""
+        cache = AnalysisResultCache(max_entries=10, ttl_seconds=-1)
+        await cache.set("a", {"v": 1})
+        
+        assert await cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_instances(self):
+        """A second worker finds results stored by the first through Redis"""
+        redis = FakeRedis()
+        worker_a = AnalysisResultCache(max_entries=10, redis_client=redis)
+        worker_b = AnalysisResultCache(max_entries=10, redis_client=redis)
+        
+        await worker_a.set("key", {"safety_score": 80})
+        
+        assert await worker_b.get("key") == {"safety_score": 80}
+        assert worker_b.stats()["redis_hits"] == 1
+        assert await worker_b.get("key") == {"safety_score": 80}
+        assert worker_b.stats()["hits"] == 1
+    
+    def test_key_depends_on_context(self):
+        """Keys differ by content, age and enabled flags but not flag order"""
+        key = AnalysisResultCache.make_key("x", "text", 12, "western", ["a", "b"])
+        
+        assert key == AnalysisResultCache.make_key("x", "text", 12, "western", ["b", "a"])
+        assert key != AnalysisResultCache.make_key("y", "text", 12, "western", ["a", "b"])
+        assert key != AnalysisResultCache.make_key("x", "text", 9, "western", ["a", "b"])
+        assert key != AnalysisResultCache.make_key("x", "text", 12, "western", ["a"])
+
+class TestContentAnalyzerCaching:
+    """Test suite for cached content analysis"""
+    
+    @pytest.mark.asyncio
+    async def test_repeated_content_is_served_from_cache(self):
+        """The second analysis of the same content is a cache hit with the same result"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        first = await analyzer.analyze(content="A viral video transcript", content_type="video", child_age=11)
+        second = await analyzer.analyze(content="A viral video transcript", content_type="video", child_age=11)
+        
+        assert first == second
+        status = await analyzer.get_status()
+        assert status["result_cache"]["hits"] == 1
+        assert status["result_cache"]["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_ages_in_a_band_share_an_entry(self):
+        """Ages in one band reuse the cached analysis, with age-specific fields redone"""
+        content = "A video with violence and a weapon. Research shows kids learn from it."
+        analyzer = ContentAnalyzer()
+        uncached = ContentAnalyzer()
+        uncached.result_cache.max_entries = 0
+        await analyzer.initialize()
+        await uncached.initialize()
+        
+        flags = {"enhanced_bias": True, "risk_assessment": False}
+        
+        await analyzer._analyze_content(content, "video", 12, flags=flags)
+        cached = await analyzer._analyze_content(content, "video", 13, flags=flags)
+        
+        assert analyzer.result_cache.stats()["hits"] == 1
+        assert cached["age_fit"] == "high_school"
+        assert cached == await uncached._analyze_content(content, "video", 13, flags=flags)
+        
+        await analyzer._analyze_content(content, "video", 14, flags=flags)
+        assert analyzer.result_cache.stats()["misses"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_risk_assessment_is_not_cached(self):
+        """Per-child risk assessment is recomputed on cache hits"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        for child_id in ["child_a", "child_b"]:
+            result = await analyzer.analyze(
+                content="Shared transcript", content_type="video", child_age=12, child_id=child_id
+            )
+            assert "risk_assessment" in result
+        
+        assert len(analyzer.risk_assessor.risk_history) == 2
@@ -0,0 +1,162 @@
+"""
+Test Suite for Safety Detection
+Tests the keyword automaton, single-pass safety scanning and incremental safety sessions
+"""
+
+import pytest
+import random
+
+import sys
+sys.path.append('../')
+
+from services.safety_detector import SafetyDetector
+from utils.aho_corasick import AhoCorasickAutomaton
+
+class TestAhoCorasickAutomaton:
+    """Test suite for the multi-pattern keyword automaton"""
+    
+    def test_finds_overlapping_and_nested_matches(self):
+        """All occurrences are reported, including overlaps and suffixes"""
+        patterns = ["he", "she", "his", "hers"]
+        automaton = AhoCorasickAutomaton().add_all((p, p) for p in patterns).build()
+        
+        found = sorted(
+            (start, end, automaton.patterns[pid])
+            for start, end, pid in automaton.find_all("ushers")
+        )
+        
+        assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    
+    def test_matches_naive_substring_search(self):
+        """Randomized comparison against a brute-force scan"""
+        rng = random.Random(7)
+        patterns = ["ab", "bc", "abc", "c", "ha", "aha", "a"]
+        automaton = AhoCorasickAutomaton().add_all((p, p) for p in patterns).build()
+        
+        for _ in range(500):
+            text = "".join(rng.choice("abch ") for _ in range(40))
+            expected = sorted(
+                (i, i + len(p), p)
+                for p in patterns
+                for i in range(len(text))
+                if text.startswith(p, i)
+            )
+            found = sorted(
+                (start, end, automaton.patterns[pid])
+                for start, end, pid in automaton.find_all(text)
+            )
+            assert found == expected
+    
+    def test_scan_resumes_across_chunks(self):
+        """Carrying the state across chunks finds matches spanning the boundary"""
+        automaton = AhoCorasickAutomaton().add_all([("password", None)]).build()
+        
+        first, state = automaton.scan("my pass")
+        second, _ = automaton.scan("word is", state=state, offset=7)
+        
+        assert first == []
+        assert second == [(3, 11, 0)]
+
+class TestSafetyDetector:
+    """Test suite for SafetyDetector"""
+    
+    @pytest.mark.asyncio
+    async def test_matches_legacy_substring_semantics(self):
+        """Flags and evidence keep the previous per-category substring results"""
+        detector = SafetyDetector()
+        await detector.initialize()
+        
+        content = "Do not share your Password or home ADDRESS; bullying and threats hurt."
+        result = await detector.detect_safety(content)
+        
+        content_lower = content.lower()
+        expected_flags = []
+        expected_evidence = []
+        for category, indicators in detector.safety_categories.items():
+            found = [ind for ind in indicators if ind in content_lower]
+            if found:
+                expected_flags.append(category)
+                expected_evidence.extend(found)
+        
+        assert result["safety_flags"] == expected_flags
+        assert result["safety_evidence"] == expected_evidence
+    
+    @pytest.mark.asyncio
+    async def test_evidence_spans_locate_matches(self):
+        """Evidence spans point at the matched text"""
+        detector = SafetyDetector()
+        await detector.initialize()
+        
+        content = "They planned an attack with a weapon"
+        result = await detector.detect_safety(content)
+        
+        spans = result["safety_evidence_spans"]
+        assert {span["indicator"] for span in spans} == {"attack", "weapon"}
+        for span in spans:
+            assert content.lower()[span["start"]:span["end"]] == span["indicator"]
+            assert span["category"] == "violence"
+
+CONVERSATION = [
+    "hi! want to play a game later?",
+    "sure, but don't share your PASS",
+    "word with anyone. my phone died",
+    "",
+    "someone said they would attack and bully me. that's a threat"
+]
+
+class TestSafetySession:
+    """Test suite for incremental and per-conversation safety detection"""
+    
+    @pytest.mark.asyncio
+    async def test_session_matches_full_scan(self):
+        """Appending in any pieces gives the whole-text result, spans included"""
+        detector = SafetyDetector()
+        await detector.initialize()
+        text = "".join(CONVERSATION) * 2
+        expected = await detector.detect_safety(text, "chat")
+        rng = random.Random(11)
+        
+        for _ in range(20):
+            session = detector.session("chat")
+            position = 0
+            while position < len(text):
+                step = rng.randint(1, 9)
+                session.update(text[position:position + step])
+                position += step
+            assert session.result() == expected
+    
+    @pytest.mark.asyncio
+    async def test_conversation_matches_transcript_rescan(self):
+        """Each message costs one scan and the result covers the whole conversation"""
+        detector = SafetyDetector()
+        
+        for count in range(1, len(CONVERSATION) + 1):
+            result = await detector.detect_conversation_safety("conv-1", CONVERSATION[count - 1])
+            expected = await detector.detect_safety("\n".join(CONVERSATION[:count]), "chat")
+            
+            assert result["messages"] == count
+            for key, value in expected.items():
+                assert result[key] == value, key
+        
+        # Messages are separate, so an indicator split across two of them is not found
+        assert "password" not in result["safety_evidence"]
+        assert result["safety_flags"] == ["violence", "cyberbullying", "privacy_risk"]
+    
+    @pytest.mark.asyncio
+    async def test_conversations_are_bounded_and_independent(self):
+        """Sessions are per conversation, evicted least recently used first"""
+        detector = SafetyDetector()
+        detector.conversations.max_sessions = 2
+        
+        await detector.detect_conversation_safety("a", "a weapon")
+        await detector.detect_conversation_safety("b", "a nice day")
+        await detector.detect_conversation_safety("a", "more")
+        await detector.detect_conversation_safety("c", "hello")
+        
+        assert "b" not in detector.conversations
+        assert (await detector.detect_conversation_safety("a", "ok"))["safety_flags"] == ["violence"]
+        assert (await detector.detect_conversation_safety("c", "ok"))["safety_flags"] == []
+        
+        detector.end_conversation("a")
+        assert (await detector.detect_conversation_safety("a", "ok"))["messages"] == 1
+        assert detector.conversations.stats()["evictions"] >= 1
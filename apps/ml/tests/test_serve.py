@@ -0,0 +1,116 @@
+"""
+Test Suite for the Pre-forking Launcher
+Tests worker respawn, graceful stop and forced stop in WorkerSupervisor
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+import serve
+from utils.worker_health import WorkerHealthBoard
+
+ML_ROOT = Path(__file__).resolve().parent.parent
+
+def crash_once_worker(index, app, sock, board, log_level):
+    """First incarnation crashes; the respawned one serves until SIGTERM"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    board.attach(index)
+    if board._restarts[index] == 0:
+        os._exit(3)
+    while True:
+        board.beat()
+        time.sleep(0.05)
+
+def stubborn_worker(index, app, sock, board, log_level):
+    """Ignores SIGTERM, so only SIGKILL stops it"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.05)
+
+def run_supervisor(supervisor, stop_after):
+    """Run the supervisor loop in this (main) thread and SIGTERM ourselves after `stop_after` seconds"""
+    previous = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    timer = threading.Timer(stop_after, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+    try:
+        supervisor.run()
+    finally:
+        timer.cancel()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+def assert_reaped(pids):
+    for pid in pids:
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
+
+class TestWorkerSupervisor:
+    """Test suite for WorkerSupervisor"""
+    
+    def test_crashed_worker_is_respawned_and_stopped(self, monkeypatch):
+        """A crashed worker is replaced in its slot and every worker is reaped on SIGTERM"""
+        monkeypatch.setattr(serve, "run_worker", crash_once_worker)
+        monkeypatch.setattr(serve, "RESPAWN_BACKOFF_SECONDS", 0.1)
+        board = WorkerHealthBoard(2, heartbeat_interval=0.1)
+        supervisor = serve.WorkerSupervisor(None, None, board, "warning", graceful_timeout=5)
+        
+        spawned = []
+        spawn = supervisor.spawn
+        
+        def recording_spawn(index, restart=False):
+            before = set(supervisor.workers)
+            spawn(index, restart)
+            (pid,) = set(supervisor.workers) - before
+            spawned.append((index, restart, pid))
+        
+        monkeypatch.setattr(supervisor, "spawn", recording_spawn)
+        run_supervisor(supervisor, stop_after=1.5)
+        
+        # Two workers, each crashed once and respawned once into its own slot
+        assert sorted((index, restart) for index, restart, _ in spawned) == \
+            [(0, False), (0, True), (1, False), (1, True)]
+        assert [board._restarts[index] for index in range(2)] == [1, 1]
+        assert supervisor.workers == {}
+        assert_reaped([pid for _, _, pid in spawned])
+    
+    def test_worker_ignoring_sigterm_is_killed(self, monkeypatch):
+        """Workers still running after the graceful timeout are killed"""
+        monkeypatch.setattr(serve, "run_worker", stubborn_worker)
+        board = WorkerHealthBoard(1)
+        supervisor = serve.WorkerSupervisor(None, None, board, "warning", graceful_timeout=0.3)
+        
+        started = time.monotonic()
+        run_supervisor(supervisor, stop_after=0.3)
+        
+        assert time.monotonic() - started < 3
+        assert supervisor.workers == {}
+        assert_reaped([board._pids[0]])
+
+class TestPreload:
+    """Test suite for the parent preload"""
+    
+    def test_lazy_modules_are_loaded_before_fork(self):
+        """Deferred heavy imports happen in the parent so forked workers share them"""
+        script = (
+            "import sys\n"
+            "import serve\n"
+            "from utils.worker_health import WorkerHealthBoard\n"
+            "assert 'numpy' not in sys.modules\n"
+            "serve.preload(WorkerHealthBoard(1))\n"
+            "print('numpy' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=ML_ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        assert output[-1] == "True"
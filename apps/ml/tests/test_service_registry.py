@@ -0,0 +1,95 @@
+"""
+Test Suite for the Service Registry
+Tests that every service is built and initialized exactly once and shared
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.registry import ServiceRegistry, build_service_registry
+
+class CountingService:
+    """Service that counts initialize calls"""
+    
+    def __init__(self, dependency=None):
+        self.dependency = dependency
+        self.initialized = False
+        self.initialize_calls = 0
+        self.shutdown_calls = 0
+    
+    async def initialize(self):
+        self.initialize_calls += 1
+        self.initialized = True
+    
+    async def shutdown(self):
+        self.shutdown_calls += 1
+
+class TestServiceRegistry:
+    """Test suite for ServiceRegistry"""
+    
+    @pytest.mark.asyncio
+    async def test_builds_and_initializes_once(self):
+        """Shared dependencies are built once and initialized once"""
+        registry = ServiceRegistry()
+        built = []
+        
+        def make(name, dependency=None):
+            def factory(r):
+                built.append(name)
+                return CountingService(r.get(dependency) if dependency else None)
+            return factory
+        
+        registry.register("leaf", make("leaf"))
+        registry.register("a", make("a", "leaf"))
+        registry.register("b", make("b", "leaf"))
+        
+        await registry.initialize_all()
+        await registry.initialize_all()
+        
+        assert built == ["leaf", "a", "b"]
+        assert registry.get("a").dependency is registry.get("b").dependency
+        assert all(s.initialize_calls == 1 for s in registry.instances().values())
+        
+        await registry.shutdown_all()
+        assert all(s.shutdown_calls == 1 for s in registry.instances().values())
+    
+    def test_detects_circular_dependencies(self):
+        """A dependency cycle fails loudly instead of recursing"""
+        registry = ServiceRegistry()
+        registry.register("a", lambda r: r.get("b"))
+        registry.register("b", lambda r: r.get("a"))
+        
+        with pytest.raises(RuntimeError, match="Circular"):
+            registry.get("a")
+    
+    def test_unknown_service(self):
+        """Unregistered names raise KeyError"""
+        with pytest.raises(KeyError):
+            ServiceRegistry().get("missing")
+
+class TestMLServiceGraph:
+    """Test suite for the wired ML service registry"""
+    
+    @pytest.mark.asyncio
+    async def test_detectors_are_shared(self):
+        """Endpoints and the analyzer share one instance of each detector"""
+        registry = build_service_registry()
+        analyzer = registry.get("content_analyzer")
+        
+        assert analyzer.safety_detector is registry.get("safety_detector")
+        assert analyzer.quality_scorer is registry.get("quality_scorer")
+        assert analyzer.bias_detector is registry.get("bias_detector")
+        assert analyzer.enhanced_bias_detector is registry.get("enhanced_bias_detector")
+        assert analyzer.kidgpt_service is registry.get("enhanced_kidgpt")
+        assert registry.get("bias_detector").enhanced_detector is registry.get("enhanced_bias_detector")
+        assert registry.get("kidgpt_service").enhanced_service is registry.get("enhanced_kidgpt")
+        
+        await registry.initialize_all()
+        matcher = registry.get("safety_detector").matcher
+        await analyzer.initialize()
+        assert registry.get("safety_detector").matcher is matcher
+        
+        result = await analyzer.analyze(content="A friendly science lesson", content_type="text", child_age=10)
+        assert "safety_score" in result
@@ -0,0 +1,76 @@
+"""
+Test Suite for the Session Store
+Tests per-conversation session creation, LRU eviction and idle expiry
+"""
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.session_store import SessionStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class TestSessionStore:
+    """Test suite for SessionStore"""
+    
+    def test_creates_once_per_conversation(self):
+        """The same session object is returned until it is dropped"""
+        store = SessionStore(factory=dict)
+        
+        session = store.get_or_create("conv-1")
+        session["turns"] = 1
+        
+        assert store.get_or_create("conv-1") is session
+        assert store.get("conv-2") is None
+        assert len(store) == 1
+        
+        store.discard("conv-1")
+        assert store.get_or_create("conv-1") == {}
+    
+    def test_evicts_least_recently_used(self):
+        """Touching a session protects it from eviction"""
+        store = SessionStore(factory=dict, max_sessions=2)
+        store.get_or_create("a")
+        store.get_or_create("b")
+        store.get_or_create("a")
+        store.get_or_create("c")
+        
+        assert "a" in store
+        assert "b" not in store
+        assert store.stats()["evictions"] == 1
+    
+    def test_expires_idle_sessions(self):
+        """Sessions untouched for longer than the TTL are dropped"""
+        clock = FakeClock()
+        store = SessionStore(factory=dict, idle_ttl_seconds=60, clock=clock)
+        store.get_or_create("old")
+        clock.now += 30
+        store.get_or_create("recent")
+        
+        clock.now += 45
+        assert "old" not in store
+        assert "recent" in store
+        
+        clock.now += 100
+        store.get_or_create("new")
+        assert len(store) == 1
+        assert store.stats()["expirations"] == 2
+    
+    def test_from_env(self, monkeypatch):
+        """Limits can be configured per store"""
+        monkeypatch.setenv("TEST_SESSIONS_MAX_SESSIONS", "5")
+        monkeypatch.setenv("TEST_SESSIONS_IDLE_TTL_SECONDS", "90")
+        
+        store = SessionStore.from_env("TEST_SESSIONS", factory=dict)
+        
+        assert store.max_sessions == 5
+        assert store.idle_ttl_seconds == 90
+        with pytest.raises(ValueError):
+            SessionStore(factory=dict, max_sessions=0)
@@ -0,0 +1,164 @@
+"""
+Test Suite for the Analysis Stage Scheduler
+Tests concurrency, per-stage timeouts and degraded partial results
+"""
+
+import pytest
+import asyncio
+import time
+
+import sys
+sys.path.append('../')
+
+from services.stage_scheduler import Stage, StageScheduler
+from services.content_analyzer import ContentAnalyzer
+
+class TestStageScheduler:
+    """Test suite for StageScheduler"""
+    
+    @pytest.mark.asyncio
+    async def test_stages_run_concurrently(self):
+        """Independent I/O-bound stages should overlap rather than add up"""
+        async def slow(value):
+            await asyncio.sleep(0.2)
+            return value
+        
+        scheduler = StageScheduler(default_timeout=2.0)
+        start = time.perf_counter()
+        result = await scheduler.run([
+            Stage(name=f"stage_{i}", run=lambda i=i: slow(i), fallback=lambda: None)
+            for i in range(4)
+        ])
+        elapsed = time.perf_counter() - start
+        
+        assert elapsed < 0.6
+        assert result.results == {"stage_0": 0, "stage_1": 1, "stage_2": 2, "stage_3": 3}
+        assert result.degraded == []
+    
+    @pytest.mark.asyncio
+    async def test_timeout_and_error_degrade_only_that_stage(self):
+        """A slow or failing stage should fall back without losing the others"""
+        async def ok():
+            return "ok"
+        
+        async def hang():
+            await asyncio.sleep(5)
+        
+        async def boom():
+            raise ValueError("model unavailable")
+        
+        scheduler = StageScheduler(default_timeout=2.0)
+        result = await scheduler.run([
+            Stage(name="ok", run=ok, fallback=lambda: "fallback"),
+            Stage(name="slow", run=hang, fallback=lambda: "fallback", timeout=0.05),
+            Stage(name="broken", run=boom, fallback=lambda: "fallback")
+        ])
+        
+        assert result.results == {"ok": "ok", "slow": "fallback", "broken": "fallback"}
+        assert result.degraded == ["slow", "broken"]
+        assert "model unavailable" in result.errors["broken"]
+    
+    @pytest.mark.asyncio
+    async def test_cpu_bound_stage_runs_in_executor(self):
+        """CPU-bound stages are plain callables executed off the event loop"""
+        scheduler = StageScheduler()
+        result = await scheduler.run([
+            Stage(name="cpu", run=lambda: sum(range(1000)), fallback=lambda: 0, cpu_bound=True)
+        ])
+        
+        assert result.results["cpu"] == sum(range(1000))
+    
+    @pytest.mark.asyncio
+    async def test_cpu_bound_stage_times_out(self):
+        """A blocking CPU-bound stage degrades on timeout instead of holding up the others"""
+        async def blocking_detector():
+            time.sleep(0.5)  # no await points: could never be interrupted on the event loop
+            return "late"
+        
+        scheduler = StageScheduler(default_timeout=0.05)
+        started = time.perf_counter()
+        result = await scheduler.run([
+            Stage(name="slow", run=blocking_detector, fallback=lambda: "fallback", cpu_bound=True),
+            Stage(name="fast", run=lambda: "fast", fallback=lambda: "fallback", cpu_bound=True)
+        ])
+        
+        assert time.perf_counter() - started < 0.4
+        assert result.results == {"slow": "fallback", "fast": "fast"}
+        assert result.degraded == ["slow"]
+    
+    @pytest.mark.asyncio
+    async def test_abandoned_stages_saturate_the_executor(self):
+        """Timed-out CPU-bound stages keep their threads, and a full executor refuses new stages"""
+        def blocking():
+            time.sleep(0.3)
+            return "late"
+        
+        scheduler = StageScheduler(default_timeout=0.05, max_workers=1, max_pending=0)
+        try:
+            timed_out = await scheduler.run([
+                Stage(name="slow", run=blocking, fallback=lambda: "fallback", cpu_bound=True)
+            ])
+            refused = await scheduler.run([
+                Stage(name="next", run=lambda: "next", fallback=lambda: "fallback", cpu_bound=True)
+            ])
+            
+            assert "still running" in timed_out.errors["slow"]
+            assert refused.degraded == ["next"]
+            assert "saturated" in refused.errors["next"]
+            stats = scheduler.stats()
+            assert stats["abandoned"] == 1
+            assert stats["saturated"] is True
+            assert stats["saturated_rejections"] == 1
+            
+            await asyncio.sleep(0.4)
+            recovered = await scheduler.run([
+                Stage(name="next", run=lambda: "next", fallback=lambda: "fallback", cpu_bound=True)
+            ])
+            assert recovered.results == {"next": "next"}
+            assert scheduler.stats()["abandoned"] == 0
+            assert scheduler.stats()["running"] == 0
+        finally:
+            scheduler.shutdown()
+
+class TestContentAnalyzerDegradedStages:
+    """Test suite for partial results from ContentAnalyzer"""
+    
+    @pytest.mark.asyncio
+    async def test_failed_stage_is_marked_degraded(self):
+        """A failing detector should degrade one stage instead of the whole response"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        
+        async def broken_quality(content, content_type="text", preprocessed=None):
+            raise RuntimeError("quality model crashed")
+        
+        analyzer.quality_scorer.score_quality = broken_quality
+        
+        result = await analyzer.analyze(
+            content="Kids fight with a weapon",
+            content_type="text",
+            child_age=12
+        )
+        
+        assert result["degraded_stages"] == ["quality"]
+        assert result["quality_score"] == 50
+        assert "violence" in result["safety_flags"]
+    
+    @pytest.mark.asyncio
+    async def test_blocking_detector_times_out(self):
+        """Detector stages run off the event loop, so the stage timeout applies to them"""
+        analyzer = ContentAnalyzer()
+        await analyzer.initialize()
+        analyzer.stage_scheduler.default_timeout = 0.05
+        analyzer.inline_stage_max_chars = 0
+        
+        async def blocking_safety(content, content_type="text", preprocessed=None):
+            time.sleep(0.5)
+            return {}
+        
+        analyzer.safety_detector.detect_safety = blocking_safety
+        
+        result = await analyzer.analyze(content="A detailed study", content_type="text", child_age=12)
+        
+        assert result["degraded_stages"] == ["safety"]
+        assert result["safety_score"] == 50
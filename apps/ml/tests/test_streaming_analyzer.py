@@ -0,0 +1,139 @@
+"""
+Test Suite for Streaming Analysis
+Tests parity with whole-document analysis, matches across chunk boundaries and the NDJSON endpoint
+"""
+
+import json
+import random
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from services.streaming_analyzer import StreamingAnalyzer
+from services.safety_detector import SafetyDetector
+from services.quality_scorer import QualityScorer
+from services.enhanced_kidgpt import EnhancedKidGPTService
+
+DOCUMENT = (
+    "This detailed research explains the data clearly!!! Some people might believe it, probably. "
+    "A brief example: kids fight with a weapon... Share your phone and address?  "
+    "Step-by-step analysis is comprehensive; the jargon is confusing.\n"
+) * 12
+
+def feed_in_chunks(session, text, seed):
+    """Feed text in random-size chunks and collect every event"""
+    rng = random.Random(seed)
+    events = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 40)
+        events.extend(session.feed(text[position:position + size]))
+        position += size
+    return events + session.finish()
+
+class TestStreamingAnalyzer:
+    """Test suite for StreamingAnalyzer sessions"""
+    
+    @pytest.mark.asyncio
+    async def test_final_result_matches_whole_document(self):
+        """Any chunking gives the same safety and quality result as analyzing the whole text"""
+        safety_detector = SafetyDetector()
+        quality_scorer = QualityScorer()
+        analyzer = StreamingAnalyzer(safety_detector=safety_detector, quality_scorer=quality_scorer, window_chars=64)
+        
+        expected_safety = await safety_detector.detect_safety(DOCUMENT)
+        expected_quality = await quality_scorer.score_quality(DOCUMENT)
+        
+        for seed in range(5):
+            session = await analyzer.session()
+            final = feed_in_chunks(session, DOCUMENT, seed)[-1]
+            
+            assert final["event"] == "final"
+            assert final["chars"] == len(DOCUMENT)
+            assert final["quality"] == expected_quality
+            
+            safety = dict(final["safety"])
+            assert safety.pop("evidence_span_count") == len(expected_safety["safety_evidence_spans"])
+            assert safety == expected_safety
+    
+    @pytest.mark.asyncio
+    async def test_matches_across_window_boundaries(self):
+        """Indicators and crisis phrases split between windows are still found"""
+        analyzer = StreamingAnalyzer(window_chars=16)
+        session = await analyzer.session()
+        
+        events = session.feed("x" * 14 + " personal inform")
+        events += session.feed("ation and then I want to")
+        events += session.feed(" die")
+        events += session.finish()
+        final = events[-1]
+        
+        assert "privacy_risk" in final["safety"]["safety_flags"]
+        assert final["crisis"]["level"] == "critical"
+        assert final["crisis"]["requires_intervention"] is True
+        assert any(event["event"] == "crisis_alert" for event in events[:-1])
+    
+    @pytest.mark.asyncio
+    async def test_crisis_detection_matches_kidgpt(self):
+        """Streamed crisis indicators come from KidGPT's own scanner, so they agree with it"""
+        kidgpt_service = EnhancedKidGPTService()
+        analyzer = StreamingAnalyzer(kidgpt_service=kidgpt_service, window_chars=32)
+        message = "Everyone hates me and I feel worthless. Nobody cares, I'm scared."
+        
+        session = await analyzer.session()
+        final = feed_in_chunks(session, message, seed=3)[-1]
+        emotional_state = await kidgpt_service._analyze_emotional_state(message, "child_1")
+        expected = await kidgpt_service._assess_crisis_level(message, emotional_state)
+        
+        assert {indicator["type"] for indicator in final["crisis"]["indicators"]} == \
+            {indicator["type"] for indicator in expected["indicators"]}
+        assert (await analyzer.get_status())["crisis_patterns"] == sum(
+            len(entries) for entries in kidgpt_service.crisis_patterns.values()
+        )
+    
+    @pytest.mark.asyncio
+    async def test_early_alert_and_bounded_buffer(self):
+        """Alerts arrive before the document ends and buffered text stays below one window"""
+        analyzer = StreamingAnalyzer(window_chars=128)
+        session = await analyzer.session()
+        
+        events = session.feed("Kids fight with a weapon. " + "Calm words here. " * 20)
+        assert any(event["event"] == "safety_alert" and "violence" in event["safety_flags"] for event in events)
+        assert any(event["event"] == "window" for event in events)
+        
+        for _ in range(200):
+            session.feed("Calm words here. " * 10)
+            assert len(session._buffer) < analyzer.window_chars
+        
+        final = session.finish()[-1]
+        assert final["safety"]["safety_flags"] == ["violence"]
+        assert final["crisis"]["level"] == "none"
+    
+    @pytest.mark.asyncio
+    async def test_stream_endpoint(self):
+        """The endpoint accepts a chunked upload and returns NDJSON events"""
+        import httpx
+        import main
+        
+        await main.startup_event()
+        
+        async def upload():
+            for start in range(0, len(DOCUMENT), 100):
+                yield DOCUMENT[start:start + 100].encode()
+        
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/analyze/stream?content_type=text",
+                headers={"Authorization": "Bearer dev-key-123"},
+                content=upload()
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert events[-1]["event"] == "final"
+        assert events[-1]["chars"] == len(DOCUMENT)
+        assert events[-1]["safety"]["safety_flags"] == (await main.safety_detector.detect_safety(DOCUMENT))["safety_flags"]
@@ -0,0 +1,47 @@
+"""
+Test Suite for Shared Text Preprocessing
+Tests that PreprocessedText matches the per-detector derivations it replaces
+"""
+
+import pytest
+import re
+
+import sys
+sys.path.append('../')
+
+from services.text_preprocessor import PreprocessedText
+from services.quality_scorer import QualityScorer
+from services.safety_detector import SafetyDetector
+
+SAMPLE = "Research shows clear evidence!  This detailed study... explains WHY? Kids may fight"
+
+class TestPreprocessedText:
+    """Test suite for PreprocessedText"""
+    
+    def test_matches_legacy_derivations(self):
+        """Fields equal the str operations the detectors used to repeat"""
+        text = PreprocessedText.from_text(SAMPLE)
+        
+        assert text.lowered == SAMPLE.lower()
+        assert text.word_count == len(SAMPLE.split())
+        assert text.token_set == set(SAMPLE.lower().split())
+        assert text.sentence_count == len(re.split(r'[.!?]+', SAMPLE))
+        assert text.compact == SAMPLE.lower().replace(" ", "")
+    
+    def test_sentence_boundaries_cover_segments(self):
+        """Boundaries slice out the same segments as re.split"""
+        text = PreprocessedText.from_text(SAMPLE)
+        
+        segments = [SAMPLE[start:end] for start, end in text.sentence_boundaries]
+        assert segments == re.split(r'[.!?]+', SAMPLE)
+    
+    @pytest.mark.asyncio
+    async def test_detectors_accept_preprocessed_text(self):
+        """Passing the shared object gives the same result as the legacy str call"""
+        text = PreprocessedText.from_text(SAMPLE)
+        
+        scorer = QualityScorer()
+        assert await scorer.score_quality(SAMPLE, "text", text) == await scorer.score_quality(SAMPLE, "text")
+        
+        detector = SafetyDetector()
+        assert await detector.detect_safety(SAMPLE, "text", text) == await detector.detect_safety(SAMPLE, "text")
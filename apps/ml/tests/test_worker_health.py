@@ -0,0 +1,79 @@
+"""
+Test Suite for Worker Health Reporting
+Tests the shared-memory heartbeat board used by pre-forked workers
+"""
+
+import os
+import time
+
+import pytest
+
+import sys
+sys.path.append('../')
+
+from utils.worker_health import WorkerHealthBoard
+
+class TestWorkerHealthBoard:
+    """Test suite for WorkerHealthBoard"""
+    
+    def test_heartbeats_and_staleness(self):
+        """Workers with old heartbeats are reported unhealthy"""
+        board = WorkerHealthBoard(2, heartbeat_interval=0.05)
+        board.register_worker(0, 100)
+        board.register_worker(1, 101)
+        board.attach(0)
+        
+        time.sleep(0.2)
+        board.beat()
+        board.count_request()
+        
+        workers = board.snapshot()
+        assert workers[0]["healthy"] and workers[0]["current"] and workers[0]["requests"] == 1
+        assert not workers[1]["healthy"] and not workers[1]["current"]
+        assert not board.healthy()
+    
+    def test_restarts_are_counted(self):
+        """Respawning a slot increments its restart counter"""
+        board = WorkerHealthBoard(1)
+        board.register_worker(0, 100)
+        board.record_restart(0)
+        board.register_worker(0, 200)
+        assert board.snapshot()[0]["pid"] == 200
+        assert board.snapshot()[0]["restarts"] == 1
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_forked_worker_heartbeat_is_visible_to_parent(self):
+        """Slots live in shared memory, so a child's writes reach the parent"""
+        board = WorkerHealthBoard(1, heartbeat_interval=60)
+        board.register_worker(0, os.getpid())
+        
+        pid = os.fork()
+        if pid == 0:
+            board.attach(0)
+            for _ in range(3):
+                board.count_request()
+            os._exit(0)
+        
+        os.waitpid(pid, 0)
+        assert board.snapshot()[0]["requests"] == 3
+
+class TestHealthEndpoint:
+    """Test suite for per-worker health on /health"""
+    
+    def test_health_reports_workers(self):
+        """The health endpoint includes every worker and degrades on stale ones"""
+        from fastapi.testclient import TestClient
+        import main
+        
+        board = WorkerHealthBoard(2, heartbeat_interval=60)
+        board.register_worker(0, os.getpid())
+        board.attach(0)
+        main.worker_health = board
+        try:
+            body = TestClient(main.app).get("/health").json()
+        finally:
+            main.worker_health = None
+        
+        assert body["status"] == "degraded"
+        assert [w["worker"] for w in body["workers"]] == [0, 1]
+        assert body["workers"][0]["healthy"] and body["workers"][0]["current"]
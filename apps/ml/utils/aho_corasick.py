@@ -0,0 +1,147 @@
+"""
+Aho-Corasick multi-pattern matcher
+Finds every occurrence of a set of keywords in a single linear pass
+"""
+
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+class AhoCorasickAutomaton:
+    """
+    Multi-pattern keyword automaton
+    Build once with add()/build(), then scan text in O(len(text) + matches)
+    regardless of how many patterns are registered. Scanning is resumable:
+    pass the returned state back in to continue across chunk boundaries.
+    """
+    
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self.patterns: List[str] = []
+        self.payloads: List[Any] = []
+        self.built = False
+    
+    def add(self, pattern: str, payload: Any = None) -> int:
+        """Register a pattern with an optional payload, returning its id"""
+        if not pattern:
+            raise ValueError("Cannot add an empty pattern")
+        if self.built:
+            raise RuntimeError("Cannot add patterns after build()")
+        
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self.payloads.append(payload)
+        self._output[state] = self._output[state] + (pattern_id,)
+        return pattern_id
+    
+    def add_all(self, patterns: Iterable[Tuple[str, Any]]) -> "AhoCorasickAutomaton":
+        """Register several (pattern, payload) pairs"""
+        for pattern, payload in patterns:
+            self.add(pattern, payload)
+        return self
+    
+    def build(self) -> "AhoCorasickAutomaton":
+        """Compute failure links; must be called before scanning"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = link if link != next_state else 0
+                # Inherit matches that end at the failure state (suffix patterns)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        
+        self.built = True
+        return self
+    
+    def scan(self, text: str, state: int = 0, offset: int = 0) -> Tuple[List[Tuple[int, int, int]], int]:
+        """
+        Scan text and return (matches, final_state)
+        Each match is (start, end, pattern_id) with offsets relative to `offset`
+        """
+        if not self.built:
+            raise RuntimeError("Automaton must be built before scanning")
+        
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+        matches = []
+        
+        position = offset
+        for ch in text:
+            position += 1
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for pattern_id in output[state]:
+                    matches.append((position - len(patterns[pattern_id]), position, pattern_id))
+        
+        return matches, state
+    
+    def scan_ids(self, text: str, state: int = 0) -> Tuple[Set[int], int]:
+        """
+        Scan text and return (distinct pattern ids, final_state)
+        For callers that only need which patterns occur, not where
+        """
+        if not self.built:
+            raise RuntimeError("Automaton must be built before scanning")
+        
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: Set[int] = set()
+        
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        
+        return found, state
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return every (start, end, pattern_id) occurrence in text"""
+        matches, _ = self.scan(text)
+        return matches
+    
+    def contains_any(self, text: str) -> bool:
+        """Return True as soon as any pattern occurs in text"""
+        if not self.built:
+            raise RuntimeError("Automaton must be built before scanning")
+        
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
+    
+    @property
+    def max_pattern_length(self) -> int:
+        """Length of the longest registered pattern"""
+        return max((len(p) for p in self.patterns), default=0)
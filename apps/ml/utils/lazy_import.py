@@ -0,0 +1,53 @@
+"""
+Lazy import utilities for ML service
+Defers loading heavy dependencies until they are first used
+"""
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, List, Optional
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access
+    Keeps numpy, scikit-learn and friends out of service import time so
+    short-lived workers start quickly
+    """
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the underlying module has been imported (by us or anyone else)"""
+        return self._module is not None or self._name in sys.modules
+    
+    def load(self) -> ModuleType:
+        """Import the module now"""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+    
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+# Every proxy handed out, so a preloading parent can import them all before forking
+_lazy_modules: List[LazyModule] = []
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a module proxy that imports `name` on first use"""
+    module = LazyModule(name)
+    _lazy_modules.append(module)
+    return module
+
+def load_lazy_modules() -> List[str]:
+    """Import every module deferred so far, returning their names"""
+    for module in _lazy_modules:
+        module.load()
+    return sorted({module._name for module in _lazy_modules})
@@ -0,0 +1,167 @@
+"""
+Regex literal anchors
+Literals that every match of a regular expression must contain, so a keyword
+automaton can rule a regex out before the regex engine runs it
+"""
+
+from typing import FrozenSet, List, Optional, Tuple
+import re
+
+_QUANTIFIER_BOUNDS = re.compile(r"\{(\d*)(,(\d*))?\}")
+
+class _UnsupportedSyntax(Exception):
+    """Pattern syntax the parser does not model"""
+
+def required_literals(pattern: str, ignore_whitespace: bool = False) -> Optional[FrozenSet[str]]:
+    """
+    Whitespace-free literals, one of which occurs in every match of `pattern`;
+    None if no such set can be derived
+    By default each literal is a substring of the matched text. With
+    ignore_whitespace literals may span whitespace in the pattern and are
+    substrings of the matched text once its whitespace is removed.
+    Literals, escapes, character classes, groups, alternation and quantifiers
+    are understood; anything else (lookarounds, inline flags, backreferences,
+    numeric and named character escapes) gives None rather than a wrong answer
+    """
+    parser = _LiteralParser(pattern, ignore_whitespace)
+    try:
+        literals = parser.alternation()
+        if parser.position != len(pattern):
+            raise _UnsupportedSyntax("unbalanced parenthesis")
+    except _UnsupportedSyntax:
+        return None
+    return literals
+
+class _LiteralParser:
+    """Recursive-descent walk over a pattern collecting required literals"""
+    
+    def __init__(self, pattern: str, ignore_whitespace: bool):
+        self.pattern = pattern
+        self.ignore_whitespace = ignore_whitespace
+        self.position = 0
+    
+    def peek(self) -> str:
+        return self.pattern[self.position] if self.position < len(self.pattern) else ""
+    
+    def alternation(self) -> Optional[FrozenSet[str]]:
+        """Union of every alternative's literals, or None if any alternative has none"""
+        alternatives = [self.sequence()]
+        while self.peek() == "|":
+            self.position += 1
+            alternatives.append(self.sequence())
+        if not all(alternatives):
+            return None
+        return frozenset().union(*alternatives)
+    
+    def sequence(self) -> Optional[FrozenSet[str]]:
+        """Best literal set for a sequence: the candidate whose shortest member is longest"""
+        candidates: List[FrozenSet[str]] = []
+        run = ""
+        
+        while self.peek() not in ("", "|", ")"):
+            kind, value = self.atom()
+            min_repeat, single = self.quantifier()
+            if kind == "zero_width" or (kind == "space" and self.ignore_whitespace):
+                continue
+            if kind == "char" and min_repeat >= 1:
+                run += value
+                if single:
+                    continue
+            
+            # Anything else ends the current run of adjacent literal characters
+            if run:
+                candidates.append(frozenset([run]))
+                run = ""
+            if kind == "group" and value and min_repeat >= 1:
+                candidates.append(value)
+        
+        if run:
+            candidates.append(frozenset([run]))
+        return max(candidates, key=lambda literals: min(len(literal) for literal in literals), default=None)
+    
+    def atom(self) -> Tuple[str, Optional[object]]:
+        """Consume one atom, returning its kind and, for characters and groups, its value"""
+        ch = self.pattern[self.position]
+        self.position += 1
+        
+        if ch == "\\":
+            escaped = self.peek()
+            if not escaped:
+                raise _UnsupportedSyntax("trailing backslash")
+            self.position += 1
+            if escaped in "bBAZ":
+                return "zero_width", None
+            if escaped in "stnrfv":
+                return "space", None
+            if escaped in "dDwWS":
+                return "other", None
+            if escaped.isalnum() or escaped == "_":
+                raise _UnsupportedSyntax("numeric escape or backreference")
+            return "char", escaped
+        if ch in "^$":
+            return "zero_width", None
+        if ch == ".":
+            return "other", None
+        if ch == "[":
+            return self.character_class(), None
+        if ch == "(":
+            if self.pattern.startswith("?:", self.position):
+                self.position += 2
+            elif self.pattern.startswith("?P<", self.position):
+                self.position = self.pattern.index(">", self.position) + 1
+            elif self.peek() == "?":
+                raise _UnsupportedSyntax("lookaround or inline flag")
+            literals = self.alternation()
+            if self.peek() != ")":
+                raise _UnsupportedSyntax("unclosed group")
+            self.position += 1
+            return "group", literals
+        if ch in "*+?{":
+            raise _UnsupportedSyntax("quantifier without an atom")
+        if ch.isspace():
+            return "space", None
+        return "char", ch
+    
+    def character_class(self) -> str:
+        """Consume a [...] class: "space" if it only matches whitespace, else "other" """
+        end = self.position
+        if self.pattern.startswith("^", end):
+            end += 1
+        if self.pattern.startswith("]", end):
+            end += 1
+        while end < len(self.pattern) and self.pattern[end] != "]":
+            end += 2 if self.pattern[end] == "\\" else 1
+        if end >= len(self.pattern):
+            raise _UnsupportedSyntax("unclosed character class")
+        
+        body = self.pattern[self.position:end]
+        self.position = end + 1
+        members = body.replace("\\s", "").replace("\\t", "").replace("\\n", "").replace(" ", "")
+        return "space" if body and not members and not body.startswith("^") else "other"
+    
+    def quantifier(self) -> Tuple[int, bool]:
+        """Consume an optional quantifier: (minimum repeats, whether exactly one)"""
+        ch = self.peek()
+        if ch == "?":
+            bounds = (0, 1)
+            self.position += 1
+        elif ch == "*":
+            bounds = (0, None)
+            self.position += 1
+        elif ch == "+":
+            bounds = (1, None)
+            self.position += 1
+        elif ch == "{":
+            match = _QUANTIFIER_BOUNDS.match(self.pattern, self.position)
+            if not match:
+                raise _UnsupportedSyntax("literal brace")
+            minimum = int(match.group(1) or 0)
+            maximum = minimum if match.group(2) is None else (int(match.group(3)) if match.group(3) else None)
+            bounds = (minimum, maximum)
+            self.position = match.end()
+        else:
+            return 1, True
+        
+        if self.peek() in ("?", "+"):
+            self.position += 1  # lazy or possessive
+        return bounds[0], bounds == (1, 1)
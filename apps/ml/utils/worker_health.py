@@ -0,0 +1,73 @@
+"""
+Worker health utilities for ML service
+Shared-memory heartbeat board for pre-forked worker processes
+"""
+
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, Dict, List, Optional
+import time
+
+class WorkerHealthBoard:
+    """
+    Per-worker heartbeat slots in anonymous shared memory
+    Created in the parent before forking so every worker can both publish its
+    own heartbeat and report on its siblings from any /health request
+    """
+    
+    def __init__(self, workers: int, heartbeat_interval: float = 1.0):
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self._pids = RawArray("l", workers)
+        self._started = RawArray("d", workers)
+        self._heartbeats = RawArray("d", workers)
+        self._requests = RawArray("q", workers)
+        self._restarts = RawArray("l", workers)
+        self.worker_index: Optional[int] = None  # set in each forked worker
+    
+    def register_worker(self, index: int, pid: int):
+        """Claim a slot for a freshly forked worker (called by the parent)"""
+        now = time.time()
+        self._pids[index] = pid
+        self._started[index] = now
+        self._heartbeats[index] = now
+        self._requests[index] = 0
+    
+    def record_restart(self, index: int):
+        """Count a respawn of slot `index`; the parent calls this before forking so the child sees it"""
+        self._restarts[index] += 1
+    
+    def attach(self, index: int):
+        """Mark the current process as the worker owning `index`"""
+        self.worker_index = index
+    
+    def beat(self):
+        """Publish a heartbeat for the current worker"""
+        if self.worker_index is not None:
+            self._heartbeats[self.worker_index] = time.time()
+    
+    def count_request(self):
+        """Count one request served by the current worker"""
+        if self.worker_index is not None:
+            self._requests[self.worker_index] += 1
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Health of every worker as seen from shared memory"""
+        now = time.time()
+        stale_after = self.heartbeat_interval * 3
+        return [
+            {
+                "worker": index,
+                "pid": self._pids[index],
+                "current": index == self.worker_index,
+                "healthy": self._pids[index] != 0 and now - self._heartbeats[index] <= stale_after,
+                "heartbeat_age_seconds": round(now - self._heartbeats[index], 3) if self._pids[index] else None,
+                "uptime_seconds": round(now - self._started[index], 1) if self._pids[index] else None,
+                "requests": self._requests[index],
+                "restarts": self._restarts[index]
+            }
+            for index in range(self.workers)
+        ]
+    
+    def healthy(self) -> bool:
+        """Whether every worker slot has a live heartbeat"""
+        return all(worker["healthy"] for worker in self.snapshot())